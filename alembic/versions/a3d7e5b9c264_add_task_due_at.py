@@ -0,0 +1,34 @@
+"""add task due_at
+
+Revision ID: a3d7e5b9c264
+Revises: f4c2a9d7e183
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d7e5b9c264"
+down_revision: Union[str, Sequence[str], None] = "f4c2a9d7e183"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tasks", sa.Column("due_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_tasks_open_due_at",
+        "tasks",
+        ["due_at", "task_id"],
+        unique=False,
+        postgresql_where=sa.text("completed IS NOT TRUE AND due_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_open_due_at", table_name="tasks")
+    op.drop_column("tasks", "due_at")
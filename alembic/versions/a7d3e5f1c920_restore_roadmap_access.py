@@ -0,0 +1,43 @@
+"""restore roadmap access
+
+Revision ID: a7d3e5f1c920
+Revises: f2b7c91d4e30
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d3e5f1c920"
+down_revision: Union[str, Sequence[str], None] = "f2b7c91d4e30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "roadmap_access",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("roadmap_id", sa.Integer(), nullable=False),
+        sa.Column("permission", sa.String(length=32), nullable=False),
+        sa.ForeignKeyConstraint(["roadmap_id"], ["roadmaps.roadmap_id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.user_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("roadmap_id", "user_id", name="uq_roadmap_access_roadmap_user"),
+    )
+    op.create_index(op.f("ix_roadmap_access_user_id"), "roadmap_access", ["user_id"], unique=False)
+    op.create_index(op.f("ix_roadmap_access_roadmap_id"), "roadmap_access", ["roadmap_id"], unique=False)
+    # Подзапросы проверки прав ищут членство по паре (team_id, user_id).
+    op.create_index("ix_team_members_team_user", "team_members", ["team_id", "user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_team_members_team_user", table_name="team_members")
+    op.drop_index(op.f("ix_roadmap_access_roadmap_id"), table_name="roadmap_access")
+    op.drop_index(op.f("ix_roadmap_access_user_id"), table_name="roadmap_access")
+    op.drop_table("roadmap_access")
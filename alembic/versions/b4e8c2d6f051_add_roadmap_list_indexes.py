@@ -0,0 +1,44 @@
+"""add roadmap list indexes
+
+Revision ID: b4e8c2d6f051
+Revises: a7d3e5f1c920
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e8c2d6f051"
+down_revision: Union[str, Sequence[str], None] = "a7d3e5f1c920"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_roadmaps_updated_at_roadmap_id",
+        "roadmaps",
+        ["updated_at", "roadmap_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_roadmaps_team_id_updated_at",
+        "roadmaps",
+        ["team_id", "updated_at", "roadmap_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_tasks_roadmap_id_order_index",
+        "tasks",
+        ["roadmap_id", "order_index"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_roadmap_id_order_index", table_name="tasks")
+    op.drop_index("ix_roadmaps_team_id_updated_at", table_name="roadmaps")
+    op.drop_index("ix_roadmaps_updated_at_roadmap_id", table_name="roadmaps")
@@ -0,0 +1,34 @@
+"""add team deleted_at
+
+Revision ID: b6e1f3a8c472
+Revises: a3d7e5b9c264
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e1f3a8c472"
+down_revision: Union[str, Sequence[str], None] = "a3d7e5b9c264"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("teams", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_teams_deleted_at",
+        "teams",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_teams_deleted_at", table_name="teams")
+    op.drop_column("teams", "deleted_at")
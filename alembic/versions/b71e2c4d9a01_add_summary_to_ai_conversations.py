@@ -0,0 +1,28 @@
+"""add summary to ai conversations
+
+Revision ID: b71e2c4d9a01
+Revises: 9519afcf28f3
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b71e2c4d9a01"
+down_revision: Union[str, Sequence[str], None] = "9519afcf28f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("ai_conversations", sa.Column("summary", sa.Text(), nullable=True))
+    op.add_column("ai_conversations", sa.Column("summary_message_id", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ai_conversations", "summary_message_id")
+    op.drop_column("ai_conversations", "summary")
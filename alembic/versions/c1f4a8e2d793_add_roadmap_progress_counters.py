@@ -0,0 +1,44 @@
+"""add roadmap progress counters
+
+Revision ID: c1f4a8e2d793
+Revises: b4e8c2d6f051
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c1f4a8e2d793"
+down_revision: Union[str, Sequence[str], None] = "b4e8c2d6f051"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("roadmaps", sa.Column("tasks_total", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("roadmaps", sa.Column("tasks_completed", sa.Integer(), server_default="0", nullable=False))
+    op.execute(
+        """
+        UPDATE roadmaps AS r
+        SET tasks_total = counts.total,
+            tasks_completed = counts.done,
+            completed = counts.total > 0 AND counts.done = counts.total
+        FROM (
+            SELECT roadmap_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE completed) AS done
+            FROM tasks
+            GROUP BY roadmap_id
+        ) AS counts
+        WHERE counts.roadmap_id = r.roadmap_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("roadmaps", "tasks_completed")
+    op.drop_column("roadmaps", "tasks_total")
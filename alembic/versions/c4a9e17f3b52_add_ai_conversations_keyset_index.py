@@ -0,0 +1,30 @@
+"""add ai conversations keyset index
+
+Revision ID: c4a9e17f3b52
+Revises: b71e2c4d9a01
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a9e17f3b52"
+down_revision: Union[str, Sequence[str], None] = "b71e2c4d9a01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_ai_conversations_user_id_updated_at",
+        "ai_conversations",
+        ["user_id", "updated_at", "conversation_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_conversations_user_id_updated_at", table_name="ai_conversations")
@@ -0,0 +1,54 @@
+"""curated roadmap templates
+
+Revision ID: c7e2a9f4d381
+Revises: b6e1f3a8c472
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e2a9f4d381"
+down_revision: Union[str, Sequence[str], None] = "b6e1f3a8c472"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Шаблоны, скопированные из роадмапов пользователей, содержат чужие данные:
+    # в библиотеке остаются только курируемые шаблоны без владельца.
+    op.execute("DELETE FROM roadmap_templates WHERE source <> 'curated'")
+    op.drop_column("roadmap_templates", "source_roadmap_id")
+    for column in ("created_at", "updated_at"):
+        op.execute(f"UPDATE roadmap_templates SET {column} = now() WHERE {column} IS NULL")
+        op.alter_column(
+            "roadmap_templates",
+            column,
+            existing_type=sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        )
+
+
+def downgrade() -> None:
+    for column in ("created_at", "updated_at"):
+        op.alter_column(
+            "roadmap_templates",
+            column,
+            existing_type=sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=None,
+        )
+    op.add_column("roadmap_templates", sa.Column("source_roadmap_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "roadmap_templates_source_roadmap_id_fkey",
+        "roadmap_templates",
+        "roadmaps",
+        ["source_roadmap_id"],
+        ["roadmap_id"],
+        ondelete="SET NULL",
+    )
@@ -0,0 +1,43 @@
+"""add task rank
+
+Revision ID: d5a9b3e7f412
+Revises: c1f4a8e2d793
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a9b3e7f412"
+down_revision: Union[str, Sequence[str], None] = "c1f4a8e2d793"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tasks",
+        sa.Column("rank", sa.String(length=64, collation="C"), server_default="", nullable=False),
+    )
+    op.drop_index("ix_tasks_roadmap_id_order_index", table_name="tasks")
+    op.create_index(
+        "ix_tasks_roadmap_id_order_index_rank",
+        "tasks",
+        ["roadmap_id", "order_index", "rank"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_roadmap_id_order_index_rank", table_name="tasks")
+    op.create_index(
+        "ix_tasks_roadmap_id_order_index",
+        "tasks",
+        ["roadmap_id", "order_index"],
+        unique=False,
+    )
+    op.drop_column("tasks", "rank")
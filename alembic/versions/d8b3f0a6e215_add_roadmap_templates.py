@@ -0,0 +1,51 @@
+"""add roadmap templates
+
+Revision ID: d8b3f0a6e215
+Revises: c4a9e17f3b52
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d8b3f0a6e215"
+down_revision: Union[str, Sequence[str], None] = "c4a9e17f3b52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_table(
+        "roadmap_templates",
+        sa.Column("template_id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("normalized_title", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("tasks", sa.JSON(), nullable=False),
+        sa.Column("source", sa.String(length=20), nullable=False),
+        sa.Column("source_roadmap_id", sa.Integer(), nullable=True),
+        sa.Column("usage_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["source_roadmap_id"], ["roadmaps.roadmap_id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("template_id"),
+        sa.UniqueConstraint("normalized_title"),
+    )
+    op.create_index(
+        "ix_roadmap_templates_title_trgm",
+        "roadmap_templates",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_roadmap_templates_title_trgm", table_name="roadmap_templates")
+    op.drop_table("roadmap_templates")
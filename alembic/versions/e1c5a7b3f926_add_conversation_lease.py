@@ -0,0 +1,28 @@
+"""add conversation lease
+
+Revision ID: e1c5a7b3f926
+Revises: c7e2a9f4d381
+Create Date: 2026-10-21 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1c5a7b3f926"
+down_revision: Union[str, Sequence[str], None] = "c7e2a9f4d381"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("ai_conversations", sa.Column("busy_until", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("ai_conversations", sa.Column("busy_token", sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ai_conversations", "busy_token")
+    op.drop_column("ai_conversations", "busy_until")
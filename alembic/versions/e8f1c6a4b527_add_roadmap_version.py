@@ -0,0 +1,26 @@
+"""add roadmap version
+
+Revision ID: e8f1c6a4b527
+Revises: d5a9b3e7f412
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8f1c6a4b527"
+down_revision: Union[str, Sequence[str], None] = "d5a9b3e7f412"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("roadmaps", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("roadmaps", "version")
@@ -0,0 +1,42 @@
+"""add roadmap events
+
+Revision ID: f4c2a9d7e183
+Revises: e8f1c6a4b527
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f4c2a9d7e183"
+down_revision: Union[str, Sequence[str], None] = "e8f1c6a4b527"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "roadmap_events",
+        sa.Column("event_id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("roadmap_id", sa.Integer(), nullable=False),
+        sa.Column("team_id", sa.Integer(), nullable=True),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("actor_id", sa.Integer(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+    op.create_index("ix_roadmap_events_roadmap_id", "roadmap_events", ["roadmap_id"], unique=False)
+    op.create_index("ix_roadmap_events_created_at", "roadmap_events", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_roadmap_events_created_at", table_name="roadmap_events")
+    op.drop_index("ix_roadmap_events_roadmap_id", table_name="roadmap_events")
+    op.drop_table("roadmap_events")
@@ -1,25 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Security
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, Response, status, Security
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import json
+import logging
 import re
 
-from app.core.database.database import get_db
-from app.services.ai_service.ai_helth import check_ai_health
+from app.core.database.database import AsyncSessionLocal, get_db
+from app.core.settings.settings import settings
+from app.services.ai_service.ai_helth import ai_health_monitor
+from app.services.ai_service.ai_metrics import RequestTimings, ai_metrics
 from app.services.ai_service.ai_chat_roadmap import ai_service
-from app.services.ai_service.ai_history import save_chat, fetch_history, create_conversation
+from app.services.ai_service.circuit_breaker import CircuitOpenError
+from app.services.ai_service.conversation_lock import ConversationBusyError, conversation_locks
+from app.services.ai_service.rate_governor import RateLimitTimeout
+from app.services.ai_service.ai_history import (
+    save_chat,
+    fetch_history,
+    create_conversation,
+    list_conversations,
+    fetch_conversation_messages,
+)
+from app.services.ai_service.ai_batch import save_generated_roadmaps
+from app.services.ai_service.ai_context import load_conversation_context
+from app.services.ai_service.roadmap_diff import apply_task_diff, diff_tasks, due_at_from_offset
+from app.services.ai_service.roadmap_templates import (
+    find_template,
+    mark_template_used,
+    template_to_roadmap,
+)
 from app.services.ai_service.delite_history_in_chat import delete_ai_conversation
+from app.services.ai_service.task_regeneration import regeneration_window
+from app.services.idempotency.idempotency_keys import idempotency_keys
+from app.services.roadmap.roadmap_access import PERMISSION_EDITOR, require_roadmap_access
+from app.services.roadmap.roadmap_events import (
+    EVENT_GOAL_UPDATED,
+    EVENT_ROADMAP_CREATED,
+    EVENT_TASKS_CHANGED,
+    publish_roadmap_event,
+)
+from app.services.roadmap.roadmap_progress import touch_roadmap
+from app.services.roadmap.roadmap_version import roadmap_if_match
+from app.services.roadmap.task_rank import TASK_ORDER
 from app.services.user.get_my_user import get_current_user
 from app.models.user import User
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import selectinload
 from app.models.ai_conversation import AIConversation
 from app.models.goal import Goal
 from app.models.roadmap import Roadmap
 from app.models.task import Task
-from app.schemas.ai_schemas import AIRoadmapRequest, AIRoadmapResponse, RoadmapSaveRequest
+from app.schemas.ai_schemas import (
+    AIBatchRequest,
+    AIConversationListResponse,
+    AIMessageListResponse,
+    AIRoadmapRequest,
+    AIRoadmapResponse,
+    AITaskRegenerateRequest,
+    AITaskRegenerateResponse,
+    RoadmapSaveRequest,
+)
 
 
 router = APIRouter(prefix="/api/v1/ai", tags=["ai"])
+logger = logging.getLogger(__name__)
 
 
 def _extract_deadline_days(prompt: str) -> int | None:
@@ -43,7 +88,24 @@ def _extract_deadline_days(prompt: str) -> int | None:
 @router.get("/health", summary="Проверка доступности AI-сервиса")
 async def ai_health(
 ):
-    return await check_ai_health()
+    health = ai_health_monitor.snapshot()
+    health.update(ai_service.resilience_snapshot())
+    return health
+
+
+@router.get(
+    "/metrics",
+    summary="Метрики AI-сервиса",
+    openapi_extra={"security": [{"Bearer": []}]}
+)
+async def ai_get_metrics(
+    current_user: User = Security(get_current_user),
+):
+    """Счетчики процесса и состояние блокировок бесед — только для вошедших пользователей."""
+    metrics = ai_metrics.snapshot()
+    metrics["resilience"] = ai_service.resilience_snapshot()
+    metrics["conversation_locks"] = conversation_locks.snapshot()
+    return metrics
 
 @router.post(
     "/chat", 
@@ -55,7 +117,56 @@ async def ai_chat(
     request: AIRoadmapRequest,
     current_user: User = Security(get_current_user),
     db: AsyncSession = Depends(get_db),
+    response: Response = None,
+    idempotency_key: Annotated[Optional[str], Header(alias="Idempotency-Key", max_length=255)] = None,
 ):
+    return await idempotency_keys.run(
+        current_user.user_id,
+        idempotency_key,
+        "POST /api/v1/ai/chat",
+        request,
+        lambda: _ai_chat(request, current_user, db, response),
+    )
+
+
+async def _ai_chat(
+    request: AIRoadmapRequest,
+    current_user: User,
+    db: AsyncSession,
+    response: Optional[Response],
+):
+    timings = ai_metrics.start_request()
+    if request.conversation_id is None:
+        return await _run_ai_chat(request, current_user, db, response, timings)
+
+    # Запросы в одной беседе выполняются по очереди: следующий увидит роадмап,
+    # уже обновленный предыдущим, вместо повторной генерации поверх него.
+    wait = settings.AI_CONVERSATION_LOCK_MODE != "reject"
+    try:
+        async with conversation_locks.hold(request.conversation_id, wait=wait):
+            timings.lap("conversation_lock")
+            return await _run_ai_chat(request, current_user, db, response, timings, wait)
+    except ConversationBusyError:
+        timings.finish("conversation_busy")
+        raise _conversation_busy()
+
+
+def _conversation_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Предыдущий запрос в этой беседе еще обрабатывается",
+    )
+
+
+async def _run_ai_chat(
+    request: AIRoadmapRequest,
+    current_user: User,
+    db: AsyncSession,
+    response: Optional[Response],
+    timings: RequestTimings,
+    wait: bool = True,
+):
+    lease = None
     try:
         conversation_history = None
         current_roadmap_context = None
@@ -75,14 +186,10 @@ async def ai_chat(
                     detail="Conversation не найден",
                 )
 
-            history = await fetch_history(db, current_user.user_id)
-            for conv in history:
-                if conv["conversation_id"] == request.conversation_id:
-                    conversation_history = [
-                        {"role": msg["role"], "content": msg["content"]}
-                        for msg in conv["messages"]
-                    ]
-                    break
+            # Аренда фиксируется коммитом перед вызовом провайдера: запросы других
+            # воркеров к этой беседе ждут или получают 409, не оплачивая свой вызов.
+            lease = await conversation_locks.claim(db, conversation.conversation_id, wait)
+            conversation_history = await load_conversation_context(db, conversation)
 
             if conversation.active_roadmap_id is not None:
                 roadmap_stmt = (
@@ -106,16 +213,34 @@ async def ai_chat(
                                 "description": task.description,
                                 "order_index": task.order_index,
                             }
-                            for task in sorted(roadmap.tasks, key=lambda item: item.order_index)
+                            for task in sorted(roadmap.tasks, key=lambda item: (item.order_index, item.rank, item.task_id))
                         ],
                     }
 
-        result = await ai_service.chat(
-            request.prompt,
-            conversation_history=conversation_history,
-            current_roadmap_context=current_roadmap_context,
-            max_deadline_days=max_deadline_days,
-        )
+        result = None
+        template_id = None
+        if request.use_template and conversation is None:
+            template = await find_template(db, request.prompt)
+            ai_metrics.incr("cache.template_hit" if template is not None else "cache.template_miss")
+            if template is not None:
+                template_id = template.template_id
+                result = template_to_roadmap(template, max_deadline_days)
+        timings.lap("context")
+
+        # Ответ провайдера может занять десятки секунд: завершаем читающую транзакцию,
+        # чтобы соединение вернулось в пул, и сбрасываем identity map — запись ниже
+        # перечитает строки в новой короткой транзакции.
+        await db.commit()
+        db.expunge_all()
+
+        if result is None:
+            result = await ai_service.chat(
+                request.prompt,
+                conversation_history=conversation_history,
+                current_roadmap_context=current_roadmap_context,
+                max_deadline_days=max_deadline_days,
+            )
+            timings.lap("ai")
 
         try:
             ai_text = json.dumps(result, ensure_ascii=False)
@@ -125,6 +250,9 @@ async def ai_chat(
         active_goal_id = None
         active_roadmap_id = None
 
+        if conversation is not None:
+            await conversation_locks.release(db, conversation.conversation_id, lease)
+
         if conversation is not None and conversation.active_roadmap_id is not None:
             roadmap = await db.get(Roadmap, conversation.active_roadmap_id)
             if roadmap is None:
@@ -143,20 +271,30 @@ async def ai_chat(
             goal.title = result.get("goal_title", goal.title)
             goal.description = result.get("goal_description", goal.description)
 
-            existing_tasks_stmt = select(Task).where(Task.roadmap_id == roadmap.roadmap_id)
+            existing_tasks_stmt = select(
+                Task.task_id, Task.title, Task.description, Task.order_index, Task.rank
+            ).where(Task.roadmap_id == roadmap.roadmap_id)
             existing_tasks_result = await db.execute(existing_tasks_stmt)
-            for existing_task in existing_tasks_result.scalars().all():
-                await db.delete(existing_task)
-
-            for idx, task_data in enumerate(result.get("tasks", [])):
-                db.add(
-                    Task(
-                        roadmap_id=roadmap.roadmap_id,
-                        title=task_data.get("title"),
-                        description=task_data.get("description"),
-                        order_index=task_data.get("order_index") if task_data.get("order_index") is not None else idx,
-                    )
-                )
+            task_diff = diff_tasks(existing_tasks_result.mappings().all(), result.get("tasks", []), roadmap.created_at)
+            await apply_task_diff(db, roadmap.roadmap_id, task_diff)
+            await publish_roadmap_event(
+                db,
+                roadmap.roadmap_id,
+                EVENT_GOAL_UPDATED,
+                {"goals_id": goal.goals_id, "title": goal.title, "description": goal.description},
+                current_user.user_id,
+            )
+            await publish_roadmap_event(
+                db,
+                roadmap.roadmap_id,
+                EVENT_TASKS_CHANGED,
+                {
+                    "created": len(task_diff.inserts),
+                    "updated": sorted(item["task_id"] for item in task_diff.updates),
+                    "deleted": sorted(task_diff.deletes),
+                },
+                current_user.user_id,
+            )
 
             active_goal_id = goal.goals_id
             active_roadmap_id = roadmap.roadmap_id
@@ -169,11 +307,11 @@ async def ai_chat(
             db.add(goal)
             await db.flush()
 
-            roadmap = Roadmap(team_id=None, goals_id=goal.goals_id, completed=False)
+            tasks = result.get("tasks", [])
+            roadmap = Roadmap(team_id=None, goals_id=goal.goals_id, completed=False, tasks_total=len(tasks))
             db.add(roadmap)
             await db.flush()
 
-            tasks = result.get("tasks", [])
             for idx, t in enumerate(tasks):
                 title = t.get("title")
                 description = t.get("description")
@@ -183,9 +321,14 @@ async def ai_chat(
                     title=title,
                     description=description,
                     order_index=order_index,
+                    due_at=due_at_from_offset(roadmap.created_at, t.get("deadline_offset_days")),
                 )
                 db.add(task)
 
+            if template_id is not None:
+                await mark_template_used(db, template_id)
+            await publish_roadmap_event(db, roadmap.roadmap_id, EVENT_ROADMAP_CREATED, actor_id=current_user.user_id)
+
             active_goal_id = goal.goals_id
             active_roadmap_id = roadmap.roadmap_id
 
@@ -199,22 +342,243 @@ async def ai_chat(
             active_roadmap_id=active_roadmap_id,
         )
         await db.commit()
-        return AIRoadmapResponse(**result)
-    except ValueError as e:
+        timings.lap("persist")
+        timings.finish("ok")
+        if response is not None:
+            response.headers["Server-Timing"] = timings.server_timing()
+        return AIRoadmapResponse(
+            **result,
+            source="template" if template_id is not None else "ai",
+            template_id=template_id,
+        )
+    except asyncio.CancelledError:
+        if lease is not None:
+            await _abandon_lease(db, request.conversation_id, lease)
+        raise
+    except Exception as e:
+        if lease is not None:
+            await _abandon_lease(db, request.conversation_id, lease)
+        await _raise_ai_error(db, timings, e)
+
+
+async def _abandon_lease(db: AsyncSession, conversation_id: int, lease: str) -> None:
+    """Снимает аренду беседы после ошибки, чтобы следующий запрос не ждал ее истечения."""
+    try:
         await db.rollback()
+        await conversation_locks.release(db, conversation_id, lease, strict=False)
+        await db.commit()
+    except Exception:
+        logger.warning("Failed to release lease of conversation %s", conversation_id, exc_info=True)
+
+
+async def _raise_ai_error(db: AsyncSession, timings: RequestTimings, exc: Exception):
+    await db.rollback()
+    if isinstance(exc, ValueError):
+        timings.finish("invalid_ai_response")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Ошибка синтаксического анализа искусственного интеллекта: {str(e)}"
+            detail=f"Ошибка синтаксического анализа искусственного интеллекта: {str(exc)}"
         )
-    except HTTPException:
-        await db.rollback()
-        raise
-    except Exception:
-        await db.rollback()
+    if isinstance(exc, HTTPException):
+        timings.finish("rejected")
+        raise exc
+    if isinstance(exc, ConversationBusyError):
+        timings.finish("conversation_busy")
+        raise _conversation_busy()
+    if isinstance(exc, CircuitOpenError):
+        timings.finish("circuit_open")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервис искусственного интеллекта временно недоступен",
+            headers={"Retry-After": str(max(int(exc.retry_after), 1))},
+        )
+    if isinstance(exc, RateLimitTimeout):
+        timings.finish("rate_limited")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Сервис искусственного интеллекта временно недоступен"
+            detail="Сервис искусственного интеллекта перегружен, попробуйте позже",
+            headers={"Retry-After": str(max(int(exc.retry_after), 1))},
         )
+    timings.finish("error")
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Сервис искусственного интеллекта временно недоступен"
+    )
+
+
+@router.post(
+    "/roadmaps/{roadmap_id}/tasks/regenerate",
+    response_model=AITaskRegenerateResponse,
+    summary="Перегенерация отдельных задач роадмапа",
+    dependencies=[Depends(roadmap_if_match)],
+    openapi_extra={"security": [{"Bearer": []}]}
+)
+async def ai_regenerate_tasks(
+    request: AITaskRegenerateRequest,
+    roadmap_id: int = Path(..., ge=1),
+    current_user: User = Security(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    response: Response = None,
+):
+    timings = ai_metrics.start_request()
+    try:
+        await require_roadmap_access(db, int(current_user.user_id), roadmap_id, PERMISSION_EDITOR)
+        goal = (
+            await db.execute(
+                select(Goal.title, Goal.description)
+                .join(Roadmap, Roadmap.goals_id == Goal.goals_id)
+                .where(Roadmap.roadmap_id == roadmap_id)
+            )
+        ).one()
+        tasks = (
+            await db.execute(
+                select(Task.task_id, Task.title, Task.description, Task.order_index)
+                .where(Task.roadmap_id == roadmap_id)
+                .order_by(*TASK_ORDER)
+            )
+        ).mappings().all()
+
+        task_ids = set(request.task_ids)
+        window = regeneration_window(tasks, task_ids)
+        if sum(1 for _, _, selected in window if selected) != len(task_ids):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена")
+        timings.lap("context")
+
+        # Как и в ai_chat, соединение не удерживается на время ответа провайдера.
+        await db.commit()
+
+        regenerated = await ai_service.regenerate_tasks(request.prompt, goal.title, goal.description, window)
+        timings.lap("ai")
+
+        selected = [task for _, task, is_selected in window if is_selected]
+        rows = [
+            {"task_id": task["task_id"], **values}
+            for task, values in zip(selected, regenerated)
+        ]
+        await db.execute(update(Task), rows)
+        await touch_roadmap(db, roadmap_id)
+        await publish_roadmap_event(
+            db,
+            roadmap_id,
+            EVENT_TASKS_CHANGED,
+            {"created": 0, "updated": sorted(row["task_id"] for row in rows), "deleted": []},
+            current_user.user_id,
+        )
+        await db.commit()
+        timings.lap("persist")
+        timings.finish("ok")
+        ai_metrics.incr("tasks.regenerated", len(rows))
+        if response is not None:
+            response.headers["Server-Timing"] = timings.server_timing()
+        return AITaskRegenerateResponse(
+            roadmap_id=roadmap_id,
+            tasks=[
+                {**row, "order_index": task["order_index"]}
+                for task, row in zip(selected, rows)
+            ],
+        )
+    except Exception as e:
+        await _raise_ai_error(db, timings, e)
+
+
+def _ndjson(item: Dict[str, Any]) -> str:
+    return json.dumps(item, ensure_ascii=False) + "\n"
+
+
+def _batch_error_detail(exc: Exception) -> str:
+    if isinstance(exc, ValueError):
+        return f"Ошибка синтаксического анализа искусственного интеллекта: {str(exc)}"
+    return "Сервис искусственного интеллекта временно недоступен"
+
+
+async def _generate_batch_item(index: int, prompt: str, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        try:
+            result = await ai_service.chat(prompt, max_deadline_days=_extract_deadline_days(prompt))
+            return index, AIRoadmapResponse(**result).model_dump(), None
+        except Exception as exc:
+            logger.warning("Batch item %s failed: %s", index, exc)
+            return index, None, _batch_error_detail(exc)
+
+
+async def _persist_batch_chunk(user_id: int, chunk: List[tuple]) -> List[Dict[str, Any]]:
+    try:
+        with ai_metrics.phase("batch_persist"):
+            async with AsyncSessionLocal() as db:
+                saved = await save_generated_roadmaps(db, user_id, chunk)
+                await db.commit()
+    except Exception:
+        logger.exception("Failed to persist batch chunk")
+        ai_metrics.incr("batch.items_failed", len(chunk))
+        return [
+            {"index": index, "status": "error", "error": "Не удалось сохранить роадмап"}
+            for index, _ in chunk
+        ]
+    ai_metrics.incr("batch.items_ok", len(saved))
+    return [{**item, "status": "ok"} for item in saved]
+
+
+async def _run_batch(user_id: int, prompts: List[str]) -> AsyncIterator[str]:
+    """Отдает результаты по мере готовности.
+
+    Элементы, готовые к одному моменту, сохраняются вместе пачками до
+    ``AI_BATCH_CHUNK_SIZE``; готовый элемент не ждет, пока наберется пачка.
+    """
+    semaphore = asyncio.Semaphore(max(settings.AI_BATCH_CONCURRENCY, 1))
+    chunk_size = max(settings.AI_BATCH_CHUNK_SIZE, 1)
+    pending = {
+        asyncio.create_task(_generate_batch_item(idx, prompt, semaphore))
+        for idx, prompt in enumerate(prompts)
+    }
+    succeeded = failed = 0
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            ready: List[tuple] = []
+            for index, result, error in sorted(job.result() for job in done):
+                if error is not None:
+                    failed += 1
+                    ai_metrics.incr("batch.items_failed")
+                    yield _ndjson({"index": index, "status": "error", "error": error})
+                    continue
+                ready.append((index, result))
+
+            for start in range(0, len(ready), chunk_size):
+                for item in await _persist_batch_chunk(user_id, ready[start:start + chunk_size]):
+                    succeeded += item["status"] == "ok"
+                    failed += item["status"] != "ok"
+                    yield _ndjson(item)
+        yield _ndjson({"status": "done", "total": len(prompts), "succeeded": succeeded, "failed": failed})
+    finally:
+        for job in pending:
+            job.cancel()
+
+
+@router.post(
+    "/chat/batch",
+    summary="Пакетная генерация roadmap от AI",
+    response_class=StreamingResponse,
+    openapi_extra={"security": [{"Bearer": []}]},
+)
+async def ai_chat_batch(
+    request: AIBatchRequest,
+    current_user: User = Security(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Генерирует роадмапы для нескольких целей и возвращает NDJSON по мере готовности.
+
+    Каждая строка — результат одного элемента (``index``, ``status``, ``roadmap_id``
+    или ``error``), последняя строка — итог со ``status: done``.
+    """
+    user_id = current_user.user_id
+    prompts = [item.prompt for item in request.items]
+    # Сессия запроса живет до конца потока: отдаем соединение пулу сразу,
+    # сохранение идет в собственных сессиях.
+    await db.commit()
+    return StreamingResponse(
+        _run_batch(user_id, prompts),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.get("/history", summary="История переписки с AI", openapi_extra={"security": [{"Bearer": []}]})
@@ -235,16 +599,41 @@ async def ai_create_conversation(
     return {"conversation_id": conversation_id}
 
 
-@router.get("/conversations", summary="Список чатов пользователя", openapi_extra={"security": [{"Bearer": []}]})
+@router.get(
+    "/conversations",
+    response_model=AIConversationListResponse,
+    summary="Список чатов пользователя",
+    openapi_extra={"security": [{"Bearer": []}]},
+)
 async def ai_list_conversations(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
     current_user: User = Security(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    history = await fetch_history(db, current_user.user_id)
-    return [
-        {"conversation_id": c["conversation_id"], "created_at": c["created_at"], "updated_at": c["updated_at"]}
-        for c in history
-    ]
+    return await list_conversations(db, current_user.user_id, limit=limit, cursor=cursor)
+
+
+@router.get(
+    "/conversations/{conversation_id}/messages",
+    response_model=AIMessageListResponse,
+    summary="Сообщения чата с AI",
+    openapi_extra={"security": [{"Bearer": []}]},
+)
+async def ai_list_conversation_messages(
+    conversation_id: int = Path(..., gt=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Курсор более старых сообщений"),
+    current_user: User = Security(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await fetch_conversation_messages(
+        db,
+        current_user.user_id,
+        conversation_id,
+        limit=limit,
+        cursor=cursor,
+    )
 
 
 @router.delete(
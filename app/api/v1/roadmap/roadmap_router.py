@@ -1,17 +1,26 @@
 from app.services.roadmap.view_all_roadmaps_team import get_team_roadmaps
 from app.services.roadmap.share_my_roadmap import share_roadmap_with_team
-from app.services.roadmap.copy_roadmap import copy_roadmap
+from app.services.roadmap.copy_roadmap import copy_roadmap, copy_roadmap_to_users
 from app.services.roadmap.get_team_available_roadmaps import get_team_available_roadmaps
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, status, Security, Path
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status, Security, Path
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database.database import get_db
-from app.schemas.roadmap import RoadmapResponse, RoadmapsListResponse, TaskResponse
+from app.schemas.roadmap import AgendaPageResponse, RoadmapsPageResponse, TaskBatchRequest, TaskBatchResponse, TaskMoveRequest, TaskResponse
 from app.schemas.goal import GoalUpdate
 from app.services.roadmap.get_all_roadmap import get_user_roadmaps
 from app.services.roadmap.get_all_task import get_tasks_for_roadmap
+from app.core.conditional import etag_matches, not_modified
+from app.services.roadmap.roadmap_access import require_roadmap_access
+from app.services.roadmap.roadmap_events import roadmap_event_hub
+from app.services.roadmap.roadmap_version import roadmap_etag, roadmap_if_match
+from app.services.roadmap.roadmap_listing import RoadmapListParams, roadmap_list_params
+from app.services.roadmap.task_agenda import AgendaParams, agenda_params, list_agenda_page
+from app.services.roadmap.task_batch import apply_task_batch
+from app.services.roadmap.task_rank import move_task
 from app.services.roadmap.task_service import (
     create_task_for_roadmap,
     update_task_for_roadmap,
@@ -20,15 +29,13 @@ from app.services.roadmap.task_service import (
 )
 from app.services.roadmap.delete_one_roadmap import delete_user_roadmap
 from app.services.roadmap.rename_goals import update_goal_in_roadmap
-from app.models.roadmap import Roadmap
-from app.models.task import Task
 from app.services.user.get_my_user import get_current_user
 from app.models.user import User
 from app.schemas.roadmap import TaskCreate, TaskUpdate
-from app.schemas.roadmap import TaskCreate, TaskUpdate
 from app.services.roadmap.create_roadmap_and_task import create_roadmap_manual
-from pydantic import Field
-from typing import List, Optional
+from app.services.idempotency.idempotency_keys import idempotency_keys
+from pydantic import Field, model_validator
+from typing import Annotated, List, Optional
 
 router = APIRouter(prefix="/api/v1/roadmaps", tags=["roadmaps"])
 security = HTTPBearer()
@@ -36,17 +43,58 @@ security = HTTPBearer()
 
 @router.get(
     "/my-roadmaps",
-    response_model=RoadmapsListResponse,
+    response_model=RoadmapsPageResponse,
+    response_model_exclude_unset=True,
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def get_my_roadmaps(
     credentials: HTTPAuthorizationCredentials = Security(security),
-    roadmaps: list[Roadmap] = Depends(get_user_roadmaps)
+    page: dict = Depends(get_user_roadmaps)
 ):
-    
-    return RoadmapsListResponse(
-        roadmaps=roadmaps,
-        total=len(roadmaps)
+    return page
+
+
+@router.get(
+    "/agenda",
+    response_model=AgendaPageResponse,
+    summary="Предстоящие и просроченные задачи",
+    openapi_extra={"security": [{"Bearer": []}]}
+)
+async def get_agenda(
+    params: AgendaParams = Depends(agenda_params),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await list_agenda_page(db, int(current_user.user_id), params)
+
+
+@router.get(
+    "/events",
+    summary="Лента изменений доступных роадмапов",
+    response_class=StreamingResponse,
+    openapi_extra={"security": [{"Bearer": []}]}
+)
+async def stream_roadmap_events(
+    roadmap_id: Optional[int] = Query(None, gt=0, description="Только события этого роудмапа"),
+    cursor: Optional[int] = Query(None, ge=0, description="Номер последнего полученного события"),
+    last_event_id: Annotated[Optional[str], Header(alias="Last-Event-ID")] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Server-Sent Events об изменениях задач и целей роадмапов пользователя и его команд.
+
+    ``id`` каждого события — курсор: переподключение с ``Last-Event-ID`` (или
+    ``cursor``) досылает пропущенные события, поэтому опрашивать роадмапы не нужно.
+    """
+    if cursor is None and last_event_id:
+        if not last_event_id.isdigit():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный Last-Event-ID")
+        cursor = int(last_event_id)
+    stream = await roadmap_event_hub.open_stream(db, int(current_user.user_id), cursor, roadmap_id)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -56,43 +104,55 @@ async def get_my_roadmaps(
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def get_tasks_by_roadmap(
+    response: Response,
     roadmap_id: int = Path(..., gt=0, description="ID роудмапа"),
+    if_none_match: Annotated[Optional[str], Header(alias="If-None-Match")] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    # Проверка доступа запоминается в сессии, поэтому повторный опрос без
+    # изменений стоит одного запроса к роадмапу.
+    grant = await require_roadmap_access(db, int(current_user.user_id), roadmap_id)
+    etag = roadmap_etag(roadmap_id, grant.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     tasks = await get_tasks_for_roadmap(db, int(current_user.user_id), roadmap_id)
     return tasks
 
 @router.get(
     "/team/{team_id}",
-    response_model=RoadmapsListResponse,
+    response_model=RoadmapsPageResponse,
+    response_model_exclude_unset=True,
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def get_roadmaps_by_team(
     team_id: int = Path(..., gt=0, description="ID команды"),
+    params: RoadmapListParams = Depends(roadmap_list_params),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    roadmaps = await get_team_roadmaps(db, team_id)
-    return RoadmapsListResponse(roadmaps=roadmaps, total=len(roadmaps))
+    return await get_team_roadmaps(db, team_id, int(current_user.user_id), params)
 
 @router.get(
     "/team/{team_id}/available",
-    response_model=RoadmapsListResponse,
+    response_model=RoadmapsPageResponse,
+    response_model_exclude_unset=True,
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def get_available_roadmaps(
     team_id: int = Path(..., gt=0, description="ID команды"),
+    params: RoadmapListParams = Depends(roadmap_list_params),
     credentials: HTTPAuthorizationCredentials = Security(security),
     db: AsyncSession = Depends(get_db),
 ):
-    roadmaps = await get_team_available_roadmaps(team_id, credentials, db)
-    return RoadmapsListResponse(roadmaps=roadmaps, total=len(roadmaps))
+    return await get_team_available_roadmaps(team_id, credentials, db, params)
 
 @router.post(
     "/{roadmap_id}/tasks",
     response_model=TaskResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(roadmap_if_match)],
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def create_task(
@@ -108,6 +168,7 @@ async def create_task(
         title=task_data.title,
         description=task_data.description,
         order_index=task_data.order_index,
+        due_at=task_data.due_at,
     )
     return task
 
@@ -137,13 +198,74 @@ async def copy_roadmap_to_user(
     roadmap_id: int = Path(..., gt=0, description="ID роудмапа для копирования"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    idempotency_key: Annotated[Optional[str], Header(alias="Idempotency-Key", max_length=255)] = None,
 ):
-    result = await copy_roadmap(db, current_user.user_id, roadmap_id)
-    return result
+    return await idempotency_keys.run(
+        current_user.user_id,
+        idempotency_key,
+        f"POST /api/v1/roadmaps/{roadmap_id}/copy",
+        None,
+        lambda: copy_roadmap(db, current_user.user_id, roadmap_id),
+    )
+
+@router.patch(
+    "/{roadmap_id}/tasks:batch",
+    response_model=TaskBatchResponse,
+    dependencies=[Depends(roadmap_if_match)],
+    openapi_extra={"security": [{"Bearer": []}]}
+)
+async def batch_tasks(
+    payload: TaskBatchRequest,
+    roadmap_id: int = Path(..., gt=0),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    tasks = await apply_task_batch(db, int(current_user.user_id), roadmap_id, payload.operations)
+    return {"tasks": tasks}
+
+
+class BulkCopyRequest(BaseModel):
+    user_ids: Optional[List[int]] = Field(None, min_length=1, max_length=500, description="Получатели копий")
+    team_id: Optional[int] = Field(None, gt=0, description="Скопировать всем участникам команды")
+    skip_existing: bool = Field(True, description="Не копировать тем, у кого копия уже есть")
+
+    @model_validator(mode="after")
+    def _one_target(self):
+        if (self.user_ids is None) == (self.team_id is None):
+            raise ValueError("Укажите либо user_ids, либо team_id")
+        return self
+
+@router.post(
+    "/{roadmap_id}/copy-bulk",
+    response_model=dict,
+    openapi_extra={"security": [{"Bearer": []}]}
+)
+async def copy_roadmap_bulk(
+    payload: BulkCopyRequest,
+    roadmap_id: int = Path(..., gt=0, description="ID роудмапа для копирования"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Annotated[Optional[str], Header(alias="Idempotency-Key", max_length=255)] = None,
+):
+    return await idempotency_keys.run(
+        current_user.user_id,
+        idempotency_key,
+        f"POST /api/v1/roadmaps/{roadmap_id}/copy-bulk",
+        payload,
+        lambda: copy_roadmap_to_users(
+            db,
+            current_user.user_id,
+            roadmap_id,
+            user_ids=payload.user_ids,
+            team_id=payload.team_id,
+            skip_existing=payload.skip_existing,
+        ),
+    )
 
 @router.put(
     "/{roadmap_id}/tasks/{task_id}",
     response_model=TaskResponse,
+    dependencies=[Depends(roadmap_if_match)],
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def update_task(
@@ -153,14 +275,31 @@ async def update_task(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    data = task_data.model_dump(exclude_none=True)
+    data = task_data.model_dump(exclude_unset=True)
     task = await update_task_for_roadmap(db, int(current_user.user_id), roadmap_id, task_id, data)
     return task
 
 
+@router.patch(
+    "/{roadmap_id}/tasks/{task_id}/move",
+    response_model=TaskResponse,
+    dependencies=[Depends(roadmap_if_match)],
+    openapi_extra={"security": [{"Bearer": []}]}
+)
+async def move_roadmap_task(
+    payload: TaskMoveRequest,
+    roadmap_id: int = Path(..., gt=0),
+    task_id: int = Path(..., gt=0),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await move_task(db, int(current_user.user_id), roadmap_id, task_id, payload.before, payload.after)
+
+
 @router.delete(
     "/{roadmap_id}/tasks/{task_id}",
     response_model=dict,
+    dependencies=[Depends(roadmap_if_match)],
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def delete_task(
@@ -176,6 +315,7 @@ async def delete_task(
 @router.patch(
     "/{roadmap_id}/tasks/{task_id}/complete",
     response_model=TaskResponse,
+    dependencies=[Depends(roadmap_if_match)],
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def set_task_complete(
@@ -192,6 +332,7 @@ async def set_task_complete(
 @router.delete(
     "/{roadmap_id}",
     response_model=dict,
+    dependencies=[Depends(roadmap_if_match)],
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def delete_roadmap(
@@ -207,6 +348,7 @@ async def delete_roadmap(
 @router.put(
     "/{roadmap_id}/goal",
     response_model=dict,
+    dependencies=[Depends(roadmap_if_match)],
     openapi_extra={"security": [{"Bearer": []}]}
 )
 async def update_goal(
@@ -243,13 +385,20 @@ async def create_roadmap(
     payload: RoadmapCreate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    idempotency_key: Annotated[Optional[str], Header(alias="Idempotency-Key", max_length=255)] = None,
 ):
-    result = await create_roadmap_manual(
-        db=db,
-        user_id=int(current_user.user_id),
-        title=payload.title,
-        description=payload.description,
-        tasks=[t.model_dump() for t in (payload.tasks or [])],
-        team_id=payload.team_id,
+    return await idempotency_keys.run(
+        int(current_user.user_id),
+        idempotency_key,
+        "POST /api/v1/roadmaps",
+        payload,
+        lambda: create_roadmap_manual(
+            db=db,
+            user_id=int(current_user.user_id),
+            title=payload.title,
+            description=payload.description,
+            tasks=[t.model_dump() for t in (payload.tasks or [])],
+            team_id=payload.team_id,
+        ),
+        status_code=status.HTTP_201_CREATED,
     )
-    return result
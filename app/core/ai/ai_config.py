@@ -38,5 +38,100 @@ GENERATION_CONFIG = {
     "max_tokens": 1500,
 }
 
+# JSON Schema ответа для провайдеров с поддержкой structured output.
+ROADMAP_JSON_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["goal_title", "goal_description", "tasks"],
+    "properties": {
+        "goal_title": {"type": "string"},
+        "goal_description": {"type": "string"},
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["title", "description", "order_index", "deadline_offset_days"],
+                "properties": {
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "order_index": {"type": "integer"},
+                    "deadline_offset_days": {"type": "integer"},
+                },
+            },
+        },
+    },
+}
+
+TASK_REGENERATION_PROMPT = """Ты - профессиональный coach по планированию целей. Пользователь хочет переделать только отдельные задачи своего роудмапа.
+
+Перепиши ТОЛЬКО задачи, отмеченные [ПЕРЕДЕЛАТЬ], с учетом пожелания пользователя. Остальные задачи даны для контекста, их не возвращай. Пропущенные задачи обозначены "…".
+
+Формат ответа - только валидный JSON:
+{
+  "tasks": [
+    {"title": "Название действия", "description": "Конкретное описание что делать"}
+  ]
+}
+
+ПРАВИЛА:
+1. Только JSON в ответе. Никакого текста.
+2. Задач в ответе ровно столько же и в том же порядке, сколько отмечено [ПЕРЕДЕЛАТЬ]
+3. Задачи конкретные, выполнимые и не повторяют соседние"""
+
+# JSON Schema ответа при частичной перегенерации задач.
+TASKS_JSON_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["tasks"],
+    "properties": {
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["title", "description"],
+                "properties": {
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                },
+            },
+        },
+    },
+}
+
+# Частичная перегенерация: сколько соседних задач с каждой стороны отдаем как контекст
+# и сколько токенов ответа выделяем на одну задачу.
+TASK_REGENERATION_MAX_TASKS = 5
+TASK_REGENERATION_NEIGHBOURS = 2
+TASK_REGENERATION_TOKENS_PER_TASK = 200
+TASK_REGENERATION_CONTEXT_MAX_CHARS = 300
+
+BATCH_MAX_ITEMS = 50
+
 MAX_RETRIES = 2
 RETRY_DELAY = 0.5
+
+# Повторы при 429/5xx и сетевых ошибках: экспоненциальная задержка с джиттером.
+HTTP_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_MAX = 8.0
+RETRY_AFTER_MAX = 20.0
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RECOVERY_TIMEOUT = 30.0
+BREAKER_HALF_OPEN_MAX_CALLS = 1
+
+# Хеджирование: дублирующий запрос, если первый дольше выбранного перцентиля задержки.
+HEDGE_LATENCY_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+# Размер окна последних замеров для перцентилей в /ai/metrics.
+METRICS_WINDOW = 500
+
+# Грубая оценка токенов без токенизатора: кириллица в среднем ~3 символа на токен.
+CHARS_PER_TOKEN = 3
+MESSAGE_TOKEN_OVERHEAD = 4
+SUMMARY_COMPACTION_BATCH = 50
+SUMMARY_LINE_MAX_CHARS = 200
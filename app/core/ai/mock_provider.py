@@ -0,0 +1,212 @@
+"""Локальный OpenAI-совместимый провайдер для нагрузочных тестов AI-маршрутов.
+
+Запуск: ``uvicorn app.core.ai.mock_provider:app --port 8100`` и
+``PROXYAPI_BASE_URL=http://localhost:8100/v1``. Поведение настраивается
+переменными окружения с префиксом ``MOCK_LLM_`` и, для отдельного запроса,
+заголовками ``X-Mock-Latency-Ms``, ``X-Mock-Status`` и ``X-Mock-Malformed``.
+"""
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ConfigDict
+from pydantic_settings import BaseSettings
+
+from app.core.ai.ai_config import CHARS_PER_TOKEN
+from app.services.ai_service.task_regeneration import REGENERATE_MARKER
+
+
+class MockProviderSettings(BaseSettings):
+    LATENCY_DISTRIBUTION: str = "lognormal"
+    LATENCY_MS: float = 800.0
+    LATENCY_JITTER_MS: float = 300.0
+    ERROR_RATE: float = 0.0
+    ERROR_STATUS: int = 503
+    RETRY_AFTER_SECONDS: Optional[int] = None
+    MALFORMED_RATE: float = 0.0
+    TASKS_COUNT: int = 6
+    STREAM_CHUNK_CHARS: int = 40
+    STREAM_CHUNK_DELAY_MS: float = 20.0
+    SEED: Optional[int] = None
+
+    model_config = ConfigDict(env_prefix="MOCK_LLM_", extra="ignore")
+
+
+mock_settings = MockProviderSettings()
+_random = random.Random(mock_settings.SEED)
+
+MALFORMED_VARIANTS = ("fenced", "trailing_comma", "prose", "truncated")
+
+
+def sample_latency(config: MockProviderSettings = mock_settings) -> float:
+    """Задержка ответа в секундах согласно выбранному распределению."""
+    mean = max(config.LATENCY_MS, 0.0)
+    jitter = max(config.LATENCY_JITTER_MS, 0.0)
+    distribution = config.LATENCY_DISTRIBUTION.lower()
+
+    if distribution == "fixed" or mean == 0:
+        value = mean
+    elif distribution == "uniform":
+        value = _random.uniform(mean - jitter, mean + jitter)
+    elif distribution == "normal":
+        value = _random.gauss(mean, jitter)
+    elif distribution == "exponential":
+        value = _random.expovariate(1 / mean)
+    else:
+        sigma = math.sqrt(math.log1p((jitter / mean) ** 2))
+        value = _random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+    return max(value, 0.0) / 1000
+
+
+def build_roadmap(prompt: str, tasks_count: int) -> Dict[str, Any]:
+    topic = " ".join(prompt.split())[:80] or "цель"
+    return {
+        "goal_title": f"План: {topic}",
+        "goal_description": f"Тестовый план, сгенерированный mock-провайдером для запроса «{topic}».",
+        "tasks": [
+            {
+                "title": f"Шаг {idx + 1}: {topic}",
+                "description": f"Описание шага {idx + 1}",
+                "order_index": idx,
+                "deadline_offset_days": (idx + 1) * 7,
+            }
+            for idx in range(tasks_count)
+        ],
+    }
+
+
+def build_tasks(count: int) -> Dict[str, Any]:
+    return {
+        "tasks": [
+            {"title": f"Новый шаг {idx + 1}", "description": f"Переписанное описание шага {idx + 1}"}
+            for idx in range(count)
+        ],
+    }
+
+
+def corrupt_json(content: str, variant: str) -> str:
+    if variant == "fenced":
+        return f"```json\n{content}\n```"
+    if variant == "trailing_comma":
+        return content[:-1].rstrip() + ",}"
+    if variant == "prose":
+        return f"Вот ваш план:\n{content}\nУдачи!"
+    return content[: max(len(content) * 2 // 3, 1)]
+
+
+def _last_user_message(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return str(message.get("content") or "")
+    return ""
+
+
+def _estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(len(str(m.get("content") or "")) // CHARS_PER_TOKEN + 1 for m in messages)
+
+
+def _completion_body(model: str, content: str, prompt_tokens: int) -> Dict[str, Any]:
+    completion_tokens = len(content) // CHARS_PER_TOKEN + 1
+    return {
+        "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+async def _stream_chunks(model: str, content: str):
+    completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+    step = max(mock_settings.STREAM_CHUNK_CHARS, 1)
+    for start in range(0, len(content), step):
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": content[start:start + step]}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+        await asyncio.sleep(mock_settings.STREAM_CHUNK_DELAY_MS / 1000)
+    final = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+    }
+    yield f"data: {json.dumps(final)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+app = FastAPI(title="Mock LLM provider")
+app.state.stats = {"requests": 0, "errors": 0, "malformed": 0, "streams": 0}
+
+
+@app.get("/stats")
+async def stats() -> Dict[str, int]:
+    return app.state.stats
+
+
+@app.post("/chat/completions")
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    stats = app.state.stats
+    stats["requests"] += 1
+    payload = await request.json()
+    messages = payload.get("messages") or []
+    model = payload.get("model") or "mock"
+
+    latency_header = request.headers.get("X-Mock-Latency-Ms")
+    delay = float(latency_header) / 1000 if latency_header else sample_latency()
+    await asyncio.sleep(delay)
+
+    status_header = request.headers.get("X-Mock-Status")
+    if status_header or _random.random() < mock_settings.ERROR_RATE:
+        stats["errors"] += 1
+        headers = {}
+        if mock_settings.RETRY_AFTER_SECONDS is not None:
+            headers["Retry-After"] = str(mock_settings.RETRY_AFTER_SECONDS)
+        return JSONResponse(
+            status_code=int(status_header or mock_settings.ERROR_STATUS),
+            content={"error": {"message": "Injected mock error", "type": "mock_error"}},
+            headers=headers,
+        )
+
+    max_tokens = payload.get("max_tokens")
+    user_message = _last_user_message(messages)
+    if max_tokens is not None and max_tokens <= 1:
+        content = "ok"
+    elif REGENERATE_MARKER in user_message:
+        content = json.dumps(build_tasks(user_message.count(REGENERATE_MARKER)), ensure_ascii=False)
+    else:
+        roadmap = build_roadmap(user_message, mock_settings.TASKS_COUNT)
+        content = json.dumps(roadmap, ensure_ascii=False)
+
+    malformed = request.headers.get("X-Mock-Malformed")
+    if malformed is None and _random.random() < mock_settings.MALFORMED_RATE:
+        malformed = _random.choice(MALFORMED_VARIANTS)
+    if malformed:
+        stats["malformed"] += 1
+        content = corrupt_json(content, malformed)
+
+    if payload.get("stream"):
+        stats["streams"] += 1
+        return StreamingResponse(_stream_chunks(model, content), media_type="text/event-stream")
+    return _completion_body(model, content, _estimate_tokens(messages))
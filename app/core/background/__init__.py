@@ -0,0 +1,4 @@
+"""Background jobs started with the application."""
+from .periodic import PeriodicTask
+
+__all__ = ["PeriodicTask"]
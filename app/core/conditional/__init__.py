@@ -0,0 +1,3 @@
+from .etag import etag_matches, make_etag, not_modified
+
+__all__ = ["make_etag", "etag_matches", "not_modified"]
@@ -0,0 +1,35 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Сильный ETag из значений, однозначно описывающих представление ресурса."""
+    raw = "\x1f".join(str(part) for part in parts)
+    return '"' + hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """Совпадает ли ``etag`` с одним из значений ``If-None-Match``/``If-Match``.
+
+    ``weak=True`` — слабое сравнение (RFC 9110, для ``If-None-Match``): префикс
+    ``W/`` игнорируется; для ``If-Match`` слабые теги не совпадают никогда.
+    """
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            if not weak:
+                continue
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -1,4 +1,5 @@
 """Initialization module for app startup."""
 from .roles import init_team_roles
+from .templates import init_roadmap_templates
 
-__all__ = ["init_team_roles"]
+__all__ = ["init_team_roles", "init_roadmap_templates"]
@@ -0,0 +1,47 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.ai_service.roadmap_templates import refresh_templates
+
+# Курируемые шаблоны: пишутся вручную, не содержат данных пользователей.
+# Сроки — дни от начала, рассчитаны на типичный темп новичка.
+CURATED_TEMPLATES = [
+	{
+		"title": "Пробежать 5 километров",
+		"description": "Подготовиться к непрерывному бегу на 5 км с нуля.",
+		"tasks": [
+			{"title": "Подобрать беговую обувь", "description": "Примерить кроссовки в магазине, ориентируясь на удобство и амортизацию.", "deadline_offset_days": 3},
+			{"title": "Чередовать бег и ходьбу", "description": "Три тренировки в неделю: 1 минута бега, 2 минуты ходьбы, всего 20 минут.", "deadline_offset_days": 14},
+			{"title": "Бегать по 5 минут без остановки", "description": "Увеличивать беговые отрезки, сокращая ходьбу.", "deadline_offset_days": 28},
+			{"title": "Пробежать 20 минут подряд", "description": "Держать разговорный темп, не гнаться за скоростью.", "deadline_offset_days": 42},
+			{"title": "Пробежать 5 км", "description": "Контрольный забег в спокойном темпе.", "deadline_offset_days": 56},
+		],
+	},
+	{
+		"title": "Выучить английский до уровня B1",
+		"description": "Начать свободно общаться на бытовые темы и понимать несложные тексты.",
+		"tasks": [
+			{"title": "Пройти тест на уровень", "description": "Определить текущий уровень по бесплатному онлайн-тесту.", "deadline_offset_days": 2},
+			{"title": "Повторить базовую грамматику", "description": "Времена Present, Past и Future Simple, модальные глаголы.", "deadline_offset_days": 30},
+			{"title": "Набрать словарь 1500 слов", "description": "Учить по 20 слов в день с интервальными повторениями.", "deadline_offset_days": 75},
+			{"title": "Начать разговорную практику", "description": "Заниматься с репетитором или партнёром по обмену раз в неделю.", "deadline_offset_days": 90},
+			{"title": "Смотреть сериалы с английскими субтитрами", "description": "По серии 3 раза в неделю, выписывать незнакомые фразы.", "deadline_offset_days": 120},
+			{"title": "Сдать пробный тест B1", "description": "Проверить все навыки и составить план на слабые места.", "deadline_offset_days": 180},
+		],
+	},
+	{
+		"title": "Научиться программировать на Python",
+		"description": "Освоить основы языка и написать первый собственный проект.",
+		"tasks": [
+			{"title": "Установить Python и редактор", "description": "Python 3 и VS Code или PyCharm Community.", "deadline_offset_days": 1},
+			{"title": "Изучить базовый синтаксис", "description": "Переменные, условия, циклы, функции.", "deadline_offset_days": 14},
+			{"title": "Разобраться со структурами данных", "description": "Списки, словари, множества; решить 20 задач.", "deadline_offset_days": 28},
+			{"title": "Освоить работу с файлами и модулями", "description": "Чтение и запись файлов, импорт, виртуальное окружение.", "deadline_offset_days": 42},
+			{"title": "Написать собственный проект", "description": "Небольшая утилита или бот, код выложить на GitHub.", "deadline_offset_days": 70},
+		],
+	},
+]
+
+
+async def init_roadmap_templates(db: AsyncSession) -> None:
+	await refresh_templates(db, CURATED_TEMPLATES)
+	await db.commit()
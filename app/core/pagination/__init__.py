@@ -0,0 +1,3 @@
+from .cursor import decode_cursor, encode_cursor
+
+__all__ = ["encode_cursor", "decode_cursor"]
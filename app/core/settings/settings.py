@@ -37,7 +37,35 @@ class Settings(BaseSettings):
 
     PROXYAPI_KEY: Optional[str] 
     PROXYAPI_BASE_URL: str
-    AI_MODEL: str 
+    AI_MODEL: str
+    AI_CONTEXT_TOKEN_BUDGET: int = 3000
+    AI_CONTEXT_MAX_MESSAGES: int = 20
+    AI_CONTEXT_SUMMARY_MAX_TOKENS: int = 500
+    AI_HEDGE_ENABLED: bool = False
+    AI_STRUCTURED_OUTPUT: bool = False
+    AI_BATCH_CONCURRENCY: int = 4
+    AI_TEMPLATE_MATCH_THRESHOLD: float = 0.8
+    AI_CONVERSATION_LOCK_MODE: str = "wait"
+    AI_CONVERSATION_LOCK_TIMEOUT: float = 60.0
+    AI_CONVERSATION_LEASE_SECONDS: float = 300.0
+    AI_BATCH_CHUNK_SIZE: int = 10
+    AI_RATE_LIMIT_RPM: int = 0
+    AI_RATE_LIMIT_TPM: int = 0
+    AI_RATE_LIMIT_QUEUE_TIMEOUT: float = 20.0
+    AI_HEALTH_PROBE_INTERVAL_SECONDS: int = 60
+    AI_HEALTH_PASSIVE: bool = True
+    AI_CASSETTE_MODE: str = "off"
+    AI_CASSETTE_DIR: str = "cassettes"
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 60.0
+    IDEMPOTENCY_STALE_SECONDS: int = 300
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 3600
+    TASK_RANK_REBALANCE_INTERVAL_SECONDS: int = 3600
+    ROADMAP_EVENTS_POLL_SECONDS: float = 1.0
+    ROADMAP_EVENTS_HEARTBEAT_SECONDS: int = 15
+    ROADMAP_EVENTS_RETENTION_SECONDS: int = 604800
+    ROADMAP_EVENTS_PURGE_INTERVAL_SECONDS: int = 3600
+    TEAM_PURGE_INTERVAL_SECONDS: int = 60
 
     REFRESH_COOKIE_SAMESITE: Optional[str] = None
     REFRESH_COOKIE_SECURE: Optional[bool] = None
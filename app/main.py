@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from fastapi.staticfiles import StaticFiles
@@ -9,17 +11,43 @@ from app.api.v1.roadmap import roadmap_router
 from app.api.v1.chat.chat_router import router as chat_router
 
 from app.core.settings.settings import settings
-from app.core.init import init_team_roles
+from app.core.init import init_roadmap_templates, init_team_roles
 from app.core.database.database import AsyncSessionLocal
+from app.services.ai_service.ai_helth import ai_health_monitor
+from app.services.idempotency.idempotency_keys import idempotency_keys
+from app.services.roadmap.roadmap_events import roadmap_event_hub
+from app.services.roadmap.task_rank import task_rank_rebalancer
+from app.services.team_service.team_purger import team_purger
 import logging
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger("app")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with AsyncSessionLocal() as db:
+        await init_roadmap_templates(db)
+    ai_health_monitor.start()
+    idempotency_keys.start()
+    task_rank_rebalancer.start()
+    roadmap_event_hub.start()
+    team_purger.start()
+    try:
+        yield
+    finally:
+        await ai_health_monitor.stop()
+        await idempotency_keys.stop()
+        await task_rank_rebalancer.stop()
+        await roadmap_event_hub.stop()
+        await team_purger.stop()
+
+
 app = FastAPI(
     title="TargetLayer API",
     description="Сервис декомпозиции целей с ИИ",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 from fastapi.middleware.cors import CORSMiddleware
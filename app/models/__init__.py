@@ -14,4 +14,7 @@ from .roadmap_copy import RoadmapCopy
 from .chat_participant import ChatParticipant
 from .ai_conversation import AIConversation
 from .ai_message_role import AIMessageRole
-from .ai_message import AIMessage
\ No newline at end of file
+from .ai_message import AIMessage
+from .roadmap_template import RoadmapTemplate
+from .idempotency_key import IdempotencyKey
+from .roadmap_event import RoadmapEvent
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, ForeignKey, DateTime
+from sqlalchemy import Integer, ForeignKey, DateTime, Index, String, Text
 from datetime import datetime
 from typing import List
 
@@ -8,6 +8,9 @@ from .base import Base
 
 class AIConversation(Base):
     __tablename__ = "ai_conversations"
+    __table_args__ = (
+        Index("ix_ai_conversations_user_id_updated_at", "user_id", "updated_at", "conversation_id"),
+    )
 
     conversation_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
@@ -19,6 +22,10 @@ class AIConversation(Base):
     active_roadmap_id: Mapped[int | None] = mapped_column(
         Integer, ForeignKey("roadmaps.roadmap_id", ondelete="SET NULL"), nullable=True, index=True
     )
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    summary_message_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    busy_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    busy_token: Mapped[str | None] = mapped_column(String(32), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
@@ -27,5 +34,5 @@ class AIConversation(Base):
     user: Mapped["User"] = relationship("User", back_populates="ai_conversations")
 
     messages: Mapped[List["AIMessage"]] = relationship(
-        "AIMessage", back_populates="conversation", cascade="all, delete-orphan"
+        "AIMessage", back_populates="conversation", cascade="all, delete-orphan", passive_deletes=True
     )
@@ -14,7 +14,7 @@ class Chat(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     
     team: Mapped["Team"] = relationship("Team", back_populates="chats")
-    messages: Mapped[list["Message"]] = relationship("Message", back_populates="chat", cascade="all, delete-orphan")
+    messages: Mapped[list["Message"]] = relationship("Message", back_populates="chat", cascade="all, delete-orphan", passive_deletes=True)
     participants: Mapped[list["ChatParticipant"]] = relationship(
-        "ChatParticipant", back_populates="chat", cascade="all, delete-orphan"
+        "ChatParticipant", back_populates="chat", cascade="all, delete-orphan", passive_deletes=True
     )
\ No newline at end of file
@@ -19,4 +19,4 @@ class Goal(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     user: Mapped["User"] = relationship("User", back_populates="goals")
-    roadmap: Mapped["Roadmap"] = relationship("Roadmap", back_populates="goal", uselist=False)
\ No newline at end of file
+    roadmap: Mapped["Roadmap"] = relationship("Roadmap", back_populates="goal", uselist=False, passive_deletes=True)
\ No newline at end of file
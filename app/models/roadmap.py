@@ -1,34 +1,46 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer
 from datetime import datetime
 from .base import Base
 
 
 class Roadmap(Base):
     __tablename__ = "roadmaps"
+    __table_args__ = (
+        Index("ix_roadmaps_updated_at_roadmap_id", "updated_at", "roadmap_id"),
+        Index("ix_roadmaps_team_id_updated_at", "team_id", "updated_at", "roadmap_id"),
+    )
 
     roadmap_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     team_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("teams.team_id", ondelete="CASCADE"), nullable=True, index=True)
     goals_id: Mapped[int] = mapped_column(Integer, ForeignKey("goals.goals_id", ondelete="CASCADE"), nullable=False, unique=True)
     completed: Mapped[bool] = mapped_column(Boolean, default=False)
+    tasks_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    tasks_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
     team: Mapped["Team"] = relationship("Team", back_populates="roadmaps")
     goal: Mapped["Goal"] = relationship("Goal", back_populates="roadmap")
-    tasks: Mapped[list["Task"]] = relationship("Task", back_populates="roadmap", cascade="all, delete-orphan")
+    tasks: Mapped[list["Task"]] = relationship(
+        "Task", back_populates="roadmap", cascade="all, delete-orphan", passive_deletes=True
+    )
     access_entries: Mapped[list["RoadmapAccess"]] = relationship(
         "RoadmapAccess",
         back_populates="roadmap",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     source_copies: Mapped[list["RoadmapCopy"]] = relationship(
         "RoadmapCopy",
         foreign_keys="RoadmapCopy.original_roadmap_id",
-        back_populates="original_roadmap"
+        back_populates="original_roadmap",
+        passive_deletes=True,
     )
     copied_from: Mapped[list["RoadmapCopy"]] = relationship(
         "RoadmapCopy",
         foreign_keys="RoadmapCopy.new_roadmap_id",
-        back_populates="new_roadmap"
+        back_populates="new_roadmap",
+        passive_deletes=True,
     )
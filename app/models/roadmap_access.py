@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -6,6 +6,7 @@ from .base import Base
 
 class RoadmapAccess(Base):
     __tablename__ = "roadmap_access"
+    __table_args__ = (UniqueConstraint("roadmap_id", "user_id", name="uq_roadmap_access_roadmap_user"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
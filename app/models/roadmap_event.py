@@ -0,0 +1,23 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import JSON, BigInteger, DateTime, Integer, String
+from datetime import datetime
+
+from .base import Base
+
+
+class RoadmapEvent(Base):
+    __tablename__ = "roadmap_events"
+
+    # Номер события — курсор ленты изменений. Без внешнего ключа на роадмап:
+    # событие об удалении должно пережить сам роадмап.
+    event_id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    roadmap_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    team_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    owner_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    actor_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    payload: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
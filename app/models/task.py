@@ -1,19 +1,31 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, ForeignKey, Boolean, Text, DateTime
+from sqlalchemy import String, Integer, ForeignKey, Boolean, Text, DateTime, Index, text
 from typing import Optional
 from datetime import datetime
 from .base import Base
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_roadmap_id_order_index_rank", "roadmap_id", "order_index", "rank"),
+        # Повестка: только незавершенные задачи со сроком, в порядке срока.
+        Index(
+            "ix_tasks_open_due_at",
+            "due_at",
+            "task_id",
+            postgresql_where=text("completed IS NOT TRUE AND due_at IS NOT NULL"),
+        ),
+    )
     
     task_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     roadmap_id: Mapped[int] = mapped_column(Integer, ForeignKey("roadmaps.roadmap_id", ondelete="CASCADE"), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
     order_index: Mapped[int] = mapped_column(Integer, default=0)
+    rank: Mapped[str] = mapped_column(String(64, collation="C"), nullable=False, default="", server_default="")
     completed: Mapped[bool] = mapped_column(Boolean, default=False)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    due_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     
     roadmap: Mapped["Roadmap"] = relationship("Roadmap", back_populates="tasks")
\ No newline at end of file
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -15,21 +15,26 @@ if TYPE_CHECKING:
 
 class Team(Base):
     __tablename__ = "teams"
+    __table_args__ = (
+        Index("ix_teams_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
     team_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     access_token_type: Mapped[str] = mapped_column(String(32), nullable=False, default="invite")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    # Команда удалена, ее данные удаляет в фоне team_purger.
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     members: Mapped[list["TeamMember"]] = relationship(
-        "TeamMember", back_populates="team", cascade="all, delete-orphan"
+        "TeamMember", back_populates="team", cascade="all, delete-orphan", passive_deletes=True
     )
     roadmaps: Mapped[list["Roadmap"]] = relationship(
-        "Roadmap", back_populates="team", cascade="all, delete-orphan"
+        "Roadmap", back_populates="team", cascade="all, delete-orphan", passive_deletes=True
     )
     chats: Mapped[list["Chat"]] = relationship(
-        "Chat", back_populates="team", cascade="all, delete-orphan"
+        "Chat", back_populates="team", cascade="all, delete-orphan", passive_deletes=True
     )
     access_links: Mapped[list["TeamAccessLink"]] = relationship(
-        "TeamAccessLink", back_populates="team", cascade="all, delete-orphan"
+        "TeamAccessLink", back_populates="team", cascade="all, delete-orphan", passive_deletes=True
     )
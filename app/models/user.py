@@ -18,23 +18,24 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    goals: Mapped[list["Goal"]] = relationship("Goal", back_populates="user", cascade="all, delete-orphan")
-    messages: Mapped[list["Message"]] = relationship("Message", back_populates="user", cascade="all, delete-orphan")
+    goals: Mapped[list["Goal"]] = relationship("Goal", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    messages: Mapped[list["Message"]] = relationship("Message", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     team_memberships: Mapped[list["TeamMember"]] = relationship(
-        "TeamMember", back_populates="user", cascade="all, delete-orphan"
+        "TeamMember", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
     chat_participations: Mapped[list["ChatParticipant"]] = relationship(
-        "ChatParticipant", back_populates="user", cascade="all, delete-orphan"
+        "ChatParticipant", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
     
     ai_conversations: Mapped[list["AIConversation"]] = relationship(
-        "AIConversation", back_populates="user", cascade="all, delete-orphan"
+        "AIConversation", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
     created_team_access_links: Mapped[list["TeamAccessLink"]] = relationship(
-        "TeamAccessLink", back_populates="created_by_user", cascade="all, delete-orphan"
+        "TeamAccessLink", back_populates="created_by_user", cascade="all, delete-orphan", passive_deletes=True
     )
     roadmap_access_entries: Mapped[list["RoadmapAccess"]] = relationship(
         "RoadmapAccess",
         back_populates="user",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
\ No newline at end of file
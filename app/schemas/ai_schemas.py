@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
+from app.core.ai.ai_config import BATCH_MAX_ITEMS, TASK_REGENERATION_MAX_TASKS
+
 
 class AITaskResponse(BaseModel):
     title: str = Field(..., min_length=3, max_length=255)
@@ -16,6 +18,8 @@ class AIRoadmapResponse(BaseModel):
     goal_title: str = Field(..., min_length=3, max_length=255)
     goal_description: Optional[str] = Field(None, max_length=2000)
     tasks: List[AITaskResponse] = Field(..., min_items=1, max_items=20)
+    source: str = Field("ai", description="ai — ответ модели, template — готовый шаблон из библиотеки")
+    template_id: Optional[int] = None
 
     model_config = {"from_attributes": True}
 
@@ -23,10 +27,36 @@ class AIRoadmapResponse(BaseModel):
 class AIRoadmapRequest(BaseModel):
     prompt: str = Field(..., min_length=5, max_length=1000, description="Описание цели")
     conversation_id: Optional[int] = Field(None, description="Идентификатор существующего чата. Если не указан — создастся новый.")
+    use_template: bool = Field(False, description="Ответить курируемым шаблоном без обращения к AI, если название цели совпадает с шаблоном")
 
     model_config = {"from_attributes": True}
 
 
+class AIBatchItem(BaseModel):
+    prompt: str = Field(..., min_length=5, max_length=1000, description="Описание цели")
+
+
+class AIBatchRequest(BaseModel):
+    items: List[AIBatchItem] = Field(..., min_items=1, max_items=BATCH_MAX_ITEMS)
+
+
+class AITaskRegenerateRequest(BaseModel):
+    prompt: str = Field(..., min_length=5, max_length=1000, description="Что изменить в выбранных задачах")
+    task_ids: List[int] = Field(..., min_items=1, max_items=TASK_REGENERATION_MAX_TASKS)
+
+
+class AIRegeneratedTask(BaseModel):
+    task_id: int
+    title: str
+    description: Optional[str] = None
+    order_index: int
+
+
+class AITaskRegenerateResponse(BaseModel):
+    roadmap_id: int
+    tasks: List[AIRegeneratedTask]
+
+
 class RoadmapSaveRequest(BaseModel):
     goal_title: str = Field(..., min_length=3, max_length=255)
     goal_description: Optional[str] = Field(None, max_length=2000)
@@ -50,3 +80,34 @@ class DraftUpdateRequest(BaseModel):
     prompt: str = Field(..., min_length=5, max_length=1000)
 
     model_config = {"from_attributes": True}
+
+
+class AIConversationListItem(BaseModel):
+    conversation_id: int
+    created_at: datetime
+    updated_at: datetime
+    active_roadmap_id: Optional[int] = None
+    message_count: int = 0
+    last_message: Optional[str] = None
+    last_message_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class AIConversationListResponse(BaseModel):
+    conversations: List[AIConversationListItem]
+    next_cursor: Optional[str] = None
+
+
+class AIMessageItem(BaseModel):
+    message_id: int
+    role: Optional[str] = None
+    content: str
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class AIMessageListResponse(BaseModel):
+    messages: List[AIMessageItem]
+    next_cursor: Optional[str] = None
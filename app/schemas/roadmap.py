@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Literal, Optional, Union
 from datetime import datetime
 
 
@@ -10,6 +10,7 @@ class TaskResponse(BaseModel):
     order_index: int
     completed: bool
     completed_at: Optional[datetime] = None
+    due_at: Optional[datetime] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -45,10 +46,46 @@ class RoadmapsListResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class RoadmapListItem(BaseModel):
+    roadmap_id: int
+    team_id: int | None = None
+    goals_id: Optional[int] = None
+    goal: Optional[GoalResponse] = None
+    tasks: Optional[list[TaskResponse]] = None
+    tasks_total: Optional[int] = None
+    tasks_completed: Optional[int] = None
+    completed: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class RoadmapsPageResponse(BaseModel):
+    roadmaps: list[RoadmapListItem]
+    total: int
+    next_cursor: Optional[str] = None
+
+
+class AgendaTask(BaseModel):
+    task_id: int
+    roadmap_id: int
+    team_id: int | None = None
+    goal_title: str
+    title: str
+    description: Optional[str] = None
+    due_at: datetime
+    overdue: bool
+
+
+class AgendaPageResponse(BaseModel):
+    tasks: list[AgendaTask]
+    next_cursor: Optional[str] = None
+
+
 class TaskCreate(BaseModel):
     title: str
     description: Optional[str] = None
     order_index: Optional[int] = 0
+    due_at: Optional[datetime] = None
 
     model_config = ConfigDict()
 
@@ -58,5 +95,53 @@ class TaskUpdate(BaseModel):
     description: Optional[str] = None
     order_index: Optional[int] = None
     completed: Optional[bool] = None
+    due_at: Optional[datetime] = None
+
+    model_config = ConfigDict()
+
+
+class TaskMoveRequest(BaseModel):
+    before: Optional[int] = Field(None, gt=0, description="Задача, которая будет стоять перед перемещаемой")
+    after: Optional[int] = Field(None, gt=0, description="Задача, которая будет стоять после перемещаемой")
+
+
+class TaskBatchCreate(BaseModel):
+    op: Literal["create"]
+    title: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    order_index: Optional[int] = Field(None, description="По умолчанию — в конец списка")
+    due_at: Optional[datetime] = None
+
+
+class TaskBatchUpdate(BaseModel):
+    op: Literal["update"]
+    task_id: int = Field(..., gt=0)
+    title: Optional[str] = Field(None, min_length=1, max_length=255)
+    description: Optional[str] = None
+    completed: Optional[bool] = None
+    due_at: Optional[datetime] = None
+
+
+class TaskBatchDelete(BaseModel):
+    op: Literal["delete"]
+    task_id: int = Field(..., gt=0)
+
+
+class TaskBatchMove(BaseModel):
+    op: Literal["move"]
+    task_id: int = Field(..., gt=0)
+    order_index: int
+
+
+TaskBatchOperation = Annotated[
+    Union[TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete, TaskBatchMove],
+    Field(discriminator="op"),
+]
+
+
+class TaskBatchRequest(BaseModel):
+    operations: list[TaskBatchOperation] = Field(..., min_length=1, max_length=200)
+
 
-    model_config = ConfigDict()
\ No newline at end of file
+class TaskBatchResponse(BaseModel):
+    tasks: list[TaskResponse]
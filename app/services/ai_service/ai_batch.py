@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.task import Task
+from app.services.ai_service.roadmap_diff import due_at_from_offset
+from app.services.roadmap.roadmap_events import EVENT_ROADMAP_CREATED, publish_roadmap_events
+
+
+async def save_generated_roadmaps(
+    db: AsyncSession,
+    user_id: int,
+    results: Sequence[Tuple[int, Dict[str, Any]]],
+) -> List[Dict[str, Any]]:
+    """Сохраняет пачку сгенерированных роадмапов тремя пакетными INSERT.
+
+    ``results`` — пары ``(index, roadmap)`` с уже провалидированными ответами AI.
+    Возвращает по одной записи на элемент в том же порядке. Транзакцией
+    управляет вызывающий код.
+    """
+    if not results:
+        return []
+
+    goal_ids = (
+        await db.execute(
+            insert(Goal).returning(Goal.goals_id, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": user_id,
+                    "title": roadmap["goal_title"],
+                    "description": roadmap.get("goal_description"),
+                }
+                for _, roadmap in results
+            ],
+        )
+    ).scalars().all()
+
+    roadmap_ids = (
+        await db.execute(
+            insert(Roadmap).returning(Roadmap.roadmap_id, sort_by_parameter_order=True),
+            [
+                {
+                    "team_id": None,
+                    "goals_id": goal_id,
+                    "completed": False,
+                    "tasks_total": len(roadmap.get("tasks", [])),
+                }
+                for goal_id, (_, roadmap) in zip(goal_ids, results)
+            ],
+        )
+    ).scalars().all()
+
+    started = datetime.utcnow()
+    task_rows = []
+    for roadmap_id, (_, roadmap) in zip(roadmap_ids, results):
+        for idx, task in enumerate(roadmap.get("tasks", [])):
+            order_index = task.get("order_index")
+            task_rows.append({
+                "roadmap_id": roadmap_id,
+                "title": task.get("title"),
+                "description": task.get("description"),
+                "order_index": order_index if order_index is not None else idx,
+                "due_at": due_at_from_offset(started, task.get("deadline_offset_days")),
+            })
+    if task_rows:
+        await db.execute(insert(Task), task_rows)
+    await publish_roadmap_events(db, roadmap_ids, EVENT_ROADMAP_CREATED, actor_id=user_id)
+
+    return [
+        {
+            "index": index,
+            "goals_id": goal_id,
+            "roadmap_id": roadmap_id,
+            "goal_title": roadmap["goal_title"],
+            "tasks_count": len(roadmap.get("tasks", [])),
+        }
+        for (index, roadmap), goal_id, roadmap_id in zip(results, goal_ids, roadmap_ids)
+    ]
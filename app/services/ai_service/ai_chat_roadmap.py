@@ -1,12 +1,48 @@
+import asyncio
 import logging
 import json
-from typing import Any, Dict, Optional, List
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Optional, List
 import re
 
 import httpx
 
 from app.core.settings.settings import settings
-from app.core.ai.ai_config import SYSTEM_PROMPT, GENERATION_CONFIG, MAX_RETRIES, RETRY_DELAY
+from app.core.ai.ai_config import (
+    SYSTEM_PROMPT,
+    GENERATION_CONFIG,
+    ROADMAP_JSON_SCHEMA,
+    TASKS_JSON_SCHEMA,
+    TASK_REGENERATION_TOKENS_PER_TASK,
+    MAX_RETRIES,
+    RETRY_DELAY,
+    HTTP_MAX_ATTEMPTS,
+    RETRY_BACKOFF_MAX,
+    RETRY_AFTER_MAX,
+    RETRYABLE_STATUS_CODES,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RECOVERY_TIMEOUT,
+    BREAKER_HALF_OPEN_MAX_CALLS,
+    HEDGE_LATENCY_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    LATENCY_WINDOW,
+)
+from app.services.ai_service.ai_context import estimate_messages_tokens
+from app.services.ai_service.ai_helth import ai_health_monitor
+from app.services.ai_service.ai_metrics import ai_metrics
+from app.services.ai_service.cassette import CassetteStore
+from app.services.ai_service.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.ai_service.json_repair import REPAIR_NONE, REPAIR_TRUNCATED, parse_llm_json
+from app.services.ai_service.rate_governor import RateGovernor, RateLimitTimeout
+from app.services.ai_service.task_regeneration import (
+    WindowItem,
+    build_regeneration_messages,
+    validate_regenerated_tasks,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +54,22 @@ class AIRoadmapService:
         self.api_key = settings.PROXYAPI_KEY
         self.model = settings.AI_MODEL
         self.timeout = 30
+        self.breaker = CircuitBreaker(
+            failure_threshold=BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=BREAKER_RECOVERY_TIMEOUT,
+            half_open_max_calls=BREAKER_HALF_OPEN_MAX_CALLS,
+        )
+        self.governor = RateGovernor(
+            rpm=settings.AI_RATE_LIMIT_RPM,
+            tpm=settings.AI_RATE_LIMIT_TPM,
+            queue_timeout=settings.AI_RATE_LIMIT_QUEUE_TIMEOUT,
+        )
+        self.hedge_enabled = settings.AI_HEDGE_ENABLED
+        self.hedged_requests = 0
+        self.structured_output = settings.AI_STRUCTURED_OUTPUT
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.cassettes = CassetteStore(settings.AI_CASSETTE_DIR, settings.AI_CASSETTE_MODE)
+        self.transport: Optional[httpx.AsyncBaseTransport] = None
 
     async def chat(
         self, 
@@ -27,15 +79,6 @@ class AIRoadmapService:
         max_deadline_days: Optional[int] = None,
     ) -> Dict[str, Any]:
         
-        if not self.api_key:
-            raise ValueError("PROXYAPI_KEY not configured")
-
-        url = self.base_url + "/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
         system_prompt = SYSTEM_PROMPT
         if current_roadmap_context:
             system_prompt = self._build_system_prompt_with_context(SYSTEM_PROMPT, current_roadmap_context)
@@ -54,34 +97,97 @@ class AIRoadmapService:
             "temperature": GENERATION_CONFIG["temperature"],
             "max_tokens": GENERATION_CONFIG["max_tokens"],
         }
+        if self.structured_output:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "roadmap", "strict": True, "schema": ROADMAP_JSON_SCHEMA},
+            }
+
+        # Обрезанный ответ при правке текущего роадмапа нельзя принимать: пропавшие
+        # в нем задачи diff_tasks посчитал бы удаленными.
+        allow_truncated = not current_roadmap_context
+        parsed = await self._complete(payload, lambda content: self._parse_json_response(content, allow_truncated))
+        if max_deadline_days is not None:
+            parsed = self._normalize_deadlines(parsed, max_deadline_days)
+        return parsed
+
+    async def regenerate_tasks(
+        self,
+        instruction: str,
+        goal_title: str,
+        goal_description: Optional[str],
+        window: List[WindowItem],
+    ) -> List[Dict[str, Any]]:
+        """Переписывает только выбранные задачи окна, не пересылая весь роадмап."""
+        expected = sum(1 for _, _, selected in window if selected)
+        payload = {
+            "model": self.model,
+            "messages": build_regeneration_messages(goal_title, goal_description, window, instruction),
+            "temperature": GENERATION_CONFIG["temperature"],
+            "max_tokens": TASK_REGENERATION_TOKENS_PER_TASK * expected,
+        }
+        if self.structured_output:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "tasks", "strict": True, "schema": TASKS_JSON_SCHEMA},
+            }
+
+        def parse(content: str) -> List[Dict[str, Any]]:
+            data, repair = parse_llm_json(content)
+            if repair == REPAIR_TRUNCATED:
+                raise json.JSONDecodeError("Truncated AI response", content, len(content))
+            ai_metrics.incr(f"parse.{repair}")
+            return validate_regenerated_tasks(data, expected)
+
+        return await self._complete(payload, parse)
+
+    async def _complete(self, payload: Dict[str, Any], parse: Callable[[str], Any]) -> Any:
+        if not self.api_key and not self.cassettes.replays:
+            raise ValueError("PROXYAPI_KEY not configured")
+
+        url = self.base_url + "/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
 
         for attempt in range(MAX_RETRIES):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    resp = await client.post(url, headers=headers, json=payload)
-                resp.raise_for_status()
-
-                response_data = resp.json()
+                with ai_metrics.phase("provider"):
+                    response_data = await self._post_completion(url, headers, payload)
                 content = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
 
                 if not content:
                     logger.error(f"Empty response from AI (attempt {attempt + 1})")
                     if attempt < MAX_RETRIES - 1:
+                        ai_metrics.incr("retries.empty_response")
                         await self._async_sleep(RETRY_DELAY)
                         continue
                     raise ValueError("Empty response from AI")
 
-                parsed = self._parse_json_response(content)
-                if max_deadline_days is not None:
-                    parsed = self._normalize_deadlines(parsed, max_deadline_days)
-                return parsed
+                with ai_metrics.phase("parse"):
+                    return parse(content)
 
             except httpx.HTTPStatusError as exc:
+                if "response_format" in payload and exc.response.status_code in (400, 422):
+                    logger.warning("AI provider rejected structured output, falling back to plain JSON")
+                    self.structured_output = False
+                    payload.pop("response_format")
+                    ai_metrics.incr("structured_output.rejected")
+                    continue
                 logger.error(f"AI request failed: {exc.response.status_code} {exc.response.text}")
                 raise
+            except CircuitOpenError:
+                logger.warning("AI provider circuit is open, request rejected")
+                raise
+            except RateLimitTimeout:
+                logger.warning("AI provider rate limit queue timed out, request rejected")
+                raise
             except json.JSONDecodeError as exc:
+                ai_metrics.incr("parse.failed")
                 logger.error(f"Failed to parse AI response (attempt {attempt + 1}): {exc}")
                 if attempt < MAX_RETRIES - 1:
+                    ai_metrics.incr("retries.parse")
                     await self._async_sleep(RETRY_DELAY)
                     continue
                 raise ValueError("AI response is not valid JSON")
@@ -91,6 +197,216 @@ class AIRoadmapService:
 
         raise ValueError("Max retries exceeded")
 
+    async def _post_completion(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        if self.cassettes.replays:
+            recorded = self.cassettes.load(payload)
+            if recorded is not None:
+                ai_metrics.incr("cache.cassette_hit")
+                return recorded
+            ai_metrics.incr("cache.cassette_miss")
+            if not self.api_key:
+                # Без ключа промах в режиме auto нельзя дописать запросом к провайдеру.
+                raise ValueError(
+                    f"PROXYAPI_KEY not configured and no recorded AI exchange for request {self.cassettes.key(payload)}"
+                )
+
+        estimated_tokens = estimate_messages_tokens(payload["messages"]) + payload.get("max_tokens", 0)
+        for attempt in range(HTTP_MAX_ATTEMPTS):
+            with ai_metrics.phase("queue"):
+                await self.governor.acquire(estimated_tokens)
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self.governor.release(estimated_tokens)
+                raise
+            started = time.monotonic()
+            try:
+                async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
+                    resp = await self._send(client, url, headers, payload, estimated_tokens)
+                resp.raise_for_status()
+            except httpx.HTTPStatusError as exc:
+                # Неудачный запрос учтен в RPM, а оценку токенов возвращаем в бюджет.
+                self.governor.settle(estimated_tokens, 0)
+                status_code = exc.response.status_code
+                ai_metrics.incr(f"provider.http_{status_code}")
+                self.governor.update_from_headers(exc.response.headers)
+                if status_code == 429:
+                    self.governor.penalize(self._parse_retry_after(exc.response.headers.get("Retry-After")))
+                if status_code >= 500 or status_code == 408:
+                    self.breaker.record_failure()
+                    ai_health_monitor.record_traffic(False, time.monotonic() - started, f"HTTP {status_code}")
+                else:
+                    self.breaker.release()
+
+                is_last = attempt == HTTP_MAX_ATTEMPTS - 1
+                delay = None if is_last else self._retry_delay(attempt, exc.response)
+                if status_code not in RETRYABLE_STATUS_CODES or delay is None:
+                    raise
+                ai_metrics.incr("retries.http")
+                logger.warning(
+                    "AI provider returned %s, retrying in %.2fs (attempt %s)",
+                    status_code, delay, attempt + 1,
+                )
+                await self._async_sleep(delay)
+                continue
+            except httpx.TransportError as exc:
+                self.governor.settle(estimated_tokens, 0)
+                self.breaker.record_failure()
+                ai_health_monitor.record_traffic(False, time.monotonic() - started, exc.__class__.__name__)
+                ai_metrics.incr("provider.transport_error")
+                if attempt == HTTP_MAX_ATTEMPTS - 1:
+                    raise
+                ai_metrics.incr("retries.http")
+                delay = self._retry_delay(attempt)
+                logger.warning(
+                    "AI provider transport error %s, retrying in %.2fs (attempt %s)",
+                    exc.__class__.__name__, delay, attempt + 1,
+                )
+                await self._async_sleep(delay)
+                continue
+            except BaseException:
+                self.governor.settle(estimated_tokens, 0)
+                self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            ai_health_monitor.record_traffic(True, time.monotonic() - started)
+            response_data = resp.json()
+            ai_metrics.incr("provider.http_200")
+            ai_metrics.record_usage(response_data.get("usage"))
+            self.governor.update_from_headers(resp.headers)
+            self.governor.settle(estimated_tokens, (response_data.get("usage") or {}).get("total_tokens"))
+            if self.cassettes.records:
+                self.cassettes.save(payload, response_data)
+            return response_data
+
+        raise ValueError("Max retries exceeded")
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        tokens: int = 0,
+    ) -> httpx.Response:
+        hedge_after = self._hedge_delay()
+        started = time.monotonic()
+        if hedge_after is None:
+            resp = await client.post(url, headers=headers, json=payload)
+        else:
+            resp = await self._send_hedged(client, url, headers, payload, hedge_after, tokens)
+        if resp.is_success:
+            self._latencies.append(time.monotonic() - started)
+        return resp
+
+    async def _send_hedged(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        hedge_after: float,
+        tokens: int = 0,
+    ) -> httpx.Response:
+        primary = asyncio.create_task(client.post(url, headers=headers, json=payload))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        except BaseException:
+            primary.cancel()
+            raise
+        if done:
+            return primary.result()
+
+        # Дублирующий запрос тоже расходует лимит; если бюджета нет — ждем основной.
+        if not self.governor.try_acquire(tokens):
+            ai_metrics.incr("provider.hedge_skipped")
+            return await primary
+        self.hedged_requests += 1
+        ai_metrics.incr("provider.hedged")
+        logger.info("AI request slower than %.2fs, sending hedged request", hedge_after)
+        backup = asyncio.create_task(client.post(url, headers=headers, json=payload))
+        pending = {primary, backup}
+        fallback: Optional[httpx.Response] = None
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    resp = task.result()
+                    if resp.is_success:
+                        return resp
+                    fallback = resp
+            if fallback is not None:
+                return fallback
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            # Ответ учитывается один раз: оценку токенов второго запроса возвращаем.
+            self.governor.settle(tokens, 0)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge_enabled or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(int(len(ordered) * HEDGE_LATENCY_PERCENTILE), len(ordered) - 1)
+        return ordered[index]
+
+    @classmethod
+    def _retry_delay(cls, attempt: int, response: Optional[httpx.Response] = None) -> Optional[float]:
+        backoff = min(RETRY_BACKOFF_MAX, RETRY_DELAY * (2 ** attempt))
+        delay = random.uniform(backoff / 2, backoff)
+        if response is not None:
+            retry_after = cls._parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                if retry_after > RETRY_AFTER_MAX:
+                    return None
+                delay = max(delay, retry_after)
+        return delay
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+    def resilience_snapshot(self) -> Dict[str, Any]:
+        return {
+            "circuit_breaker": self.breaker.snapshot(),
+            "hedging": {
+                "enabled": self.hedge_enabled,
+                "threshold_seconds": self._hedge_delay(),
+                "hedged_requests": self.hedged_requests,
+                "latency_samples": len(self._latencies),
+            },
+            "rate_governor": self.governor.snapshot(),
+            "parsing": {
+                **{name: ai_metrics.counters[f"parse.{name}"] for name in ("none", "repaired", "truncated", "failed")},
+                "retries_avoided": ai_metrics.counters["parse.repaired"] + ai_metrics.counters["parse.truncated"],
+                "structured_output": self.structured_output,
+            },
+            "cassettes": self.cassettes.snapshot(),
+        }
+
     @staticmethod
     def _build_system_prompt_with_context(
         base_prompt: str, 
@@ -153,16 +469,15 @@ class AIRoadmapService:
         data["tasks"] = normalized_tasks
         return data
 
-    @staticmethod
-    def _parse_json_response(content: str) -> Dict[str, Any]:
-        cleaned = content.strip()
-
-        if cleaned.startswith("```"):
-            lines = cleaned.split("\n")
-            cleaned = "\n".join(line for line in lines if not line.startswith("```"))
-            cleaned = cleaned.strip()
-
-        data = json.loads(cleaned)
+    def _parse_json_response(self, content: str, allow_truncated: bool = True) -> Dict[str, Any]:
+        data, repair = parse_llm_json(content)
+        if repair == REPAIR_TRUNCATED and not allow_truncated:
+            raise json.JSONDecodeError("Truncated AI response for an existing roadmap", content, len(content))
+        if repair == REPAIR_TRUNCATED and not (isinstance(data, dict) and data.get("tasks")):
+            raise json.JSONDecodeError("Truncated AI response has no complete tasks", content, len(content))
+        ai_metrics.incr(f"parse.{repair}")
+        if repair != REPAIR_NONE:
+            logger.info("AI response JSON repaired (%s)", repair)
 
         if not isinstance(data, dict):
             raise ValueError("Ожидаемый объект JSON на корневом уровне")
@@ -175,7 +490,6 @@ class AIRoadmapService:
 
     @staticmethod
     async def _async_sleep(seconds: float):
-        import asyncio
         await asyncio.sleep(seconds)
 
 
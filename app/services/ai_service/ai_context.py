@@ -0,0 +1,137 @@
+import json
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.ai.ai_config import (
+    CHARS_PER_TOKEN,
+    MESSAGE_TOKEN_OVERHEAD,
+    SUMMARY_COMPACTION_BATCH,
+    SUMMARY_LINE_MAX_CHARS,
+)
+from app.core.settings.settings import settings
+from app.models.ai_conversation import AIConversation
+from app.models.ai_message import AIMessage
+from app.models.ai_message_role import AIMessageRole
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_messages_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m.get("content")) + MESSAGE_TOKEN_OVERHEAD for m in messages)
+
+
+def _truncate(text: str, limit: int = SUMMARY_LINE_MAX_CHARS) -> str:
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[: limit - 1].rstrip() + "…"
+
+
+def _summarize_message(role: Optional[str], content: str) -> str:
+    if role == "assistant":
+        try:
+            data = json.loads(content)
+        except (TypeError, ValueError):
+            data = None
+        if isinstance(data, dict) and data.get("goal_title"):
+            tasks = data.get("tasks") if isinstance(data.get("tasks"), list) else []
+            return f"Ассистент: план «{_truncate(str(data['goal_title']))}» ({len(tasks)} задач)"
+        return f"Ассистент: {_truncate(content)}"
+    return f"Пользователь: {_truncate(content)}"
+
+
+def _trim_summary(lines: List[str], max_tokens: int) -> str:
+    kept: List[str] = []
+    used = 0
+    for line in reversed(lines):
+        cost = estimate_tokens(line)
+        if kept and used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(reversed(kept))
+
+
+async def _compact_older_messages(
+    db: AsyncSession,
+    conversation: AIConversation,
+    before_message_id: int,
+) -> None:
+    stmt = (
+        select(AIMessage.message_id, AIMessage.content, AIMessageRole.name)
+        .join(AIMessageRole, AIMessageRole.ai_message_role_id == AIMessage.ai_message_role_id)
+        .where(
+            AIMessage.conversation_id == conversation.conversation_id,
+            AIMessage.message_id < before_message_id,
+        )
+        .order_by(AIMessage.message_id.asc())
+        .limit(SUMMARY_COMPACTION_BATCH)
+    )
+    if conversation.summary_message_id is not None:
+        stmt = stmt.where(AIMessage.message_id > conversation.summary_message_id)
+
+    rows = (await db.execute(stmt)).all()
+    if not rows:
+        return
+
+    lines = conversation.summary.split("\n") if conversation.summary else []
+    lines.extend(_summarize_message(role, content) for _, content, role in rows)
+    conversation.summary = _trim_summary(lines, settings.AI_CONTEXT_SUMMARY_MAX_TOKENS)
+    conversation.summary_message_id = rows[-1][0]
+
+
+async def load_conversation_context(
+    db: AsyncSession,
+    conversation: AIConversation,
+    token_budget: Optional[int] = None,
+    max_messages: Optional[int] = None,
+) -> List[Dict[str, str]]:
+    """Возвращает последние реплики беседы в пределах бюджета токенов.
+
+    Читается не больше ``max_messages`` последних сообщений, более старые реплики
+    постепенно сворачиваются в ``AIConversation.summary`` и передаются модели
+    одним системным сообщением.
+    """
+    budget = token_budget if token_budget is not None else settings.AI_CONTEXT_TOKEN_BUDGET
+    limit = max_messages if max_messages is not None else settings.AI_CONTEXT_MAX_MESSAGES
+
+    stmt = (
+        select(AIMessage.message_id, AIMessage.content, AIMessageRole.name)
+        .join(AIMessageRole, AIMessageRole.ai_message_role_id == AIMessage.ai_message_role_id)
+        .where(AIMessage.conversation_id == conversation.conversation_id)
+        .order_by(AIMessage.message_id.desc())
+        .limit(limit)
+    )
+    if conversation.summary_message_id is not None:
+        stmt = stmt.where(AIMessage.message_id > conversation.summary_message_id)
+    rows = (await db.execute(stmt)).all()
+
+    used = estimate_tokens(conversation.summary)
+    recent: List[Dict[str, str]] = []
+    oldest_kept_id: Optional[int] = None
+    for message_id, content, role in rows:
+        cost = estimate_tokens(content) + MESSAGE_TOKEN_OVERHEAD
+        if used + cost > budget:
+            break
+        recent.append({"role": role, "content": content})
+        used += cost
+        oldest_kept_id = message_id
+
+    if rows and (len(recent) < len(rows) or len(rows) == limit):
+        boundary = oldest_kept_id if oldest_kept_id is not None else rows[0][0] + 1
+        await _compact_older_messages(db, conversation, boundary)
+
+    history: List[Dict[str, str]] = []
+    if conversation.summary:
+        history.append({
+            "role": "system",
+            "content": f"Краткое содержание предыдущей части диалога:\n{conversation.summary}",
+        })
+    history.extend(reversed(recent))
+    return history
@@ -1,8 +1,11 @@
 import logging
-from typing import Any, Dict
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 
 import httpx
 
+from app.core.background import PeriodicTask
 from app.core.settings.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -36,3 +39,80 @@ async def check_ai_health() -> Dict[str, Any]:
     except Exception as exc:
         logger.exception("AI health check exception")
         return {"ok": False, "error": str(exc)}
+
+
+class AIHealthMonitor:
+    """Кэширует последний результат проверки AI-провайдера.
+
+    Проверка выполняется в фоне раз в ``interval`` секунд, эндпоинт отдает
+    сохраненный результат. В пассивном режиме результаты реальных запросов
+    тоже записываются, и синтетическая проверка пропускается, пока они свежие.
+    """
+
+    def __init__(self, interval: float, passive: bool = True):
+        self.interval = interval
+        self.passive = passive
+        self.probes_sent = 0
+        self.probes_skipped = 0
+        self._result: Optional[Dict[str, Any]] = None
+        self._recorded_at: Optional[float] = None
+        self._last_traffic_at: Optional[float] = None
+        self._task = PeriodicTask("ai-health-probe", interval, self.probe)
+
+    def start(self) -> None:
+        self._task.start()
+
+    async def stop(self) -> None:
+        await self._task.stop()
+
+    async def probe(self) -> None:
+        if self._traffic_is_fresh():
+            self.probes_skipped += 1
+            return
+        started = time.monotonic()
+        result = await check_ai_health()
+        self.probes_sent += 1
+        self._record(result, time.monotonic() - started, source="probe")
+
+    def record_traffic(self, ok: bool, latency: Optional[float] = None, error: Optional[str] = None) -> None:
+        if not self.passive:
+            return
+        result: Dict[str, Any] = {"ok": ok, "status": "ready" if ok else "degraded"}
+        if error:
+            result["error"] = error
+        self._last_traffic_at = time.monotonic()
+        self._record(result, latency, source="traffic")
+
+    def _traffic_is_fresh(self) -> bool:
+        if not self.passive or self._last_traffic_at is None:
+            return False
+        return time.monotonic() - self._last_traffic_at < self.interval
+
+    def _record(self, result: Dict[str, Any], latency: Optional[float], source: str) -> None:
+        self._result = {
+            **result,
+            "source": source,
+            "latency_ms": round(latency * 1000, 1) if latency is not None else None,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._recorded_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        if self._result is None:
+            health: Dict[str, Any] = {"ok": None, "status": "unknown", "checked_at": None, "age_seconds": None}
+        else:
+            health = dict(self._result)
+            health["age_seconds"] = round(time.monotonic() - self._recorded_at, 1)
+        health["probe"] = {
+            "interval_seconds": self.interval,
+            "passive": self.passive,
+            "probes_sent": self.probes_sent,
+            "probes_skipped": self.probes_skipped,
+        }
+        return health
+
+
+ai_health_monitor = AIHealthMonitor(
+    interval=settings.AI_HEALTH_PROBE_INTERVAL_SECONDS,
+    passive=settings.AI_HEALTH_PASSIVE,
+)
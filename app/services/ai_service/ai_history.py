@@ -1,14 +1,17 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import func, select, true, tuple_
 
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.ai_conversation import AIConversation
 from app.models.ai_message import AIMessage
 from app.models.ai_message_role import AIMessageRole
 
+LAST_MESSAGE_SNIPPET_LENGTH = 160
+
 
 async def _get_or_create_ai_message_role(db: AsyncSession, role_name: str) -> AIMessageRole:
 	stmt = select(AIMessageRole).where(AIMessageRole.name == role_name)
@@ -77,34 +80,136 @@ async def save_chat(
 
 
 async def fetch_history(db: AsyncSession, user_id: int) -> List[Dict[str, Any]]:
-	stmt = select(AIConversation).where(AIConversation.user_id == user_id).order_by(AIConversation.created_at.desc())
-	result = await db.execute(stmt)
-	conversations = result.scalars().all()
-
-	history = []
-	for conv in conversations:
-		msg_stmt = (
-			select(AIMessage)
-			.options(selectinload(AIMessage.ai_message_role))
-			.where(AIMessage.conversation_id == conv.conversation_id)
-			.order_by(AIMessage.created_at)
+	stmt = (
+		select(
+			AIConversation.conversation_id,
+			AIConversation.created_at,
+			AIConversation.updated_at,
+			AIMessage.message_id,
+			AIMessage.content,
+			AIMessage.created_at.label("message_created_at"),
+			AIMessageRole.name.label("role"),
 		)
-		msg_res = await db.execute(msg_stmt)
-		messages = msg_res.scalars().all()
-
-		history.append({
-			"conversation_id": conv.conversation_id,
-			"created_at": conv.created_at,
-			"updated_at": conv.updated_at,
-			"messages": [
-				{
-					"message_id": m.message_id,
-					"role": m.ai_message_role.name if m.ai_message_role else None,
-					"content": m.content,
-					"created_at": m.created_at,
-				}
-				for m in messages
-			],
-		})
+		.outerjoin(AIMessage, AIMessage.conversation_id == AIConversation.conversation_id)
+		.outerjoin(AIMessageRole, AIMessageRole.ai_message_role_id == AIMessage.ai_message_role_id)
+		.where(AIConversation.user_id == user_id)
+		.order_by(AIConversation.created_at.desc(), AIConversation.conversation_id.desc(), AIMessage.created_at)
+	)
+	result = await db.execute(stmt)
+
+	history: List[Dict[str, Any]] = []
+	by_id: Dict[int, Dict[str, Any]] = {}
+	for row in result.all():
+		conv = by_id.get(row.conversation_id)
+		if conv is None:
+			conv = {
+				"conversation_id": row.conversation_id,
+				"created_at": row.created_at,
+				"updated_at": row.updated_at,
+				"messages": [],
+			}
+			by_id[row.conversation_id] = conv
+			history.append(conv)
+		if row.message_id is not None:
+			conv["messages"].append({
+				"message_id": row.message_id,
+				"role": row.role,
+				"content": row.content,
+				"created_at": row.message_created_at,
+			})
 
 	return history
+
+
+async def list_conversations(
+	db: AsyncSession,
+	user_id: int,
+	limit: int = 20,
+	cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+	message_count = (
+		select(func.count(AIMessage.message_id))
+		.where(AIMessage.conversation_id == AIConversation.conversation_id)
+		.correlate(AIConversation)
+		.scalar_subquery()
+	)
+	last_message = (
+		select(AIMessage.message_id, AIMessage.content, AIMessage.created_at)
+		.where(AIMessage.conversation_id == AIConversation.conversation_id)
+		.order_by(AIMessage.message_id.desc())
+		.limit(1)
+		.correlate(AIConversation)
+		.lateral("last_message")
+	)
+
+	stmt = (
+		select(
+			AIConversation.conversation_id,
+			AIConversation.created_at,
+			AIConversation.updated_at,
+			AIConversation.active_roadmap_id,
+			message_count.label("message_count"),
+			func.substr(last_message.c.content, 1, LAST_MESSAGE_SNIPPET_LENGTH).label("last_message"),
+			last_message.c.created_at.label("last_message_at"),
+		)
+		.outerjoin(last_message, true())
+		.where(AIConversation.user_id == user_id)
+		.order_by(AIConversation.updated_at.desc(), AIConversation.conversation_id.desc())
+		.limit(limit + 1)
+	)
+
+	after = decode_cursor(cursor, (datetime, int))
+	if after is not None:
+		stmt = stmt.where(
+			tuple_(AIConversation.updated_at, AIConversation.conversation_id) < after
+		)
+
+	rows = (await db.execute(stmt)).mappings().all()
+	items = [dict(row) for row in rows[:limit]]
+	next_cursor = None
+	if len(rows) > limit:
+		last = items[-1]
+		next_cursor = encode_cursor(last["updated_at"], last["conversation_id"])
+
+	return {"conversations": items, "next_cursor": next_cursor}
+
+
+async def fetch_conversation_messages(
+	db: AsyncSession,
+	user_id: int,
+	conversation_id: int,
+	limit: int = 50,
+	cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+	owner_stmt = select(AIConversation.user_id).where(AIConversation.conversation_id == conversation_id)
+	owner_id = (await db.execute(owner_stmt)).scalar_one_or_none()
+	if owner_id is None or owner_id != user_id:
+		raise HTTPException(
+			status_code=status.HTTP_404_NOT_FOUND,
+			detail="Conversation not found",
+		)
+
+	stmt = (
+		select(
+			AIMessage.message_id,
+			AIMessageRole.name.label("role"),
+			AIMessage.content,
+			AIMessage.created_at,
+		)
+		.join(AIMessageRole, AIMessageRole.ai_message_role_id == AIMessage.ai_message_role_id)
+		.where(AIMessage.conversation_id == conversation_id)
+		.order_by(AIMessage.message_id.desc())
+		.limit(limit + 1)
+	)
+
+	before = decode_cursor(cursor, (int,))
+	if before is not None:
+		stmt = stmt.where(AIMessage.message_id < before[0])
+
+	rows = (await db.execute(stmt)).mappings().all()
+	page = [dict(row) for row in rows[:limit]]
+	next_cursor = encode_cursor(page[-1]["message_id"]) if len(rows) > limit else None
+
+	# Страница отдается в хронологическом порядке, курсор ведет к более старым сообщениям.
+	page.reverse()
+	return {"messages": page, "next_cursor": next_cursor}
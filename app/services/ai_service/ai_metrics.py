@@ -0,0 +1,114 @@
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, Mapping, Optional
+
+from app.core.ai.ai_config import METRICS_WINDOW
+
+_current_timings: ContextVar[Optional["RequestTimings"]] = ContextVar("ai_request_timings", default=None)
+
+
+class RequestTimings:
+    """Длительности фаз одного запроса к AI-маршруту, для заголовка ``Server-Timing``."""
+
+    def __init__(self, metrics: "AIMetrics"):
+        self.metrics = metrics
+        self.started_at = time.perf_counter()
+        self._lap_started_at = self.started_at
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def lap(self, name: str) -> None:
+        """Записывает время с предыдущей отметки как фазу ``name``."""
+        now = time.perf_counter()
+        self.metrics.observe(name, now - self._lap_started_at)
+        self._lap_started_at = now
+
+    def finish(self, outcome: str) -> None:
+        self.metrics.observe("total", time.perf_counter() - self.started_at)
+        self.metrics.incr(f"requests.{outcome}")
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items())
+
+
+class PhaseStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=METRICS_WINDOW)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.recent)
+
+        def percentile(q: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(int(len(ordered) * q), len(ordered) - 1)] * 1000, 1)
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+class AIMetrics:
+    """Счетчики и таймеры AI-маршрутов в пределах процесса."""
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Counter = Counter()
+        self.started_at = time.time()
+
+    def start_request(self) -> RequestTimings:
+        timings = RequestTimings(self)
+        _current_timings.set(timings)
+        return timings
+
+    def observe(self, name: str, seconds: float) -> None:
+        self.phases.setdefault(name, PhaseStats()).observe(seconds)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(name, seconds)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def record_usage(self, usage: Optional[Mapping[str, Any]]) -> None:
+        if not usage:
+            return
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            value = usage.get(key)
+            if isinstance(value, int):
+                self.counters[f"tokens.{key}"] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "phases": {name: stats.snapshot() for name, stats in sorted(self.phases.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+ai_metrics = AIMetrics()
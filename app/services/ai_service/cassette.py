@@ -0,0 +1,84 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.settings.settings import BASE_DIR
+
+
+class CassetteNotFoundError(LookupError):
+    def __init__(self, key: str):
+        super().__init__(f"No recorded AI exchange for request {key}")
+        self.key = key
+
+
+class CassetteStore:
+    """Запись и воспроизведение ответов AI-провайдера.
+
+    Режимы: ``off``, ``record`` (запросы уходят провайдеру, ответы сохраняются),
+    ``replay`` (ответы берутся только из записей) и ``auto`` (воспроизведение,
+    а при отсутствии записи — запрос к провайдеру и запись). Ключ записи —
+    sha256 канонического JSON тела запроса.
+    """
+
+    MODES = ("off", "record", "replay", "auto")
+
+    def __init__(self, directory: str, mode: str = "off"):
+        mode = (mode or "off").lower()
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown AI cassette mode: {mode}")
+        path = Path(directory)
+        self.directory = path if path.is_absolute() else BASE_DIR / path
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def replays(self) -> bool:
+        return self.mode in ("replay", "auto")
+
+    @property
+    def records(self) -> bool:
+        return self.mode in ("record", "auto")
+
+    @staticmethod
+    def key(payload: Dict[str, Any]) -> str:
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = self.key(payload)
+        path = self._path(key)
+        if not path.exists():
+            self.misses += 1
+            if self.mode == "replay":
+                raise CassetteNotFoundError(key)
+            return None
+        self.hits += 1
+        with path.open(encoding="utf-8") as fh:
+            return json.load(fh)["response"]
+
+    def save(self, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(self.key(payload))
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            json.dump({"request": payload, "response": response}, fh, ensure_ascii=False, indent=2)
+        tmp_path.replace(path)
+        self.recorded += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
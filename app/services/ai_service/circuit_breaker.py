@@ -0,0 +1,89 @@
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"AI provider circuit is open, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Размыкатель цепи для вызовов AI-провайдера.
+
+    После ``failure_threshold`` подряд идущих сбоев цепь размыкается и запросы
+    сразу отклоняются. Через ``recovery_timeout`` секунд пропускается
+    ``half_open_max_calls`` пробных запросов: успех замыкает цепь, сбой снова
+    ее размыкает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.half_open_in_flight = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+
+    def before_call(self) -> None:
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - (self.opened_at or 0.0)
+            if elapsed < self.recovery_timeout:
+                self.total_rejected += 1
+                raise CircuitOpenError(self.recovery_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            self.half_open_in_flight = 0
+
+        if self.state == self.HALF_OPEN:
+            if self.half_open_in_flight >= self.half_open_max_calls:
+                self.total_rejected += 1
+                raise CircuitOpenError(self.recovery_timeout)
+            self.half_open_in_flight += 1
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self.half_open_in_flight = max(self.half_open_in_flight - 1, 0)
+        self.state = self.CLOSED
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """Освобождает пробный слот, если вызов завершился без вердикта о здоровье провайдера."""
+        if self.state == self.HALF_OPEN:
+            self.half_open_in_flight = max(self.half_open_in_flight - 1, 0)
+
+    def _open(self) -> None:
+        if self.state != self.OPEN:
+            self.times_opened += 1
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.half_open_in_flight = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_after = None
+        if self.state == self.OPEN and self.opened_at is not None:
+            retry_after = round(max(self.recovery_timeout - (time.monotonic() - self.opened_at), 0.0), 2)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after_seconds": retry_after,
+            "times_opened": self.times_opened,
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+        }
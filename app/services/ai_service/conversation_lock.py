@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings.settings import settings
+from app.models.ai_conversation import AIConversation
+
+logger = logging.getLogger(__name__)
+
+LEASE_POLL_INTERVAL = 0.2
+
+
+class ConversationBusyError(Exception):
+    def __init__(self, conversation_id: int):
+        super().__init__(f"Conversation {conversation_id} is busy")
+        self.conversation_id = conversation_id
+
+
+class ConversationLocks:
+    """Взаимное исключение запросов к AI в пределах одной беседы.
+
+    Внутри процесса запросы выстраиваются в очередь на ``asyncio.Lock``. Между
+    воркерами беседу на время вызова провайдера закрепляет аренда
+    (``ai_conversations.busy_until``/``busy_token``): фаза чтения берет ее,
+    фаза записи снимает вместе с сохранением ответа. Соединение с БД между
+    фазами не удерживается.
+    """
+
+    def __init__(self, use_lease: bool = True):
+        self.use_lease = use_lease
+        self._local: Dict[int, asyncio.Lock] = {}
+        self._refs: Dict[int, int] = {}
+        self.waited = 0
+        self.rejected = 0
+        self.conflicts = 0
+
+    @asynccontextmanager
+    async def hold(
+        self,
+        conversation_id: int,
+        wait: bool = True,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[None]:
+        timeout = settings.AI_CONVERSATION_LOCK_TIMEOUT if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        local = self._local.setdefault(conversation_id, asyncio.Lock())
+        self._refs[conversation_id] = self._refs.get(conversation_id, 0) + 1
+        try:
+            if local.locked():
+                if not wait:
+                    self.rejected += 1
+                    raise ConversationBusyError(conversation_id)
+                self.waited += 1
+                try:
+                    await asyncio.wait_for(local.acquire(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    self.rejected += 1
+                    raise ConversationBusyError(conversation_id)
+            else:
+                # Свободный asyncio.Lock захватывается без переключения задач.
+                await local.acquire()
+
+            try:
+                yield
+            finally:
+                local.release()
+        finally:
+            self._refs[conversation_id] -= 1
+            if not self._refs[conversation_id]:
+                del self._refs[conversation_id]
+                del self._local[conversation_id]
+
+    async def claim(
+        self,
+        db: AsyncSession,
+        conversation_id: int,
+        wait: bool = True,
+        timeout: Optional[float] = None,
+    ) -> Optional[str]:
+        """Берет аренду беседы и возвращает ее токен.
+
+        Аренда становится видна другим воркерам после коммита ``db``: их запросы
+        ждут или отклоняются до вызова провайдера. Если воркер упал, аренда
+        истекает через ``AI_CONVERSATION_LEASE_SECONDS``.
+        """
+        if not self.use_lease:
+            return None
+        timeout = settings.AI_CONVERSATION_LOCK_TIMEOUT if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        token = uuid4().hex
+        # clock_timestamp(), а не now(): при ожидании транзакция длится дольше одного опроса.
+        stmt = (
+            update(AIConversation)
+            .where(
+                AIConversation.conversation_id == conversation_id,
+                or_(AIConversation.busy_until.is_(None), AIConversation.busy_until < func.clock_timestamp()),
+            )
+            .values(
+                busy_until=func.clock_timestamp() + timedelta(seconds=settings.AI_CONVERSATION_LEASE_SECONDS),
+                busy_token=token,
+                updated_at=AIConversation.updated_at,
+            )
+            .returning(AIConversation.conversation_id)
+            .execution_options(synchronize_session=False)
+        )
+        while True:
+            if (await db.execute(stmt)).first() is not None:
+                return token
+            if not wait or loop.time() + LEASE_POLL_INTERVAL > deadline:
+                self.rejected += 1
+                raise ConversationBusyError(conversation_id)
+            self.waited += 1
+            await asyncio.sleep(LEASE_POLL_INTERVAL)
+
+    async def release(
+        self,
+        db: AsyncSession,
+        conversation_id: int,
+        token: Optional[str],
+        strict: bool = True,
+    ) -> None:
+        """Снимает аренду в транзакции записи ответа.
+
+        Если аренда истекла и ее перехватил другой запрос, при ``strict``
+        запись отклоняется, чтобы не писать поверх чужого ответа.
+        """
+        if token is None:
+            return
+        released = (
+            await db.execute(
+                update(AIConversation)
+                .where(AIConversation.conversation_id == conversation_id, AIConversation.busy_token == token)
+                .values(busy_until=None, busy_token=None, updated_at=AIConversation.updated_at)
+                .returning(AIConversation.conversation_id)
+                .execution_options(synchronize_session=False)
+            )
+        ).first()
+        if released is None and strict:
+            self.conflicts += 1
+            raise ConversationBusyError(conversation_id)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "active": len(self._local),
+            "waited": self.waited,
+            "rejected": self.rejected,
+            "conflicts": self.conflicts,
+        }
+
+
+conversation_locks = ConversationLocks()
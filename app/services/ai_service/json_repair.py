@@ -0,0 +1,138 @@
+import json
+import re
+from typing import Any, List, Tuple
+
+# Сколько последних безопасных точек обрыва перебирать при починке обрезанного ответа.
+MAX_TRUNCATION_CANDIDATES = 64
+
+REPAIR_NONE = "none"
+REPAIR_CLEANED = "repaired"
+REPAIR_TRUNCATED = "truncated"
+
+_FENCE_RE = re.compile(r"```[a-zA-Z0-9_-]*\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _extract_candidate(text: str) -> str:
+    for block in _FENCE_RE.findall(text):
+        if "{" in block:
+            text = block
+            break
+    start = text.find("{")
+    return text[start:] if start != -1 else text
+
+
+def _strip_comments_and_commas(text: str) -> str:
+    """Удаляет комментарии ``//``/``/* */`` и висячие запятые вне строк."""
+    out: List[str] = []
+    i, n = 0, len(text)
+    in_string = False
+    while i < n:
+        ch = text[i]
+        if in_string:
+            out.append(ch)
+            if ch == "\\" and i + 1 < n:
+                out.append(text[i + 1])
+                i += 2
+                continue
+            if ch == '"':
+                in_string = False
+            i += 1
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif ch == "/" and text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        elif ch in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            out.append(ch)
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _is_cut_level(stack: List[str]) -> bool:
+    return len(stack) == 1 or (len(stack) == 2 and stack[-1] == "[")
+
+
+def _truncation_candidates(text: str) -> List[str]:
+    """Строит варианты обрезанного JSON, закрытые по стеку скобок.
+
+    Обрезка допускается только между ключами корневого объекта или между
+    элементами его массивов (``tasks``), поэтому незавершенная задача
+    отбрасывается целиком, даже если оборвался вложенный в нее массив.
+    """
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []
+    in_string = False
+    escaped = False
+    for idx, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if _is_cut_level(stack):
+                cuts.append((idx + 1, "".join(_CLOSERS[c] for c in reversed(stack))))
+        elif ch == "," and _is_cut_level(stack):
+            cuts.append((idx, "".join(_CLOSERS[c] for c in reversed(stack))))
+
+    if not stack:
+        return []
+    return [text[:cut] + closing for cut, closing in reversed(cuts[-MAX_TRUNCATION_CANDIDATES:])]
+
+
+def parse_llm_json(content: str) -> Tuple[Any, str]:
+    """Разбирает JSON из ответа модели, исправляя типичные дефекты.
+
+    Возвращает пару ``(data, repair)``, где ``repair`` — ``none``, если ответ
+    был валидным JSON, ``repaired`` после удаления обрамления, комментариев
+    и висячих запятых и ``truncated``, если ответ был обрезан и из него
+    восстановлены только завершенные элементы. Если ничего не помогло,
+    пробрасывается исходная ``json.JSONDecodeError``.
+    """
+    text = content.strip()
+    try:
+        return json.loads(text), REPAIR_NONE
+    except json.JSONDecodeError as exc:
+        original_error = exc
+
+    candidate = _strip_comments_and_commas(_extract_candidate(text))
+    decoder = json.JSONDecoder()
+    try:
+        data, _ = decoder.raw_decode(candidate)
+        return data, REPAIR_CLEANED
+    except json.JSONDecodeError:
+        pass
+
+    for truncated in _truncation_candidates(candidate):
+        try:
+            return json.loads(_strip_comments_and_commas(truncated)), REPAIR_TRUNCATED
+        except json.JSONDecodeError:
+            continue
+
+    raise original_error
+
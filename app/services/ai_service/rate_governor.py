@@ -0,0 +1,204 @@
+import asyncio
+import re
+import time
+from typing import Any, Dict, Mapping, Optional
+
+
+class RateLimitTimeout(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"AI provider rate limit queue timed out, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Разбирает ``x-ratelimit-reset-*`` вида ``20ms``, ``1.5s`` или ``6m0s``."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Бюджет на минуту, который пополняется равномерно. ``capacity=0`` — без лимита."""
+
+    def __init__(self, capacity: int):
+        self.capacity = float(max(capacity, 0))
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    @property
+    def limited(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self, now: float) -> None:
+        if self.limited:
+            self.level = min(self.capacity, self.level + (now - self.updated_at) * self.capacity / 60.0)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if not self.limited:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def consume(self, amount: float, now: float) -> None:
+        if self.limited:
+            self._refill(now)
+            self.level -= amount
+
+    def refund(self, amount: float) -> None:
+        if self.limited:
+            self.level = min(self.capacity, self.level + amount)
+
+    def learn(self, limit: Optional[int], remaining: Optional[int], reset_after: Optional[float], now: float) -> None:
+        if limit:
+            if not self.limited:
+                self.level = float(limit)
+            self.capacity = float(limit)
+        if remaining is None or not self.limited:
+            return
+        self._refill(now)
+        self.level = min(self.level, float(remaining))
+        if reset_after is not None and remaining == 0:
+            self.level = min(self.level, -reset_after * self.capacity / 60.0 + 1)
+
+
+class RateGovernor:
+    """Общий для процесса ограничитель RPM/TPM перед вызовами AI-провайдера.
+
+    Вызовы ждут своей очереди по порядку (``asyncio.Lock`` будит ожидающих
+    в порядке FIFO) и получают ``RateLimitTimeout``, если бюджет не освободится
+    за ``queue_timeout`` секунд. Лимиты уточняются по заголовкам
+    ``x-ratelimit-*`` и ``Retry-After`` ответов провайдера.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, queue_timeout: float = 20.0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.queue_timeout = queue_timeout
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.admitted = 0
+        self.delayed = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        return max(
+            self.blocked_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+        )
+
+    async def acquire(self, tokens: int, timeout: Optional[float] = None) -> None:
+        timeout = self.queue_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        self.waiting += 1
+        try:
+            try:
+                await asyncio.wait_for(self._lock.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise RateLimitTimeout(self._wait_time(tokens, time.monotonic()) or timeout)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._wait_time(tokens, now)
+                    if wait <= 0:
+                        self.requests.consume(1, now)
+                        self.tokens.consume(tokens, now)
+                        break
+                    if now + wait > deadline:
+                        self.timed_out += 1
+                        raise RateLimitTimeout(wait)
+                    await asyncio.sleep(wait)
+            finally:
+                self._lock.release()
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.admitted += 1
+        if waited > 0.001:
+            self.delayed += 1
+            self.total_wait += waited
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Списывает бюджет без ожидания, если он есть прямо сейчас и очереди нет."""
+        now = time.monotonic()
+        if self._lock.locked() or self._wait_time(tokens, now) > 0:
+            return False
+        self.requests.consume(1, now)
+        self.tokens.consume(tokens, now)
+        return True
+
+    def release(self, tokens: int) -> None:
+        """Возвращает бюджет вызова, который так и не был отправлен провайдеру."""
+        self.requests.refund(1)
+        self.tokens.refund(tokens)
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Возвращает в бюджет разницу между оценкой и фактическим расходом токенов."""
+        if actual is None or actual >= estimated:
+            return
+        self.tokens.refund(estimated - actual)
+
+    def penalize(self, retry_after: Optional[float]) -> None:
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        now = time.monotonic()
+        self.requests.learn(
+            _int_header(headers, "x-ratelimit-limit-requests"),
+            _int_header(headers, "x-ratelimit-remaining-requests"),
+            parse_reset_duration(headers.get("x-ratelimit-reset-requests")),
+            now,
+        )
+        self.tokens.learn(
+            _int_header(headers, "x-ratelimit-limit-tokens"),
+            _int_header(headers, "x-ratelimit-remaining-tokens"),
+            parse_reset_duration(headers.get("x-ratelimit-reset-tokens")),
+            now,
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "rpm_limit": int(self.requests.capacity) or None,
+            "tpm_limit": int(self.tokens.capacity) or None,
+            "requests_available": round(self.requests.level, 1) if self.requests.limited else None,
+            "tokens_available": round(self.tokens.level) if self.tokens.limited else None,
+            "blocked_for_seconds": round(max(self.blocked_until - now, 0.0), 2),
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "delayed": self.delayed,
+            "timed_out": self.timed_out,
+            "avg_wait_seconds": round(self.total_wait / self.delayed, 3) if self.delayed else 0.0,
+        }
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
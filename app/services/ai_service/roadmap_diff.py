@@ -0,0 +1,150 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+from app.services.roadmap.roadmap_progress import adjust_roadmap_progress
+
+TITLE_MATCH_THRESHOLD = 0.6
+SAME_POSITION_BONUS = 0.1
+DIFF_FIELDS = ("title", "description", "order_index")
+
+
+@dataclass
+class TaskDiff:
+    updates: List[Dict[str, Any]] = field(default_factory=list)
+    inserts: List[Dict[str, Any]] = field(default_factory=list)
+    deletes: List[int] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.updates or self.inserts or self.deletes)
+
+
+def _normalize_title(title: Optional[str]) -> str:
+    return " ".join((title or "").lower().split())
+
+
+def _title_similarity(left: str, right: str) -> float:
+    if left == right:
+        return 1.0
+    return SequenceMatcher(None, left, right).ratio()
+
+
+def due_at_from_offset(start: datetime, offset_days: Any) -> Optional[datetime]:
+    """Срок задачи: ``deadline_offset_days`` от AI, отсчитанный от начала роадмапа."""
+    if not isinstance(offset_days, int):
+        return None
+    return start + timedelta(days=offset_days)
+
+
+def normalize_ai_tasks(
+    tasks: Sequence[Mapping[str, Any]],
+    start: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    normalized = []
+    for idx, task in enumerate(tasks):
+        order_index = task.get("order_index")
+        item = {
+            "title": task.get("title"),
+            "description": task.get("description"),
+            "order_index": order_index if order_index is not None else idx,
+        }
+        if start is not None:
+            item["due_at"] = due_at_from_offset(start, task.get("deadline_offset_days"))
+        normalized.append(item)
+    return normalized
+
+
+def diff_tasks(
+    existing: Sequence[Mapping[str, Any]],
+    incoming: Sequence[Mapping[str, Any]],
+    start: Optional[datetime] = None,
+) -> TaskDiff:
+    """Сопоставляет задачи от AI с сохраненными по позиции и схожести названий.
+
+    ``existing`` — строки с ``task_id``, ``title``, ``description``, ``order_index``
+    и, если есть, ``rank``;
+    ``incoming`` — задачи из ответа AI. Сопоставленные задачи сохраняют свой
+    ``task_id`` (а значит и ``completed``/``completed_at``), обновляются только
+    реально изменившиеся поля. Если задано начало роадмапа ``start``, новые
+    задачи получают срок из ``deadline_offset_days``; сроки сопоставленных
+    задач не трогаются — их мог поменять пользователь.
+    """
+    current = sorted(existing, key=lambda item: (item["order_index"], item.get("rank") or "", item["task_id"]))
+    targets = normalize_ai_tasks(incoming, start)
+
+    current_titles = [_normalize_title(item["title"]) for item in current]
+    candidates = []
+    for new_pos, new_task in enumerate(targets):
+        new_title = _normalize_title(new_task["title"])
+        for old_pos, old_title in enumerate(current_titles):
+            similarity = _title_similarity(new_title, old_title)
+            if similarity < TITLE_MATCH_THRESHOLD:
+                continue
+            score = similarity + (SAME_POSITION_BONUS if new_pos == old_pos else 0.0)
+            candidates.append((score, new_pos, old_pos))
+
+    matches: Dict[int, int] = {}
+    used_old = set()
+    for _, new_pos, old_pos in sorted(candidates, key=lambda item: (-item[0], item[1], item[2])):
+        if new_pos in matches or old_pos in used_old:
+            continue
+        matches[new_pos] = old_pos
+        used_old.add(old_pos)
+
+    diff = TaskDiff()
+    for new_pos, new_task in enumerate(targets):
+        old_pos = matches.get(new_pos)
+        if old_pos is None:
+            diff.inserts.append(dict(new_task))
+            continue
+
+        old_task = current[old_pos]
+        if all(old_task[name] == new_task[name] for name in DIFF_FIELDS):
+            diff.unchanged += 1
+            continue
+        values = {"task_id": old_task["task_id"], **{name: new_task[name] for name in DIFF_FIELDS}}
+        if old_task["order_index"] != new_task["order_index"]:
+            # Явный order_index задает место сам, старый ранг к нему не относится.
+            values["rank"] = ""
+        diff.updates.append(values)
+
+    diff.deletes = [item["task_id"] for pos, item in enumerate(current) if pos not in used_old]
+    return diff
+
+
+async def apply_task_diff(db: AsyncSession, roadmap_id: int, diff: TaskDiff) -> None:
+    """Применяет diff тремя пакетными запросами: DELETE, UPDATE и INSERT.
+
+    Счетчики задач роадмапа сдвигаются на разницу: удаленные строки
+    возвращаются через RETURNING, чтобы учесть среди них выполненные.
+    """
+    removed = removed_completed = 0
+    if diff.deletes:
+        result = await db.execute(
+            delete(Task)
+            .where(Task.roadmap_id == roadmap_id, Task.task_id.in_(diff.deletes))
+            .returning(Task.completed)
+        )
+        flags = result.scalars().all()
+        removed = len(flags)
+        removed_completed = sum(1 for flag in flags if flag)
+    if diff.updates:
+        await db.execute(update(Task), diff.updates)
+    if diff.inserts:
+        await db.execute(
+            insert(Task),
+            [{"roadmap_id": roadmap_id, **values} for values in diff.inserts],
+        )
+    await adjust_roadmap_progress(
+        db,
+        roadmap_id,
+        total=len(diff.inserts) - removed,
+        completed=-removed_completed,
+    )
@@ -0,0 +1,110 @@
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings.settings import settings
+from app.models.roadmap_template import RoadmapTemplate
+
+TEMPLATE_SOURCE_CURATED = "curated"
+
+
+def normalize_title(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())[:255]
+
+
+async def find_template(
+    db: AsyncSession,
+    prompt: str,
+    threshold: Optional[float] = None,
+) -> Optional[RoadmapTemplate]:
+    """Ищет шаблон, название которого совпадает с запросом пользователя почти целиком.
+
+    Используется симметричная ``similarity(title, prompt)`` из pg_trgm: лишние
+    детали в запросе («за 3 месяца к собеседованию») снижают оценку, и такой
+    запрос уходит в AI, а не получает общий шаблон. Оператор ``%`` позволяет
+    использовать GIN-индекс, его порог (``pg_trgm.similarity_threshold``, 0.3)
+    должен быть не выше ``AI_TEMPLATE_MATCH_THRESHOLD``.
+    """
+    threshold = settings.AI_TEMPLATE_MATCH_THRESHOLD if threshold is None else threshold
+    query = normalize_title(prompt)
+    if not query:
+        return None
+
+    score = func.similarity(RoadmapTemplate.title, query)
+    stmt = (
+        select(RoadmapTemplate)
+        .where(RoadmapTemplate.title.op("%")(query), score >= threshold)
+        .order_by(score.desc(), RoadmapTemplate.usage_count.desc())
+        .limit(1)
+    )
+    return (await db.execute(stmt)).scalars().first()
+
+
+def template_to_roadmap(template: RoadmapTemplate, max_deadline_days: Optional[int] = None) -> Dict[str, Any]:
+    tasks = [dict(task) for task in sorted(template.tasks, key=lambda item: item.get("order_index", 0))]
+    longest = max((task.get("deadline_offset_days") or 0 for task in tasks), default=0)
+    if max_deadline_days is not None and longest > max_deadline_days:
+        for task in tasks:
+            offset = task.get("deadline_offset_days") or 0
+            task["deadline_offset_days"] = round(offset * max_deadline_days / longest)
+    return {
+        "goal_title": template.title,
+        "goal_description": template.description,
+        "tasks": tasks,
+    }
+
+
+async def mark_template_used(db: AsyncSession, template_id: int) -> None:
+    await db.execute(
+        update(RoadmapTemplate)
+        .where(RoadmapTemplate.template_id == template_id)
+        .values(usage_count=RoadmapTemplate.usage_count + 1)
+    )
+
+
+async def refresh_templates(db: AsyncSession, templates: Sequence[Dict[str, Any]]) -> None:
+    """Синхронизирует курируемые шаблоны с каталогом.
+
+    Изменённые шаблоны перезаписываются (счётчик использований сохраняется),
+    шаблоны, убранные из каталога, удаляются.
+    """
+    rows = {}
+    for template in templates:
+        key = normalize_title(template["title"])
+        rows[key] = {
+            "title": template["title"],
+            "normalized_title": key,
+            "description": template.get("description"),
+            "tasks": [
+                {
+                    "title": task["title"],
+                    "description": task.get("description"),
+                    "order_index": idx,
+                    "deadline_offset_days": task["deadline_offset_days"],
+                }
+                for idx, task in enumerate(template["tasks"])
+            ],
+            "source": TEMPLATE_SOURCE_CURATED,
+        }
+
+    removed = delete(RoadmapTemplate).where(RoadmapTemplate.source == TEMPLATE_SOURCE_CURATED)
+    if rows:
+        removed = removed.where(RoadmapTemplate.normalized_title.not_in(list(rows)))
+    await db.execute(removed)
+    if not rows:
+        return
+
+    stmt = pg_insert(RoadmapTemplate).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RoadmapTemplate.normalized_title],
+        set_={
+            "title": stmt.excluded.title,
+            "description": stmt.excluded.description,
+            "tasks": stmt.excluded.tasks,
+            "source": stmt.excluded.source,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
@@ -0,0 +1,84 @@
+from typing import Any, Collection, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app.core.ai.ai_config import (
+    TASK_REGENERATION_CONTEXT_MAX_CHARS,
+    TASK_REGENERATION_NEIGHBOURS,
+    TASK_REGENERATION_PROMPT,
+)
+
+WindowItem = Tuple[int, Mapping[str, Any], bool]
+REGENERATE_MARKER = "[ПЕРЕДЕЛАТЬ]"
+
+
+def _shorten(text: Optional[str], limit: int = TASK_REGENERATION_CONTEXT_MAX_CHARS) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def regeneration_window(
+    tasks: Sequence[Mapping[str, Any]],
+    task_ids: Collection[int],
+    neighbours: int = TASK_REGENERATION_NEIGHBOURS,
+) -> List[WindowItem]:
+    """Вырезает из упорядоченных задач выбранные и до ``neighbours`` соседей с каждой стороны.
+
+    Возвращает тройки ``(позиция, задача, выбрана)``. Задачи между выбранными
+    попадают в окно, только если они чьи-то соседи: далеко разнесенные задачи
+    дают отдельные участки, и окно не превышает ``2 * neighbours + 1`` задач
+    на каждую выбранную.
+    """
+    positions = [pos for pos, task in enumerate(tasks) if task["task_id"] in task_ids]
+    included = sorted({
+        near
+        for pos in positions
+        for near in range(max(pos - neighbours, 0), min(pos + neighbours + 1, len(tasks)))
+    })
+    return [(pos, tasks[pos], tasks[pos]["task_id"] in task_ids) for pos in included]
+
+
+def build_regeneration_messages(
+    goal_title: str,
+    goal_description: Optional[str],
+    window: Sequence[WindowItem],
+    instruction: str,
+) -> List[Dict[str, str]]:
+    """Компактный промпт: цель, окно задач (у соседей только названия) и пожелание пользователя."""
+    lines = [f"Цель: {goal_title}"]
+    if goal_description:
+        lines.append(f"Описание цели: {_shorten(goal_description)}")
+    lines.append("")
+    lines.append("Задачи по порядку:")
+    previous = None
+    for pos, task, selected in window:
+        if previous is not None and pos > previous + 1:
+            lines.append("…")
+        previous = pos
+        if selected:
+            lines.append(f"{pos + 1}. {REGENERATE_MARKER} {task['title']} - {_shorten(task.get('description'))}")
+        else:
+            lines.append(f"{pos + 1}. {task['title']}")
+    lines.append("")
+    lines.append(f"Пожелание: {instruction}")
+    return [
+        {"role": "system", "content": TASK_REGENERATION_PROMPT},
+        {"role": "user", "content": "\n".join(lines)},
+    ]
+
+
+def validate_regenerated_tasks(data: Any, expected: int) -> List[Dict[str, Any]]:
+    if not isinstance(data, dict) or not isinstance(data.get("tasks"), list):
+        raise ValueError("Отсутствует обязательное поле: tasks")
+    tasks = data["tasks"]
+    if len(tasks) != expected:
+        raise ValueError(f"Ожидалось задач: {expected}, получено: {len(tasks)}")
+
+    result = []
+    for task in tasks:
+        if not isinstance(task, dict) or not isinstance(task.get("title"), str) or not task["title"].strip():
+            raise ValueError("У задачи отсутствует название")
+        description = task.get("description")
+        result.append({
+            "title": task["title"].strip()[:255],
+            "description": description if isinstance(description, str) else None,
+        })
+    return result
@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.background import PeriodicTask
+from app.core.database.database import AsyncSessionLocal
+from app.core.settings.settings import settings
+from app.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_POLL_INTERVAL = 0.2
+REPLAY_HEADER = "Idempotent-Replayed"
+
+StoredResponse = Tuple[str, int, Any]
+
+
+def request_fingerprint(scope: str, payload: Any) -> str:
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{scope}\n{body}".encode("utf-8")).hexdigest()
+
+
+class IdempotencyKeys:
+    """Повторы POST-запросов с одним ``Idempotency-Key`` получают сохраненный ответ.
+
+    Первый запрос резервирует ключ строкой в ``idempotency_keys`` (INSERT ...
+    ON CONFLICT) и выполняется, остальные ждут его результата: внутри процесса —
+    на общем future, между воркерами — опрашивая строку. Ответ хранится
+    ``IDEMPOTENCY_TTL_SECONDS``, ошибки не сохраняются, чтобы клиент мог
+    повторить запрос. Если первый запрос отменен (клиент отключился), ключ
+    освобождается, и ожидающие занимают его заново.
+
+    Ответ сохраняется отдельной транзакцией после того, как обработчик
+    зафиксировал свою. Если процесс упадет между ними, резерв устареет через
+    ``IDEMPOTENCY_STALE_SECONDS`` и повтор выполнит запрос еще раз: защита от
+    дублей точная для ответов, успевших сохраниться.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._purger = PeriodicTask(
+            "idempotency-purge",
+            settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+            self.purge_expired,
+            initial_delay=settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+        )
+
+    def start(self) -> None:
+        self._purger.start()
+
+    async def stop(self) -> None:
+        await self._purger.stop()
+
+    async def run(
+        self,
+        user_id: int,
+        key: Optional[str],
+        scope: str,
+        payload: Any,
+        call: Callable[[], Awaitable[Any]],
+        status_code: int = status.HTTP_200_OK,
+    ) -> Any:
+        if not key:
+            return await call()
+
+        fingerprint = request_fingerprint(scope, payload)
+        slot = (user_id, key)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+
+        while True:
+            pending = self._inflight.get(slot)
+            if pending is not None:
+                try:
+                    stored = await asyncio.wait_for(asyncio.shield(pending), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    raise self._busy()
+                if stored is None:
+                    continue
+                return self._replay(stored, fingerprint)
+
+            if await self._claim(user_id, key, fingerprint):
+                break
+
+            row = await self._fetch(user_id, key)
+            if row is None:
+                continue
+            if row.status_code is not None or row.request_hash != fingerprint:
+                return self._replay((row.request_hash, row.status_code, row.response_body), fingerprint)
+            if loop.time() >= deadline:
+                raise self._busy()
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+
+        future = loop.create_future()
+        # Ожидающих может не оказаться: помечаем исключение полученным.
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[slot] = future
+        try:
+            try:
+                result = await call()
+                body = jsonable_encoder(result)
+                await self._store(user_id, key, status_code, body)
+            except BaseException as exc:
+                try:
+                    await asyncio.shield(self._release(user_id, key))
+                finally:
+                    if isinstance(exc, asyncio.CancelledError):
+                        # Отмена — не ответ на запрос: ожидающие займут ключ сами.
+                        future.set_result(None)
+                    else:
+                        future.set_exception(exc)
+                raise
+            future.set_result((fingerprint, status_code, body))
+            return result
+        finally:
+            self._inflight.pop(slot, None)
+
+    async def purge_expired(self) -> None:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.info("Purged %s expired idempotency keys", result.rowcount)
+
+    async def _claim(self, user_id: int, key: str, fingerprint: str) -> bool:
+        now = datetime.now(timezone.utc)
+        stmt = pg_insert(IdempotencyKey).values(
+            user_id=user_id,
+            key=key,
+            request_hash=fingerprint,
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        )
+        # Просроченный ключ или резерв упавшего запроса можно занять заново.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+            set_={
+                "request_hash": stmt.excluded.request_hash,
+                "status_code": None,
+                "response_body": None,
+                "created_at": stmt.excluded.created_at,
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=or_(
+                IdempotencyKey.expires_at < now,
+                and_(
+                    IdempotencyKey.status_code.is_(None),
+                    IdempotencyKey.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_STALE_SECONDS),
+                ),
+            ),
+        ).returning(IdempotencyKey.user_id)
+        async with self.session_factory() as db:
+            claimed = (await db.execute(stmt)).first() is not None
+            await db.commit()
+        return claimed
+
+    async def _fetch(self, user_id: int, key: str) -> Optional[IdempotencyKey]:
+        async with self.session_factory() as db:
+            return (
+                await db.execute(
+                    select(IdempotencyKey).where(
+                        IdempotencyKey.user_id == user_id,
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.expires_at >= datetime.now(timezone.utc),
+                    )
+                )
+            ).scalar_one_or_none()
+
+    async def _store(self, user_id: int, key: str, status_code: int, body: Any) -> None:
+        async with self.session_factory() as db:
+            row = await db.get(IdempotencyKey, (user_id, key))
+            if row is not None:
+                row.status_code = status_code
+                row.response_body = body
+                await db.commit()
+
+    async def _release(self, user_id: int, key: str) -> None:
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    delete(IdempotencyKey).where(
+                        IdempotencyKey.user_id == user_id,
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.status_code.is_(None),
+                    )
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Failed to release idempotency key for user %s", user_id)
+
+    @staticmethod
+    def _replay(stored: StoredResponse, fingerprint: str) -> JSONResponse:
+        request_hash, status_code, body = stored
+        if request_hash != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key уже использован для другого запроса",
+            )
+        return JSONResponse(content=body, status_code=status_code, headers={REPLAY_HEADER: "true"})
+
+    @staticmethod
+    def _busy() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Запрос с этим Idempotency-Key еще обрабатывается",
+        )
+
+
+idempotency_keys = IdempotencyKeys()
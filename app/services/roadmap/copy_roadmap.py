@@ -1,93 +1,113 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import DateTime, insert, literal, select
+from sqlalchemy.orm import aliased
 from fastapi import HTTPException, status
 from app.models.roadmap import Roadmap
 from app.models.goal import Goal
 from app.models.task import Task
 from app.models.roadmap_copy import RoadmapCopy
+from app.models.team_member import TeamMember
+from app.models.team_role import TeamRole
+from app.models.user import User
+from app.services.roadmap.roadmap_access import TEAM_ADMIN_ROLE, require_roadmap_access
+from app.services.roadmap.roadmap_events import EVENT_ROADMAP_CREATED, publish_roadmap_events
 from datetime import datetime
+from typing import Dict, Optional, Sequence
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def copy_roadmap(db: AsyncSession, user_id: int, roadmap_id: int):
-	
-	try:
-		logger.info(f"Начало копирования роудмапа {roadmap_id} для пользователя {user_id}")
-		
-		stmt = (
-			select(Roadmap)
-			.where(Roadmap.roadmap_id == roadmap_id)
-			.options(selectinload(Roadmap.goal), selectinload(Roadmap.tasks))
+
+async def _copy_for_users(db: AsyncSession, actor_id: int, roadmap_id: int, user_ids: Sequence[int]) -> Dict[int, int]:
+	"""Копирует роадмап каждому из ``user_ids`` четырьмя INSERT ... SELECT.
+
+	Цели, роадмапы, задачи и записи ``roadmap_copies`` создаются на стороне
+	базы независимо от числа задач и получателей; получатели узнают о копиях
+	из ленты событий. Сроки задач сдвигаются на возраст оригинала, чтобы копия
+	начиналась сейчас с тем же графиком. Возвращает ``{user_id: new_roadmap_id}``.
+	"""
+	source = (
+		await db.execute(select(Roadmap.goals_id, Roadmap.tasks_total).where(Roadmap.roadmap_id == roadmap_id))
+	).first()
+	if source is None:
+		raise HTTPException(status_code=404, detail="Оригинальный роудмап не найден")
+
+	now = literal(datetime.utcnow(), DateTime(timezone=True))
+	goal_rows = await db.execute(
+		insert(Goal)
+		.from_select(
+			["user_id", "title", "description", "created_at"],
+			select(User.user_id, Goal.title, Goal.description, now)
+			.select_from(User)
+			.join(Goal, Goal.goals_id == source.goals_id)
+			.where(User.user_id.in_(user_ids)),
 		)
-		result = await db.execute(stmt)
-		orig_roadmap = result.unique().scalar_one_or_none()
-		
-		if not orig_roadmap:
-			logger.warning(f"Роудмап {roadmap_id} не найден")
-			raise HTTPException(status_code=404, detail="Оригинальный роудмап не найден")
-		
-		logger.info(f"Роудмап найден: {orig_roadmap.roadmap_id}")
-		
-		orig_goal = orig_roadmap.goal
-		if not orig_goal:
-			logger.error(f"Goal не найден для роудмапа {roadmap_id}")
-			raise HTTPException(status_code=400, detail="У оригинального роудмапа отсутствует цель")
-		
-		logger.info(f"Goal найдена: {orig_goal.goals_id}, title: {orig_goal.title}")
-		
-		new_goal = Goal(
-			user_id=user_id,
-			title=orig_goal.title,
-			description=orig_goal.description,
-			created_at=datetime.utcnow()
+		.returning(Goal.goals_id, Goal.user_id)
+	)
+	user_by_goal = {row.goals_id: row.user_id for row in goal_rows}
+	missing = set(user_ids) - set(user_by_goal.values())
+	if missing:
+		raise HTTPException(
+			status_code=404,
+			detail=f"Пользователи не найдены: {', '.join(map(str, sorted(missing)))}",
 		)
-		db.add(new_goal)
-		await db.flush()
-		logger.info(f"Новая goal создана: {new_goal.goals_id}")
-		
-		new_roadmap = Roadmap(
-			team_id=None,
-			goals_id=new_goal.goals_id,
-			completed=False,
-			created_at=datetime.utcnow(),
-			updated_at=datetime.utcnow()
+
+	roadmap_rows = await db.execute(
+		insert(Roadmap)
+		.from_select(
+			["goals_id", "tasks_total", "created_at", "updated_at"],
+			select(Goal.goals_id, literal(source.tasks_total), now, now).where(Goal.goals_id.in_(user_by_goal)),
 		)
-		db.add(new_roadmap)
-		await db.flush()
-		logger.info(f"Новый роудмап создан: {new_roadmap.roadmap_id}")
-		
-		tasks_count = 0
-		if orig_roadmap.tasks:
-			for orig_task in orig_roadmap.tasks:
-				new_task = Task(
-					roadmap_id=new_roadmap.roadmap_id,
-					title=orig_task.title,
-					description=orig_task.description,
-					order_index=orig_task.order_index,
-					completed=False,
-					created_at=datetime.utcnow()
+		.returning(Roadmap.roadmap_id, Roadmap.goals_id)
+	)
+	copies = {user_by_goal[row.goals_id]: row.roadmap_id for row in roadmap_rows}
+
+	if source.tasks_total:
+		original = aliased(Roadmap)
+		await db.execute(
+			insert(Task).from_select(
+				["roadmap_id", "title", "description", "order_index", "rank", "due_at", "created_at"],
+				select(
+					Roadmap.roadmap_id,
+					Task.title,
+					Task.description,
+					Task.order_index,
+					Task.rank,
+					Task.due_at + (now - original.created_at),
+					now,
 				)
-				db.add(new_task)
-				tasks_count += 1
-			logger.info(f"Скопировано {tasks_count} задач")
-		else:
-			logger.info("У оригинального роудмапа нет задач")
-		
-		roadmap_copy = RoadmapCopy(
-			user_id=user_id,
-			original_roadmap_id=roadmap_id,
-			new_roadmap_id=new_roadmap.roadmap_id,
-			created_at=datetime.utcnow()
+				.select_from(Task)
+				.join(original, original.roadmap_id == Task.roadmap_id)
+				.join(Roadmap, Roadmap.roadmap_id.in_(list(copies.values())))
+				.where(Task.roadmap_id == roadmap_id),
+			)
 		)
-		db.add(roadmap_copy)
-		
+
+	await db.execute(
+		insert(RoadmapCopy),
+		[
+			{"user_id": target, "original_roadmap_id": roadmap_id, "new_roadmap_id": new_roadmap_id}
+			for target, new_roadmap_id in copies.items()
+		],
+	)
+	await publish_roadmap_events(
+		db, list(copies.values()), EVENT_ROADMAP_CREATED, {"source_roadmap_id": roadmap_id}, actor_id
+	)
+	return copies
+
+
+async def copy_roadmap(db: AsyncSession, user_id: int, roadmap_id: int):
+
+	try:
+		logger.info(f"Начало копирования роудмапа {roadmap_id} для пользователя {user_id}")
+		await require_roadmap_access(db, user_id, roadmap_id)
+
+		copies = await _copy_for_users(db, user_id, roadmap_id, [user_id])
 		await db.commit()
-		logger.info(f"Роудмап успешно скопирован: {roadmap_id} -> {new_roadmap.roadmap_id}")
-		
-		return {"status": "success", "new_roadmap_id": new_roadmap.roadmap_id}
-		
+		logger.info(f"Роудмап успешно скопирован: {roadmap_id} -> {copies[user_id]}")
+
+		return {"status": "success", "new_roadmap_id": copies[user_id]}
+
 	except HTTPException:
 		await db.rollback()
 		raise
@@ -98,3 +118,86 @@ async def copy_roadmap(db: AsyncSession, user_id: int, roadmap_id: int):
 			status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
 			detail=f"Ошибка при копировании роудмапа: {str(e)}"
 		)
+
+
+async def copy_roadmap_to_users(
+	db: AsyncSession,
+	user_id: int,
+	roadmap_id: int,
+	user_ids: Optional[Sequence[int]] = None,
+	team_id: Optional[int] = None,
+	skip_existing: bool = True,
+):
+	"""Раздает копии роадмапа нескольким пользователям или всей команде одной транзакцией.
+
+	Копировать можно только участникам команд, где вызывающий — администратор.
+	Владелец роадмапа и, при ``skip_existing``, уже получившие копию пропускаются.
+	"""
+	try:
+		grant = await require_roadmap_access(db, user_id, roadmap_id)
+		admin_teams = (
+			select(TeamMember.team_id)
+			.join(TeamRole, TeamRole.team_role_id == TeamMember.team_role_id)
+			.where(TeamMember.user_id == user_id, TeamRole.name == TEAM_ADMIN_ROLE)
+		)
+
+		if team_id is not None:
+			is_admin = (
+				await db.execute(admin_teams.where(TeamMember.team_id == team_id))
+			).first() is not None
+			if not is_admin:
+				raise HTTPException(status_code=403, detail="Только Администратор может раздавать роудмап команде")
+			targets = set((
+				await db.execute(select(TeamMember.user_id).where(TeamMember.team_id == team_id))
+			).scalars().all())
+		else:
+			targets = set(user_ids or [])
+			allowed = set((
+				await db.execute(
+					select(TeamMember.user_id)
+					.where(TeamMember.team_id.in_(admin_teams), TeamMember.user_id.in_(targets))
+					.distinct()
+				)
+			).scalars().all())
+			foreign = targets - allowed - {user_id}
+			if foreign:
+				raise HTTPException(
+					status_code=403,
+					detail="Копировать роудмап можно только участникам команд, где вы Администратор",
+				)
+
+		skipped = {grant.owner_id} & targets
+		if skip_existing and targets:
+			skipped |= set((
+				await db.execute(
+					select(RoadmapCopy.user_id).where(
+						RoadmapCopy.original_roadmap_id == roadmap_id,
+						RoadmapCopy.user_id.in_(targets),
+						RoadmapCopy.new_roadmap_id.is_not(None),
+					)
+				)
+			).scalars().all())
+
+		recipients = sorted(targets - skipped)
+		copies: Dict[int, int] = {}
+		if recipients:
+			copies = await _copy_for_users(db, user_id, roadmap_id, recipients)
+		await db.commit()
+		logger.info(f"Роудмап {roadmap_id} скопирован {len(copies)} пользователям, пропущено {len(skipped)}")
+
+		return {
+			"status": "success",
+			"copies": [{"user_id": target, "new_roadmap_id": copies[target]} for target in recipients],
+			"skipped": sorted(skipped),
+		}
+
+	except HTTPException:
+		await db.rollback()
+		raise
+	except Exception as e:
+		logger.error(f"Ошибка при массовом копировании роудмапа {roadmap_id}: {str(e)}", exc_info=True)
+		await db.rollback()
+		raise HTTPException(
+			status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+			detail=f"Ошибка при копировании роудмапа: {str(e)}"
+		)
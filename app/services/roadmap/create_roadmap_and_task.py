@@ -8,6 +8,7 @@ from fastapi import HTTPException, status
 from app.models.goal import Goal
 from app.models.roadmap import Roadmap
 from app.models.task import Task
+from app.services.roadmap.roadmap_events import EVENT_ROADMAP_CREATED, publish_roadmap_event
 
 logger = logging.getLogger(__name__)
 
@@ -60,11 +61,14 @@ async def create_roadmap_manual(
                     description=description_t,
                     order_index=order_index,
                     completed=False,
+                    due_at=t.get("due_at"),
                     created_at=datetime.utcnow(),
                 )
                 db.add(new_task)
                 tasks_count += 1
 
+        new_roadmap.tasks_total = tasks_count
+        await publish_roadmap_event(db, new_roadmap.roadmap_id, EVENT_ROADMAP_CREATED, actor_id=user_id)
         await db.commit()
         logger.info(f"Роудмап создан: {new_roadmap.roadmap_id}, задач: {tasks_count}")
 
@@ -1,13 +1,19 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import delete, or_
 
 from app.core.database.database import get_db
 from app.core.security.jwt import JWTManager
 from app.models.roadmap import Roadmap
-from app.models.goal import Goal
 from app.models.roadmap_copy import RoadmapCopy
+from app.services.roadmap.roadmap_access import (
+    PERMISSION_OWNER,
+    forget_roadmap_access,
+    require_roadmap_access,
+)
+from app.services.roadmap.roadmap_events import EVENT_ROADMAP_DELETED, publish_roadmap_event
+from app.services.roadmap.roadmap_version import check_if_match, precondition_failed, take_expected_version
 
 security = HTTPBearer()
 jwt_manager = JWTManager()
@@ -27,54 +33,32 @@ async def delete_user_roadmap(
             detail=str(exc),
         )
     
-    roadmap_stmt = select(Roadmap).where(Roadmap.roadmap_id == roadmap_id)
-    roadmap_result = await db.execute(roadmap_stmt)
-    roadmap = roadmap_result.scalars().first()
-    
-    if not roadmap:
+    grant = await require_roadmap_access(db, user_id, roadmap_id)
+    if not grant.allows(PERMISSION_OWNER):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Роудмап не найден"
-        )
-    
-    goal_stmt = select(Goal).where(Goal.goals_id == roadmap.goals_id)
-    goal_result = await db.execute(goal_stmt)
-    goal = goal_result.scalars().first()
-    
-    is_creator = goal and goal.user_id == user_id
-    
-    if is_creator:
-        await db.execute(
-            delete(RoadmapCopy).where(RoadmapCopy.original_roadmap_id == roadmap_id)
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Вы можете удалить только свой роудмап или его копию"
         )
-        await db.execute(delete(Roadmap).where(Roadmap.roadmap_id == roadmap_id))
-        await db.commit()
-        return {
-            "status": "success",
-            "message": "Roadmap deleted successfully",
-            "roadmap_id": roadmap_id
-        }
-    
-    copy_stmt = select(RoadmapCopy).where(
-        RoadmapCopy.new_roadmap_id == roadmap_id,
-        RoadmapCopy.user_id == user_id
-    )
-    copy_result = await db.execute(copy_stmt)
-    copy_record = copy_result.scalars().first()
-    
-    if copy_record:
-        await db.execute(
-            delete(RoadmapCopy).where(RoadmapCopy.id == copy_record.id)
+    check_if_match(db, roadmap_id, grant.version)
+    # Событие пишется до удаления: владелец и команда берутся из самого роадмапа.
+    await publish_roadmap_event(db, roadmap_id, EVENT_ROADMAP_DELETED, actor_id=user_id)
+
+    await db.execute(
+        delete(RoadmapCopy).where(
+            or_(RoadmapCopy.original_roadmap_id == roadmap_id, RoadmapCopy.new_roadmap_id == roadmap_id)
         )
-        await db.execute(delete(Roadmap).where(Roadmap.roadmap_id == roadmap_id))
-        await db.commit()
-        return {
-            "status": "success",
-            "message": "Roadmap copy deleted successfully",
-            "roadmap_id": roadmap_id
-        }
-    
-    raise HTTPException(
-        status_code=status.HTTP_403_FORBIDDEN,
-        detail="Вы можете удалить только свой роудмап или его копию"
     )
+    stmt = delete(Roadmap).where(Roadmap.roadmap_id == roadmap_id)
+    expected = take_expected_version(db, roadmap_id)
+    if expected is not None:
+        stmt = stmt.where(Roadmap.version == expected)
+    result = await db.execute(stmt)
+    if expected is not None and not result.rowcount:
+        raise precondition_failed()
+    await db.commit()
+    forget_roadmap_access(db, roadmap_id)
+    return {
+        "status": "success",
+        "message": "Roadmap deleted successfully",
+        "roadmap_id": roadmap_id
+    }
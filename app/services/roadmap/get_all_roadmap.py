@@ -2,13 +2,13 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
-from sqlalchemy.orm import selectinload
 
 from app.core.database.database import get_db
 from app.core.security.jwt import JWTManager
 from app.models.roadmap import Roadmap
 from app.models.goal import Goal
 from app.models.roadmap_copy import RoadmapCopy
+from app.services.roadmap.roadmap_listing import RoadmapListParams, list_roadmaps_page, roadmap_list_params
 
 security = HTTPBearer()
 jwt_manager = JWTManager()
@@ -17,7 +17,8 @@ jwt_manager = JWTManager()
 async def get_user_roadmaps(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
-) -> list[Roadmap]:
+    params: RoadmapListParams = Depends(roadmap_list_params),
+) -> dict:
     try:
         sub = jwt_manager.verify_access_token(credentials.credentials)
         user_id = int(sub)
@@ -27,22 +28,6 @@ async def get_user_roadmaps(
             detail=str(exc),
         )
 
-    copies_stmt = select(RoadmapCopy.new_roadmap_id).where(RoadmapCopy.user_id == user_id)
-    copies_result = await db.execute(copies_stmt)
-    copied_roadmap_ids = copies_result.scalars().all()
-
-    conditions = [Goal.user_id == user_id] 
-    
-    if copied_roadmap_ids:
-        conditions.append(Roadmap.roadmap_id.in_(copied_roadmap_ids))
-
-    stmt = (
-        select(Roadmap)
-        .join(Goal, Goal.goals_id == Roadmap.goals_id)
-        .options(selectinload(Roadmap.tasks), selectinload(Roadmap.goal))
-        .where(or_(*conditions))
-        .order_by(Roadmap.updated_at.desc())
-    )
-
-    result = await db.execute(stmt)
-    return list(result.scalars().unique().all())
+    copied_roadmap_ids = select(RoadmapCopy.new_roadmap_id).where(RoadmapCopy.user_id == user_id)
+    conditions = [or_(Goal.user_id == user_id, Roadmap.roadmap_id.in_(copied_roadmap_ids))]
+    return await list_roadmaps_page(db, conditions, params)
@@ -1,13 +1,10 @@
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from fastapi import HTTPException, status
 
-from app.models.roadmap import Roadmap
-from app.models.goal import Goal
 from app.models.task import Task
-from app.models.roadmap_copy import RoadmapCopy
+from app.services.roadmap.roadmap_access import require_roadmap_access
+from app.services.roadmap.task_rank import TASK_ORDER
 
 
 async def get_tasks_for_roadmap(
@@ -15,26 +12,8 @@ async def get_tasks_for_roadmap(
     user_id: int,
     roadmap_id: int,
 ) -> List[Task]:
-    stmt = select(Roadmap).options(selectinload(Roadmap.tasks)).where(Roadmap.roadmap_id == roadmap_id)
-    result = await db.execute(stmt)
-    roadmap = result.scalars().first()
-
-    if not roadmap:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Роудмап не найден")
-
-    goal_stmt = select(Goal).where(Goal.goals_id == roadmap.goals_id)
-    goal_res = await db.execute(goal_stmt)
-    goal = goal_res.scalars().first()
-    
-    if goal and goal.user_id == user_id:
-        return list(roadmap.tasks)
+    await require_roadmap_access(db, user_id, roadmap_id)
 
-    copy_stmt = select(RoadmapCopy).where(
-        RoadmapCopy.new_roadmap_id == roadmap_id,
-        RoadmapCopy.user_id == user_id
-    )
-    copy_res = await db.execute(copy_stmt)
-    if copy_res.scalars().first():
-        return list(roadmap.tasks)
-
-    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="У вас нет доступа к этой дорожной карте")
+    stmt = select(Task).where(Task.roadmap_id == roadmap_id).order_by(*TASK_ORDER)
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
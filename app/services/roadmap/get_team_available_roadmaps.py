@@ -2,14 +2,13 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
 from app.core.database.database import get_db
 from app.core.security.jwt import JWTManager
 from app.models.roadmap import Roadmap
-from app.models.goal import Goal
 from app.models.team_member import TeamMember
 from app.models.roadmap_copy import RoadmapCopy
+from app.services.roadmap.roadmap_listing import RoadmapListParams, list_roadmaps_page, roadmap_list_params
 
 security = HTTPBearer()
 jwt_manager = JWTManager()
@@ -19,7 +18,8 @@ async def get_team_available_roadmaps(
     team_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
-) -> list[Roadmap]:
+    params: RoadmapListParams = Depends(roadmap_list_params),
+) -> dict:
     try:
         sub = jwt_manager.verify_access_token(credentials.credentials)
         user_id = int(sub)
@@ -40,22 +40,9 @@ async def get_team_available_roadmaps(
             detail="Вы не состоите в этой команде"
         )
 
-    copies_stmt = select(RoadmapCopy.new_roadmap_id).where(RoadmapCopy.user_id == user_id)
-    copies_result = await db.execute(copies_stmt)
-    copied_roadmap_ids = copies_result.scalars().all()
-
-    where_conditions = [Roadmap.team_id == team_id]
-    
-    if copied_roadmap_ids:
-        where_conditions.append(~Roadmap.roadmap_id.in_(copied_roadmap_ids))
-
-    stmt = (
-        select(Roadmap)
-        .join(Goal, Goal.goals_id == Roadmap.goals_id)
-        .options(selectinload(Roadmap.tasks), selectinload(Roadmap.goal))
-        .where(*where_conditions)
-        .order_by(Roadmap.updated_at.desc())
+    copied_roadmap_ids = select(RoadmapCopy.new_roadmap_id).where(
+        RoadmapCopy.user_id == user_id,
+        RoadmapCopy.new_roadmap_id.is_not(None),
     )
-
-    result = await db.execute(stmt)
-    return list(result.scalars().unique().all())
+    conditions = [Roadmap.team_id == team_id, Roadmap.roadmap_id.not_in(copied_roadmap_ids)]
+    return await list_roadmaps_page(db, conditions, params)
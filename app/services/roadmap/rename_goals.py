@@ -1,13 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.core.database.database import get_db
 from app.core.security.jwt import JWTManager
-from app.models.roadmap import Roadmap
 from app.models.goal import Goal
-from app.models.roadmap_copy import RoadmapCopy
+from app.services.roadmap.roadmap_access import PERMISSION_EDITOR, require_roadmap_access
+from app.services.roadmap.roadmap_events import EVENT_GOAL_UPDATED, publish_roadmap_event
+from app.services.roadmap.roadmap_progress import touch_roadmap
 
 security = HTTPBearer()
 jwt_manager = JWTManager()
@@ -30,46 +30,26 @@ async def update_goal_in_roadmap(
             detail=str(exc),
         )
     
-    roadmap_stmt = select(Roadmap).where(Roadmap.roadmap_id == roadmap_id)
-    roadmap_result = await db.execute(roadmap_stmt)
-    roadmap = roadmap_result.scalars().first()
-    
-    if not roadmap:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Роудмап не найден"
-        )
-    
-    goal_stmt = select(Goal).where(Goal.goals_id == roadmap.goals_id)
-    goal_result = await db.execute(goal_stmt)
-    goal = goal_result.scalars().first()
-
+    grant = await require_roadmap_access(db, user_id, roadmap_id, PERMISSION_EDITOR)
+    goal = await db.get(Goal, grant.goals_id)
     if not goal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Цель не найдена"
         )
     
-    can_edit = goal.user_id == user_id
-    
-    if not can_edit:
-        copy_stmt = select(RoadmapCopy).where(
-            RoadmapCopy.new_roadmap_id == roadmap_id,
-            RoadmapCopy.user_id == user_id
-        )
-        copy_res = await db.execute(copy_stmt)
-        can_edit = copy_res.scalars().first() is not None
-    
-    if not can_edit:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Цель не найдена или у вас нет разрешения на ее обновление"
-        )
-    
     goal.title = goal_title
     goal.description = goal_description
     
     db.add(goal)
+    await touch_roadmap(db, roadmap_id)
+    await publish_roadmap_event(
+        db,
+        roadmap_id,
+        EVENT_GOAL_UPDATED,
+        {"goals_id": goal.goals_id, "title": goal_title, "description": goal_description},
+        user_id,
+    )
     await db.commit()
     await db.refresh(goal)
     
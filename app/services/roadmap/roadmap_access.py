@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.roadmap_access import RoadmapAccess
+from app.models.roadmap_copy import RoadmapCopy
+from app.models.team_member import TeamMember
+from app.models.team_role import TeamRole
+from app.services.roadmap.roadmap_version import check_if_match
+
+PERMISSION_VIEWER = "viewer"
+PERMISSION_EDITOR = "editor"
+PERMISSION_OWNER = "owner"
+PERMISSION_RANKS = {PERMISSION_VIEWER: 1, PERMISSION_EDITOR: 2, PERMISSION_OWNER: 3}
+
+TEAM_ADMIN_ROLE = "Администратор"
+
+_CACHE_KEY = "roadmap_access"
+
+
+@dataclass(frozen=True)
+class RoadmapGrant:
+    roadmap_id: int
+    goals_id: int
+    team_id: Optional[int]
+    owner_id: int
+    permission: Optional[str]
+    version: int = 1
+    team_member: bool = False
+
+    def allows(self, required: str) -> bool:
+        return PERMISSION_RANKS.get(self.permission, 0) >= PERMISSION_RANKS[required]
+
+
+def _grant_query(user_id: int, roadmap_id: int):
+    access_rank = (
+        select(
+            func.max(
+                case(
+                    *[(RoadmapAccess.permission == name, rank) for name, rank in PERMISSION_RANKS.items()],
+                    else_=0,
+                )
+            )
+        )
+        .where(RoadmapAccess.roadmap_id == Roadmap.roadmap_id, RoadmapAccess.user_id == user_id)
+        .scalar_subquery()
+    )
+    team_rank = (
+        select(
+            func.max(
+                case(
+                    (TeamRole.name == TEAM_ADMIN_ROLE, PERMISSION_RANKS[PERMISSION_EDITOR]),
+                    else_=PERMISSION_RANKS[PERMISSION_VIEWER],
+                )
+            )
+        )
+        .select_from(TeamMember)
+        .join(TeamRole, TeamRole.team_role_id == TeamMember.team_role_id)
+        .where(TeamMember.team_id == Roadmap.team_id, TeamMember.user_id == user_id)
+        .scalar_subquery()
+    )
+    copied = exists().where(RoadmapCopy.new_roadmap_id == Roadmap.roadmap_id, RoadmapCopy.user_id == user_id)
+    return (
+        select(
+            Roadmap.roadmap_id,
+            Roadmap.goals_id,
+            Roadmap.team_id,
+            Roadmap.version,
+            Goal.user_id.label("owner_id"),
+            copied.label("copied"),
+            access_rank.label("access_rank"),
+            team_rank.label("team_rank"),
+        )
+        .join(Goal, Goal.goals_id == Roadmap.goals_id)
+        .where(Roadmap.roadmap_id == roadmap_id)
+    )
+
+
+async def resolve_roadmap_access(db: AsyncSession, user_id: int, roadmap_id: int) -> Optional[RoadmapGrant]:
+    """Роадмап и итоговое право пользователя на него одним запросом.
+
+    Владелец цели и получатель копии — ``owner``; дальше берется старшее из
+    записи в ``roadmap_access`` и членства в команде роадмапа (администратор —
+    ``editor``, участник — ``viewer`` с правом отмечать выполнение задач).
+    Результат запоминается в ``db.info`` на время жизни сессии, то есть одного
+    запроса.
+    """
+    cache: Dict[Tuple[int, int], Optional[RoadmapGrant]] = db.info.setdefault(_CACHE_KEY, {})
+    if (user_id, roadmap_id) in cache:
+        return cache[(user_id, roadmap_id)]
+
+    row = (await db.execute(_grant_query(user_id, roadmap_id))).first()
+    grant = None
+    if row is not None:
+        if row.owner_id == user_id or row.copied:
+            rank = PERMISSION_RANKS[PERMISSION_OWNER]
+        else:
+            rank = max(row.access_rank or 0, row.team_rank or 0)
+        permission = next((name for name, value in PERMISSION_RANKS.items() if value == rank), None)
+        grant = RoadmapGrant(
+            row.roadmap_id,
+            row.goals_id,
+            row.team_id,
+            row.owner_id,
+            permission,
+            row.version,
+            row.team_rank is not None,
+        )
+    cache[(user_id, roadmap_id)] = grant
+    return grant
+
+
+async def require_roadmap_access(
+    db: AsyncSession,
+    user_id: int,
+    roadmap_id: int,
+    required: str = PERMISSION_VIEWER,
+) -> RoadmapGrant:
+    grant = await resolve_roadmap_access(db, user_id, roadmap_id)
+    if grant is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Роудмап не найден")
+    if grant.permission is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="У вас нет доступа к этой дорожной карте")
+    if not grant.allows(required):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостаточно прав для этого действия")
+    if required != PERMISSION_VIEWER:
+        check_if_match(db, roadmap_id, grant.version)
+    return grant
+
+
+async def require_task_completion_access(db: AsyncSession, user_id: int, roadmap_id: int) -> RoadmapGrant:
+    """Отмечать выполнение задач могут редакторы и любые участники команды роадмапа.
+
+    Остальные изменения командного роадмапа доступны только ``editor``; зритель
+    по личной ссылке (``roadmap_access``) выполнение не отмечает.
+    """
+    grant = await require_roadmap_access(db, user_id, roadmap_id)
+    if not grant.allows(PERMISSION_EDITOR) and not grant.team_member:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостаточно прав для этого действия")
+    check_if_match(db, roadmap_id, grant.version)
+    return grant
+
+
+def forget_roadmap_access(db: AsyncSession, roadmap_id: int) -> None:
+    cache = db.info.get(_CACHE_KEY)
+    if cache:
+        for key in [key for key in cache if key[1] == roadmap_id]:
+            del cache[key]
@@ -0,0 +1,394 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, FrozenSet, List, Optional, Sequence, Set
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import JSON, DateTime, Integer, String, and_, delete, func, insert, literal, or_, select
+from sqlalchemy.event import listens_for
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.database.database import AsyncSessionLocal
+from app.core.settings.settings import settings
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.roadmap_access import RoadmapAccess
+from app.models.roadmap_event import RoadmapEvent
+from app.models.task import Task
+from app.models.team_member import TeamMember
+from app.services.roadmap.roadmap_access import require_roadmap_access
+
+logger = logging.getLogger(__name__)
+
+EVENT_TASK_CREATED = "task.created"
+EVENT_TASK_UPDATED = "task.updated"
+EVENT_TASK_DELETED = "task.deleted"
+EVENT_TASKS_CHANGED = "tasks.changed"
+EVENT_GOAL_UPDATED = "goal.updated"
+EVENT_ROADMAP_CREATED = "roadmap.created"
+EVENT_ROADMAP_DELETED = "roadmap.deleted"
+
+EVENTS_BATCH = 500
+EVENTS_QUEUE_SIZE = 1000
+# Пропущенный номер события ждем столько секунд: транзакция, получившая его,
+# могла зафиксироваться позже следующих.
+EVENTS_GAP_SECONDS = 10.0
+EVENTS_MAX_GAPS = 1000
+EVENTS_AUDIENCE_REFRESH_SECONDS = 60.0
+EVENTS_RETRY_MS = 3000
+
+TASK_EVENT_FIELDS = ("task_id", "title", "description", "order_index", "rank", "completed", "completed_at", "due_at")
+
+_PUBLISHED_KEY = "roadmap_events_published"
+
+
+def task_payload(task: Task) -> Dict[str, Any]:
+    return jsonable_encoder({name: getattr(task, name) for name in TASK_EVENT_FIELDS})
+
+
+async def publish_roadmap_events(
+    db: AsyncSession,
+    roadmap_ids: Sequence[int],
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    actor_id: Optional[int] = None,
+) -> None:
+    """Записывает событие об изменении роадмапов в транзакции самого изменения.
+
+    Команда, владелец и уже увеличенная версия берутся из роадмапа одним
+    INSERT ... SELECT, так что подписчики видят событие только вместе с
+    зафиксированным изменением. Об удалении нужно сообщить до DELETE.
+    """
+    if not roadmap_ids:
+        return
+    now = literal(datetime.now(timezone.utc), DateTime(timezone=True))
+    await db.execute(
+        insert(RoadmapEvent).from_select(
+            ["roadmap_id", "team_id", "owner_id", "actor_id", "version", "kind", "payload", "created_at"],
+            select(
+                Roadmap.roadmap_id,
+                Roadmap.team_id,
+                Goal.user_id,
+                literal(actor_id, Integer),
+                Roadmap.version,
+                literal(kind, String),
+                literal(payload, JSON),
+                now,
+            )
+            .join(Goal, Goal.goals_id == Roadmap.goals_id)
+            .where(Roadmap.roadmap_id.in_(list(roadmap_ids))),
+        )
+    )
+    db.info[_PUBLISHED_KEY] = True
+
+
+async def publish_roadmap_event(
+    db: AsyncSession,
+    roadmap_id: int,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    actor_id: Optional[int] = None,
+) -> None:
+    await publish_roadmap_events(db, [roadmap_id], kind, payload, actor_id)
+
+
+@dataclass(frozen=True)
+class EventAudience:
+    """Чьи события видит подписчик: свои роадмапы, роадмапы своих команд и выданные ему."""
+
+    user_id: int
+    team_ids: FrozenSet[int]
+    roadmap_ids: FrozenSet[int]
+    roadmap_id: Optional[int] = None
+
+    def sees(self, event: Dict[str, Any]) -> bool:
+        if self.roadmap_id is not None and event["roadmap_id"] != self.roadmap_id:
+            return False
+        return (
+            event["owner_id"] == self.user_id
+            or event["team_id"] in self.team_ids
+            or event["roadmap_id"] in self.roadmap_ids
+        )
+
+    def condition(self):
+        visible = or_(
+            RoadmapEvent.owner_id == self.user_id,
+            RoadmapEvent.team_id.in_(self.team_ids),
+            RoadmapEvent.roadmap_id.in_(self.roadmap_ids),
+        )
+        if self.roadmap_id is not None:
+            return and_(RoadmapEvent.roadmap_id == self.roadmap_id, visible)
+        return visible
+
+
+async def load_event_audience(db: AsyncSession, user_id: int, roadmap_id: Optional[int] = None) -> EventAudience:
+    team_ids = (await db.execute(select(TeamMember.team_id).where(TeamMember.user_id == user_id))).scalars().all()
+    roadmap_ids = (
+        await db.execute(select(RoadmapAccess.roadmap_id).where(RoadmapAccess.user_id == user_id))
+    ).scalars().all()
+    return EventAudience(user_id, frozenset(team_ids), frozenset(roadmap_ids), roadmap_id)
+
+
+def _event_row(event: RoadmapEvent) -> Dict[str, Any]:
+    return {
+        "event_id": event.event_id,
+        "roadmap_id": event.roadmap_id,
+        "team_id": event.team_id,
+        "owner_id": event.owner_id,
+        "actor_id": event.actor_id,
+        "version": event.version,
+        "kind": event.kind,
+        "payload": event.payload,
+        "created_at": event.created_at,
+    }
+
+
+def format_sse(event_id: Optional[int], kind: str, data: Any, retry: Optional[int] = None) -> str:
+    lines = []
+    if retry is not None:
+        lines.append(f"retry: {retry}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {kind}")
+    lines.append("data: " + json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+def _format_event(event: Dict[str, Any], cursor: int) -> str:
+    data = {name: event[name] for name in ("event_id", "roadmap_id", "version", "actor_id", "payload", "created_at")}
+    return format_sse(cursor, event["kind"], data)
+
+
+class EventSubscription:
+    def __init__(self, audience: EventAudience):
+        self.audience = audience
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.closed = False
+
+
+class RoadmapEventHub:
+    """Лента изменений роадмапов для подключенных клиентов (Server-Sent Events).
+
+    Таблицу ``roadmap_events`` опрашивает один цикл на процесс, а не каждое
+    соединение: новые события читаются одним запросом и раздаются подписчикам
+    по их доступу. Фиксация транзакции с событием будит цикл сразу, события
+    других воркеров приходят не позже ``ROADMAP_EVENTS_POLL_SECONDS``. Номера
+    событий выдаются до фиксации, поэтому пропуски в них перечитываются еще
+    ``EVENTS_GAP_SECONDS``. Клиент, отставший больше чем на очередь, отключается
+    и продолжает с ``Last-Event-ID``.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._subscribers: Set[EventSubscription] = set()
+        self._cursor: Optional[int] = None
+        self._gaps: Dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._poller: Optional[asyncio.Task] = None
+        self._purger = PeriodicTask(
+            "roadmap-events-purge",
+            settings.ROADMAP_EVENTS_PURGE_INTERVAL_SECONDS,
+            self.purge_expired,
+            initial_delay=settings.ROADMAP_EVENTS_PURGE_INTERVAL_SECONDS,
+        )
+
+    def start(self) -> None:
+        self._purger.start()
+
+    async def stop(self) -> None:
+        await self._purger.stop()
+        for subscription in self._subscribers:
+            subscription.closed = True
+        self._subscribers.clear()
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def purge_expired(self) -> None:
+        threshold = datetime.now(timezone.utc) - timedelta(seconds=settings.ROADMAP_EVENTS_RETENTION_SECONDS)
+        async with self.session_factory() as db:
+            result = await db.execute(delete(RoadmapEvent).where(RoadmapEvent.created_at < threshold))
+            await db.commit()
+        if result.rowcount:
+            logger.info("Purged %s old roadmap events", result.rowcount)
+
+    async def subscribe(self, audience: EventAudience) -> EventSubscription:
+        if self._cursor is None:
+            async with self.session_factory() as db:
+                last = (await db.execute(select(func.max(RoadmapEvent.event_id)))).scalar()
+            if self._cursor is None:
+                self._cursor = last or 0
+        subscription = EventSubscription(audience)
+        self._subscribers.add(subscription)
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._run(), name="roadmap-events-poll")
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.ROADMAP_EVENTS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while await self.poll() == EVENTS_BATCH:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Roadmap events poll failed")
+        # Без подписчиков курсор не поддерживается: следующий начнет с текущего конца.
+        self._cursor = None
+        self._gaps.clear()
+
+    async def poll(self) -> int:
+        """Читает новые события и события из пропусков, раздает их подписчикам."""
+        if self._cursor is None:
+            return 0
+        condition = RoadmapEvent.event_id > self._cursor
+        if self._gaps:
+            condition = or_(condition, RoadmapEvent.event_id.in_(list(self._gaps)))
+        async with self.session_factory() as db:
+            events = (
+                await db.execute(
+                    select(RoadmapEvent).where(condition).order_by(RoadmapEvent.event_id).limit(EVENTS_BATCH)
+                )
+            ).scalars().all()
+            rows = [_event_row(event) for event in events]
+
+        now = asyncio.get_running_loop().time()
+        for row in rows:
+            event_id = row["event_id"]
+            self._gaps.pop(event_id, None)
+            if event_id > self._cursor:
+                for missing in range(self._cursor + 1, event_id):
+                    if len(self._gaps) >= EVENTS_MAX_GAPS:
+                        break
+                    self._gaps[missing] = now
+                self._cursor = event_id
+            self._dispatch(row)
+        for missing in [gap for gap, seen in self._gaps.items() if now - seen > EVENTS_GAP_SECONDS]:
+            del self._gaps[missing]
+        return len(rows)
+
+    def _dispatch(self, row: Dict[str, Any]) -> None:
+        for subscription in list(self._subscribers):
+            if not subscription.audience.sees(row):
+                continue
+            try:
+                subscription.queue.put_nowait(row)
+            except asyncio.QueueFull:
+                subscription.closed = True
+                self.unsubscribe(subscription)
+
+    async def _replay(self, audience: EventAudience, after: int) -> List[Dict[str, Any]]:
+        async with self.session_factory() as db:
+            events = (
+                await db.execute(
+                    select(RoadmapEvent)
+                    .where(RoadmapEvent.event_id > after, audience.condition())
+                    .order_by(RoadmapEvent.event_id)
+                    .limit(EVENTS_BATCH)
+                )
+            ).scalars().all()
+            return [_event_row(event) for event in events]
+
+    async def _cursor_expired(self, cursor: int) -> bool:
+        async with self.session_factory() as db:
+            oldest = (await db.execute(select(func.min(RoadmapEvent.event_id)))).scalar()
+        return oldest is not None and cursor < oldest - 1
+
+    async def open_stream(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        cursor: Optional[int] = None,
+        roadmap_id: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Проверяет доступ и возвращает поток событий, начиная после ``cursor``.
+
+        Без курсора поток начинается с текущего конца ленты. Если события после
+        курсора уже удалены по сроку хранения, первым приходит ``reset``: клиенту
+        нужно перечитать роадмапы целиком.
+        """
+        if roadmap_id is not None:
+            await require_roadmap_access(db, user_id, roadmap_id)
+        audience = await load_event_audience(db, user_id, roadmap_id)
+        # Соединение с базой не удерживается на время потока.
+        await db.commit()
+        return self._stream(audience, cursor)
+
+    async def _stream(self, audience: EventAudience, cursor: Optional[int]) -> AsyncIterator[str]:
+        subscription = await self.subscribe(audience)
+        loop = asyncio.get_running_loop()
+        try:
+            replayed: Set[int] = set()
+            if cursor is not None and await self._cursor_expired(cursor):
+                cursor = None
+                yield format_sse(self._cursor, "reset", {"cursor": self._cursor}, retry=EVENTS_RETRY_MS)
+            if cursor is None:
+                last = self._cursor
+                yield format_sse(last, "ready", {"cursor": last}, retry=EVENTS_RETRY_MS)
+            else:
+                last = cursor
+                yield format_sse(None, "ready", {"cursor": last}, retry=EVENTS_RETRY_MS)
+                while True:
+                    page = await self._replay(audience, last)
+                    for row in page:
+                        replayed.add(row["event_id"])
+                        last = row["event_id"]
+                        yield _format_event(row, last)
+                    if len(page) < EVENTS_BATCH:
+                        break
+
+            refreshed = loop.time()
+            while not (subscription.closed and subscription.queue.empty()):
+                try:
+                    row = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.ROADMAP_EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    if loop.time() - refreshed > EVENTS_AUDIENCE_REFRESH_SECONDS:
+                        async with self.session_factory() as db:
+                            subscription.audience = await load_event_audience(
+                                db, audience.user_id, audience.roadmap_id
+                            )
+                        refreshed = loop.time()
+                    continue
+                if row["event_id"] in replayed:
+                    continue
+                # Поздно зафиксированное событие может иметь меньший номер — курсор не откатываем.
+                last = max(last, row["event_id"])
+                yield _format_event(row, last)
+        finally:
+            self.unsubscribe(subscription)
+
+
+roadmap_event_hub = RoadmapEventHub()
+
+
+@listens_for(Session, "after_commit")
+def _wake_after_commit(session: Session) -> None:
+    if session.info.pop(_PUBLISHED_KEY, False):
+        roadmap_event_hub.wake()
+
+
+@listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_PUBLISHED_KEY, None)
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Any, Dict, FrozenSet, List, Optional, Union
+
+from fastapi import Header, HTTPException, Query, Response, status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.conditional import etag_matches, make_etag, not_modified
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.task import Task
+from app.services.roadmap.task_rank import TASK_ORDER
+
+INCLUDE_TASKS = "tasks"
+INCLUDE_SUMMARY = "summary"
+
+ROADMAP_COLUMNS = ("roadmap_id", "team_id", "goals_id", "completed", "created_at", "updated_at")
+SUMMARY_FIELDS = ("tasks_total", "tasks_completed")
+LIST_FIELDS = frozenset(ROADMAP_COLUMNS + SUMMARY_FIELDS + ("goal", "tasks"))
+GOAL_COLUMNS = ("goals_id", "user_id", "title", "description", "created_at")
+TASK_COLUMNS = ("task_id", "title", "description", "order_index", "completed", "completed_at", "due_at", "created_at")
+
+
+@dataclass(frozen=True)
+class RoadmapListParams:
+    limit: int
+    cursor: Optional[str]
+    include: str
+    fields: FrozenSet[str]
+    if_none_match: Optional[str] = None
+    response: Optional[Response] = None
+
+
+def roadmap_list_params(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    include: str = Query(
+        INCLUDE_TASKS,
+        pattern=f"^({INCLUDE_TASKS}|{INCLUDE_SUMMARY})$",
+        description="tasks — роадмапы с задачами, summary — только счетчики задач",
+    ),
+    fields: Optional[str] = Query(None, description="Поля роадмапа через запятую, например roadmap_id,goal,updated_at"),
+    if_none_match: Annotated[Optional[str], Header(alias="If-None-Match")] = None,
+    response: Response = None,
+) -> RoadmapListParams:
+    if fields:
+        requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+        unknown = requested - LIST_FIELDS
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Неизвестные поля: {', '.join(sorted(unknown))}",
+            )
+    else:
+        extra = ("tasks",) if include == INCLUDE_TASKS else SUMMARY_FIELDS
+        requested = frozenset(ROADMAP_COLUMNS + ("goal",) + extra)
+    if include == INCLUDE_SUMMARY:
+        requested -= {"tasks"}
+    return RoadmapListParams(
+        limit=limit,
+        cursor=cursor,
+        include=include,
+        fields=requested | {"roadmap_id"},
+        if_none_match=if_none_match,
+        response=response,
+    )
+
+
+async def list_roadmaps_page(
+    db: AsyncSession,
+    conditions: List[Any],
+    params: RoadmapListParams,
+) -> Union[Dict[str, Any], Response]:
+    """Страница роадмапов с keyset-пагинацией по ``(updated_at, roadmap_id)``.
+
+    Сначала одним агрегатом по выборке считаются число роадмапов и сумма их
+    версий — из них и параметров запроса строится ETag. Если он совпал с
+    ``If-None-Match``, возвращается 304 без чтения страницы. Иначе выбираются
+    только запрошенные в ``fields`` колонки; задачи всей страницы загружаются
+    одним дополнительным запросом.
+    """
+    probe = (
+        await db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(Roadmap.version), 0),
+                func.coalesce(func.sum(Roadmap.roadmap_id), 0),
+                func.max(Roadmap.updated_at),
+            )
+            .select_from(Roadmap)
+            .join(Goal, Goal.goals_id == Roadmap.goals_id)
+            .where(*conditions)
+        )
+    ).one()
+    total = probe[0]
+    etag = make_etag(
+        "roadmaps",
+        *probe,
+        params.limit,
+        params.cursor,
+        params.include,
+        ",".join(sorted(params.fields)),
+    )
+    if etag_matches(params.if_none_match, etag):
+        return not_modified(etag)
+    if params.response is not None:
+        params.response.headers["ETag"] = etag
+
+    fields = params.fields
+    columns = [
+        getattr(Roadmap, name)
+        for name in ROADMAP_COLUMNS + SUMMARY_FIELDS
+        if name in fields or name == "updated_at"
+    ]
+    if "goal" in fields:
+        columns += [getattr(Goal, name).label(f"goal_{name}") for name in GOAL_COLUMNS]
+
+    stmt = (
+        select(*columns)
+        .join(Goal, Goal.goals_id == Roadmap.goals_id)
+        .where(*conditions)
+        .order_by(Roadmap.updated_at.desc(), Roadmap.roadmap_id.desc())
+        .limit(params.limit + 1)
+    )
+    after = decode_cursor(params.cursor, (datetime, int))
+    if after is not None:
+        stmt = stmt.where(tuple_(Roadmap.updated_at, Roadmap.roadmap_id) < after)
+
+    rows = (await db.execute(stmt)).mappings().all()
+    page = rows[: params.limit]
+    next_cursor = None
+    if len(rows) > params.limit:
+        next_cursor = encode_cursor(page[-1]["updated_at"], page[-1]["roadmap_id"])
+
+    items = []
+    for row in page:
+        item = {name: row[name] for name in ROADMAP_COLUMNS + SUMMARY_FIELDS if name in fields}
+        if "goal" in fields:
+            item["goal"] = {name: row[f"goal_{name}"] for name in GOAL_COLUMNS}
+        items.append(item)
+
+    if "tasks" in fields and items:
+        by_roadmap: Dict[int, List[Dict[str, Any]]] = {item["roadmap_id"]: [] for item in items}
+        task_rows = await db.execute(
+            select(Task.roadmap_id, *(getattr(Task, name) for name in TASK_COLUMNS))
+            .where(Task.roadmap_id.in_(list(by_roadmap)))
+            .order_by(Task.roadmap_id, *TASK_ORDER)
+        )
+        for task in task_rows.mappings():
+            by_roadmap[task["roadmap_id"]].append({name: task[name] for name in TASK_COLUMNS})
+        for item in items:
+            item["tasks"] = by_roadmap[item["roadmap_id"]]
+
+    return {"roadmaps": items, "total": total, "next_cursor": next_cursor}
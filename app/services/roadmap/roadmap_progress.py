@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from sqlalchemy import and_, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.roadmap import Roadmap
+from app.models.task import Task
+from app.services.roadmap.roadmap_version import precondition_failed, take_expected_version
+
+
+async def adjust_roadmap_progress(db: AsyncSession, roadmap_id: int, total: int = 0, completed: int = 0) -> None:
+    """Сдвигает счетчики задач роадмапа на ``total``/``completed`` и увеличивает его версию.
+
+    Обновление относительное (``tasks_total = tasks_total + :delta``), поэтому
+    параллельные транзакции не теряют изменения друг друга: строка роадмапа
+    блокируется, а новое значение считается от последней зафиксированной версии.
+    Если запрос пришел с ``If-Match``, версия увеличивается только от ожидаемой,
+    иначе — 412.
+    """
+    values = {"version": Roadmap.version + 1, "updated_at": datetime.utcnow()}
+    if total or completed:
+        new_total = Roadmap.tasks_total + total
+        new_completed = Roadmap.tasks_completed + completed
+        values.update(
+            tasks_total=new_total,
+            tasks_completed=new_completed,
+            completed=and_(new_total > 0, new_completed == new_total),
+        )
+
+    stmt = update(Roadmap).where(Roadmap.roadmap_id == roadmap_id)
+    expected = take_expected_version(db, roadmap_id)
+    if expected is not None:
+        stmt = stmt.where(Roadmap.version == expected)
+    result = await db.execute(stmt.values(**values).execution_options(synchronize_session=False))
+    if expected is not None and not result.rowcount:
+        raise precondition_failed()
+
+
+async def touch_roadmap(db: AsyncSession, roadmap_id: int) -> None:
+    """Отмечает изменение задач или цели роадмапа без изменения счетчиков."""
+    await adjust_roadmap_progress(db, roadmap_id)
+
+
+async def set_task_completed(db: AsyncSession, roadmap_id: int, task_id: int, completed: bool) -> bool:
+    """Переключает ``completed`` у задачи и счетчик роадмапа, если флаг действительно изменился."""
+    result = await db.execute(
+        update(Task)
+        .where(
+            Task.task_id == task_id,
+            Task.roadmap_id == roadmap_id,
+            func.coalesce(Task.completed, False) != completed,
+        )
+        .values(completed=completed, completed_at=datetime.utcnow() if completed else None)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        return False
+    await adjust_roadmap_progress(db, roadmap_id, completed=1 if completed else -1)
+    return True
@@ -0,0 +1,50 @@
+from typing import Annotated, Optional
+
+from fastapi import Depends, Header, HTTPException, Path, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.conditional import etag_matches, make_etag
+from app.core.database.database import get_db
+
+_IF_MATCH_KEY = "roadmap_if_match"
+_EXPECTED_KEY = "roadmap_expected_version"
+
+
+def roadmap_etag(roadmap_id: int, version: int) -> str:
+    return make_etag("roadmap", roadmap_id, version)
+
+
+async def roadmap_if_match(
+    roadmap_id: int = Path(..., gt=0),
+    if_match: Annotated[Optional[str], Header(alias="If-Match")] = None,
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """Зависимость изменяющих роадмап ручек: запоминает ``If-Match`` в сессии запроса.
+
+    Сравнение с текущей версией делает ``require_roadmap_access`` при проверке
+    прав на изменение, поэтому сервисы не передают заголовок явно.
+    """
+    if if_match:
+        db.info.setdefault(_IF_MATCH_KEY, {})[roadmap_id] = if_match
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Роудмап был изменен, обновите данные и повторите запрос",
+    )
+
+
+def check_if_match(db: AsyncSession, roadmap_id: int, version: int) -> None:
+    """Сверяет ``If-Match`` с версией и запоминает ее для условного увеличения версии."""
+    header = db.info.get(_IF_MATCH_KEY, {}).pop(roadmap_id, None)
+    if header is None:
+        return
+    if not etag_matches(header, roadmap_etag(roadmap_id, version), weak=False):
+        raise precondition_failed()
+    db.info.setdefault(_EXPECTED_KEY, {})[roadmap_id] = version
+
+
+def take_expected_version(db: AsyncSession, roadmap_id: int) -> Optional[int]:
+    return db.info.get(_EXPECTED_KEY, {}).pop(roadmap_id, None)
+
@@ -5,11 +5,12 @@ from app.models.roadmap import Roadmap
 from app.models.team import Team
 from app.models.team_member import TeamMember
 from app.models.team_role import TeamRole
+from app.services.roadmap.roadmap_access import PERMISSION_OWNER, TEAM_ADMIN_ROLE, require_roadmap_access
+from app.services.roadmap.roadmap_progress import touch_roadmap
 
 async def share_roadmap_with_team(db: AsyncSession, user_id: int, roadmap_id: int, team_id: int):
+	await require_roadmap_access(db, user_id, roadmap_id, PERMISSION_OWNER)
 	roadmap = await db.get(Roadmap, roadmap_id)
-	if not roadmap:
-		raise HTTPException(status_code=404, detail="Роудмап не найден")
 
 	if roadmap.team_id is not None:
 		raise HTTPException(status_code=400, detail="Роудмап уже принадлежит команде")
@@ -17,7 +18,7 @@ async def share_roadmap_with_team(db: AsyncSession, user_id: int, roadmap_id: in
 	stmt = select(TeamMember).join(TeamRole).where(
 		TeamMember.team_id == team_id,
 		TeamMember.user_id == user_id,
-		TeamRole.name == "Администратор"
+		TeamRole.name == TEAM_ADMIN_ROLE
 	)
 	result = await db.execute(stmt)
 	admin_member = result.scalar_one_or_none()
@@ -25,5 +26,6 @@ async def share_roadmap_with_team(db: AsyncSession, user_id: int, roadmap_id: in
 		raise HTTPException(status_code=403, detail="Только Администратор может делиться роудмапом с командой")
 
 	roadmap.team_id = team_id
+	await touch_roadmap(db, roadmap_id)
 	await db.commit()
 	return {"status": "success", "message": "Роудмап передан команде"}
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import Query
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.roadmap_copy import RoadmapCopy
+from app.models.task import Task
+from app.models.team_member import TeamMember
+
+AGENDA_DEFAULT_DAYS = 7
+AGENDA_MAX_DAYS = 365
+
+# Совпадает с условием частичного индекса ix_tasks_open_due_at.
+OPEN_DUE_TASKS = (Task.completed.is_not(True), Task.due_at.is_not(None))
+
+
+@dataclass(frozen=True)
+class AgendaParams:
+    limit: int
+    cursor: Optional[str]
+    days: int
+    overdue: bool
+
+
+def agenda_params(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    days: int = Query(AGENDA_DEFAULT_DAYS, ge=0, le=AGENDA_MAX_DAYS, description="Горизонт повестки в днях"),
+    overdue: bool = Query(True, description="Включать просроченные задачи"),
+) -> AgendaParams:
+    return AgendaParams(limit=limit, cursor=cursor, days=days, overdue=overdue)
+
+
+async def list_agenda_page(
+    db: AsyncSession,
+    user_id: int,
+    params: AgendaParams,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Незавершенные задачи со сроком до ``now + days`` по личным, скопированным и командным роадмапам.
+
+    Задачи идут по ``(due_at, task_id)`` с keyset-пагинацией, поэтому запрос
+    читает частичный индекс ``ix_tasks_open_due_at`` по порядку и
+    останавливается на ``limit + 1`` подходящей строке.
+    """
+    now = now or datetime.now(timezone.utc)
+    copied_roadmap_ids = select(RoadmapCopy.new_roadmap_id).where(RoadmapCopy.user_id == user_id)
+    team_ids = select(TeamMember.team_id).where(TeamMember.user_id == user_id)
+
+    stmt = (
+        select(
+            Task.task_id,
+            Task.roadmap_id,
+            Roadmap.team_id,
+            Goal.title.label("goal_title"),
+            Task.title,
+            Task.description,
+            Task.due_at,
+            (Task.due_at < now).label("overdue"),
+        )
+        .join(Roadmap, Roadmap.roadmap_id == Task.roadmap_id)
+        .join(Goal, Goal.goals_id == Roadmap.goals_id)
+        .where(
+            *OPEN_DUE_TASKS,
+            Task.due_at <= now + timedelta(days=params.days),
+            or_(
+                Goal.user_id == user_id,
+                Roadmap.roadmap_id.in_(copied_roadmap_ids),
+                Roadmap.team_id.in_(team_ids),
+            ),
+        )
+        .order_by(Task.due_at, Task.task_id)
+        .limit(params.limit + 1)
+    )
+    if not params.overdue:
+        stmt = stmt.where(Task.due_at >= now)
+    after = decode_cursor(params.cursor, (datetime, int))
+    if after is not None:
+        stmt = stmt.where(tuple_(Task.due_at, Task.task_id) > after)
+
+    rows = (await db.execute(stmt)).mappings().all()
+    page = rows[: params.limit]
+    next_cursor = None
+    if len(rows) > params.limit:
+        next_cursor = encode_cursor(page[-1]["due_at"], page[-1]["task_id"])
+    return {"tasks": [dict(row) for row in page], "next_cursor": next_cursor}
@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+from app.schemas.roadmap import TaskBatchCreate, TaskBatchDelete, TaskBatchOperation, TaskBatchUpdate
+from app.services.roadmap.roadmap_access import PERMISSION_EDITOR, require_roadmap_access
+from app.services.roadmap.roadmap_events import EVENT_TASKS_CHANGED, publish_roadmap_event
+from app.services.roadmap.roadmap_progress import adjust_roadmap_progress
+from app.services.roadmap.task_rank import TASK_ORDER
+from app.services.roadmap.task_service import task_changes
+
+UPDATE_FIELDS = ("title", "description", "completed", "due_at")
+
+
+def _plan(operations: Sequence[TaskBatchOperation]):
+    """Сворачивает операции в набор создаваемых, изменяемых и удаляемых задач.
+
+    Несколько операций над одной задачей объединяются в одно изменение в
+    порядке следования; обращение к задаче после ее удаления — ошибка запроса.
+    """
+    creates: List[TaskBatchCreate] = []
+    changes: Dict[int, Dict[str, Any]] = {}
+    deletes: List[int] = []
+    for operation in operations:
+        if isinstance(operation, TaskBatchCreate):
+            creates.append(operation)
+            continue
+        if operation.task_id in deletes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Задача {operation.task_id} уже удалена в этом запросе",
+            )
+        if isinstance(operation, TaskBatchDelete):
+            changes.pop(operation.task_id, None)
+            deletes.append(operation.task_id)
+        elif isinstance(operation, TaskBatchUpdate):
+            values = task_changes(operation.model_dump(include=set(UPDATE_FIELDS), exclude_unset=True))
+            changes.setdefault(operation.task_id, {}).update(values)
+        else:
+            changes.setdefault(operation.task_id, {}).update(order_index=operation.order_index, rank="")
+    return creates, changes, deletes
+
+
+async def apply_task_batch(
+    db: AsyncSession,
+    user_id: int,
+    roadmap_id: int,
+    operations: Sequence[TaskBatchOperation],
+) -> List[Task]:
+    """Применяет пакет операций над задачами роадмапа в одной транзакции.
+
+    Один запрос проверки доступа, одна блокирующая выборка затронутых задач и
+    по одному пакетному DELETE, UPDATE и INSERT; в конце — итоговый список задач.
+    """
+    await require_roadmap_access(db, user_id, roadmap_id, PERMISSION_EDITOR)
+    creates, changes, deletes = _plan(operations)
+
+    touched = set(changes) | set(deletes)
+    current: Dict[int, bool] = {}
+    if touched:
+        rows = await db.execute(
+            select(Task.task_id, Task.completed)
+            .where(Task.roadmap_id == roadmap_id, Task.task_id.in_(touched))
+            .with_for_update()
+        )
+        current = {row.task_id: bool(row.completed) for row in rows}
+        missing = touched - set(current)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Задачи не найдены: {', '.join(map(str, sorted(missing)))}",
+            )
+
+    completed_delta = 0
+    if deletes:
+        await db.execute(delete(Task).where(Task.roadmap_id == roadmap_id, Task.task_id.in_(deletes)))
+        completed_delta -= sum(1 for task_id in deletes if current[task_id])
+
+    now = datetime.utcnow()
+    updates = []
+    for task_id, values in changes.items():
+        if "completed" in values:
+            if values["completed"] == current[task_id]:
+                del values["completed"]
+            else:
+                values["completed_at"] = now if values["completed"] else None
+                completed_delta += 1 if values["completed"] else -1
+        if values:
+            updates.append({"task_id": task_id, **values})
+    if updates:
+        await db.execute(update(Task).execution_options(synchronize_session=False), updates)
+
+    if creates:
+        next_index = 0
+        if any(item.order_index is None for item in creates):
+            last = await db.execute(
+                select(func.coalesce(func.max(Task.order_index), -1)).where(Task.roadmap_id == roadmap_id)
+            )
+            next_index = last.scalar_one() + 1
+        rows = []
+        for item in creates:
+            order_index = item.order_index
+            if order_index is None:
+                order_index = next_index
+                next_index += 1
+            rows.append({
+                "roadmap_id": roadmap_id,
+                "title": item.title,
+                "description": item.description,
+                "order_index": order_index,
+                "completed": False,
+                "due_at": item.due_at,
+                "created_at": now,
+            })
+        await db.execute(insert(Task), rows)
+
+    await adjust_roadmap_progress(db, roadmap_id, total=len(creates) - len(deletes), completed=completed_delta)
+    await publish_roadmap_event(
+        db,
+        roadmap_id,
+        EVENT_TASKS_CHANGED,
+        {"created": len(creates), "updated": sorted(row["task_id"] for row in updates), "deleted": sorted(deletes)},
+        user_id,
+    )
+    await db.commit()
+
+    result = await db.execute(
+        select(Task).where(Task.roadmap_id == roadmap_id).order_by(*TASK_ORDER)
+    )
+    return list(result.scalars().all())
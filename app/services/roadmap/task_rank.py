@@ -0,0 +1,233 @@
+import logging
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.background import PeriodicTask
+from app.core.database.database import AsyncSessionLocal
+from app.core.settings.settings import settings
+from app.models.roadmap import Roadmap
+from app.models.task import Task
+from app.services.roadmap.roadmap_access import PERMISSION_EDITOR, require_roadmap_access
+from app.services.roadmap.roadmap_events import (
+    EVENT_TASK_UPDATED,
+    EVENT_TASKS_CHANGED,
+    publish_roadmap_event,
+    publish_roadmap_events,
+    task_payload,
+)
+from app.services.roadmap.roadmap_progress import touch_roadmap
+
+logger = logging.getLogger(__name__)
+
+RANK_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+# Длиннее — перенумеровываем роадмап сразу, при перемещении.
+RANK_MAX_LENGTH = 32
+# Длиннее — перенумеровываем в фоне, не дожидаясь исчерпания.
+RANK_REBALANCE_LENGTH = 12
+RANK_REBALANCE_BATCH = 100
+
+# Порядок задач в роадмапе: ранг различает задачи с одинаковым order_index.
+TASK_ORDER = (Task.order_index, Task.rank, Task.task_id)
+
+Position = Tuple[int, str]
+
+
+def rank_between(lo: str, hi: Optional[str]) -> str:
+    """Кратчайшая строка строго между ``lo`` и ``hi`` (``hi=None`` — без верхней границы).
+
+    Пустая строка меньше любого ранга. Результат никогда не оканчивается на
+    младшую цифру, поэтому место ниже любого выданного ранга всегда есть.
+    """
+    if hi is not None and not lo < hi:
+        raise ValueError(f"Пустой интервал рангов: {lo!r} .. {hi!r}")
+    digits = []
+    pos = 0
+    while True:
+        low = RANK_DIGITS.index(lo[pos]) if pos < len(lo) else 0
+        high = RANK_DIGITS.index(hi[pos]) if hi is not None and pos < len(hi) else len(RANK_DIGITS)
+        if high - low > 1:
+            digits.append(RANK_DIGITS[(low + high) // 2])
+            return "".join(digits)
+        digits.append(RANK_DIGITS[low])
+        if high - low == 1:
+            hi = None
+        pos += 1
+
+
+def position_between(lo: Optional[Position], hi: Optional[Position]) -> Optional[Position]:
+    """``(order_index, rank)`` между соседями или ``None``, если места нет и нужна перенумерация."""
+    if lo is None and hi is None:
+        return 0, ""
+    if lo is None:
+        return hi[0] - 1, ""
+    if hi is None:
+        return lo[0] + 1, ""
+    if hi[0] - lo[0] > 1:
+        return lo[0] + 1, ""
+    if hi[0] > lo[0]:
+        return lo[0], rank_between(lo[1], None)
+    if lo[1] < hi[1]:
+        return lo[0], rank_between(lo[1], hi[1])
+    return None
+
+
+async def rebalance_roadmap_tasks(db: AsyncSession, roadmap_ids: Sequence[int]) -> None:
+    """Перенумеровывает задачи роадмапов в 0..n-1 по текущему порядку и сбрасывает ранги."""
+    ordered = (
+        select(
+            Task.task_id,
+            (func.row_number().over(partition_by=Task.roadmap_id, order_by=TASK_ORDER) - 1).label("position"),
+        )
+        .where(Task.roadmap_id.in_(roadmap_ids))
+        .subquery()
+    )
+    await db.execute(
+        update(Task)
+        .where(Task.task_id == ordered.c.task_id)
+        .values(order_index=ordered.c.position, rank="")
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _neighbours(
+    db: AsyncSession,
+    roadmap_id: int,
+    task_id: int,
+    before: Optional[int],
+    after: Optional[int],
+) -> Tuple[Optional[Position], Optional[Position]]:
+    named = {value for value in (before, after) if value is not None}
+    rows = await db.execute(
+        select(Task.task_id, Task.order_index, Task.rank)
+        .where(Task.roadmap_id == roadmap_id, Task.task_id.in_(named | {task_id}))
+        .with_for_update()
+    )
+    keys = {row.task_id: (row.order_index, row.rank, row.task_id) for row in rows}
+    missing = (named | {task_id}) - set(keys)
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена")
+
+    lo = keys[before] if before is not None else None
+    hi = keys[after] if after is not None else None
+    if lo is not None and hi is not None:
+        if lo >= hi:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Задача before должна идти раньше задачи after",
+            )
+    elif lo is not None or hi is not None:
+        # Указан один сосед: второй — ближайшая к нему задача с другой стороны.
+        key = lo if lo is not None else hi
+        ahead = tuple_(*TASK_ORDER) > tuple_(*key) if lo is not None else tuple_(*TASK_ORDER) < tuple_(*key)
+        order = TASK_ORDER if lo is not None else tuple(column.desc() for column in TASK_ORDER)
+        other = (
+            await db.execute(
+                select(Task.order_index, Task.rank, Task.task_id)
+                .where(Task.roadmap_id == roadmap_id, Task.task_id != task_id, ahead)
+                .order_by(*order)
+                .limit(1)
+            )
+        ).first()
+        if lo is not None:
+            hi = tuple(other) if other is not None else None
+        else:
+            lo = tuple(other) if other is not None else None
+    return (lo[:2] if lo else None), (hi[:2] if hi else None)
+
+
+async def move_task(
+    db: AsyncSession,
+    user_id: int,
+    roadmap_id: int,
+    task_id: int,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+) -> Task:
+    """Ставит задачу между ``before`` (идет перед ней) и ``after`` (идет после нее).
+
+    Обычно меняется одна строка: задача получает свободный ``order_index`` или
+    ранг между соседями. Если места нет или ранг стал слишком длинным, задачи
+    роадмапа сначала перенумеровываются.
+    """
+    await require_roadmap_access(db, user_id, roadmap_id, PERMISSION_EDITOR)
+    if before is None and after is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Укажите соседнюю задачу: before или after")
+    if task_id in (before, after):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Задача не может быть соседом самой себя")
+
+    lo, hi = await _neighbours(db, roadmap_id, task_id, before, after)
+    position = position_between(lo, hi)
+    if position is None or len(position[1]) > RANK_MAX_LENGTH:
+        await rebalance_roadmap_tasks(db, [roadmap_id])
+        lo, hi = await _neighbours(db, roadmap_id, task_id, before, after)
+        position = position_between(lo, hi)
+
+    order_index, rank = position
+    await db.execute(
+        update(Task)
+        .where(Task.task_id == task_id, Task.roadmap_id == roadmap_id)
+        .values(order_index=order_index, rank=rank)
+        .execution_options(synchronize_session=False)
+    )
+    await touch_roadmap(db, roadmap_id)
+    task = (
+        await db.execute(select(Task).where(Task.task_id == task_id).execution_options(populate_existing=True))
+    ).scalar_one()
+    await publish_roadmap_event(db, roadmap_id, EVENT_TASK_UPDATED, task_payload(task), user_id)
+    await db.commit()
+    return task
+
+
+class TaskRankRebalancer:
+    """Фоновая перенумерация роадмапов, в которых ранги задач стали длинными."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._job = PeriodicTask(
+            "task-rank-rebalance",
+            settings.TASK_RANK_REBALANCE_INTERVAL_SECONDS,
+            self.rebalance_long_ranks,
+            initial_delay=settings.TASK_RANK_REBALANCE_INTERVAL_SECONDS,
+        )
+
+    def start(self) -> None:
+        self._job.start()
+
+    async def stop(self) -> None:
+        await self._job.stop()
+
+    async def rebalance_long_ranks(self) -> int:
+        async with self.session_factory() as db:
+            roadmap_ids = (
+                await db.execute(
+                    select(Task.roadmap_id)
+                    .where(func.length(Task.rank) > RANK_REBALANCE_LENGTH)
+                    .distinct()
+                    .limit(RANK_REBALANCE_BATCH)
+                )
+            ).scalars().all()
+            if roadmap_ids:
+                await rebalance_roadmap_tasks(db, roadmap_ids)
+                # order_index в ответах меняется, поэтому версии тоже.
+                await db.execute(
+                    update(Roadmap)
+                    .where(Roadmap.roadmap_id.in_(roadmap_ids))
+                    .values(version=Roadmap.version + 1)
+                    .execution_options(synchronize_session=False)
+                )
+                # Подписчики узнают новую версию, иначе их If-Match получит 412.
+                await publish_roadmap_events(
+                    db,
+                    roadmap_ids,
+                    EVENT_TASKS_CHANGED,
+                    {"created": 0, "updated": [], "deleted": [], "reordered": True},
+                )
+                await db.commit()
+                logger.info("Rebalanced task ranks in %s roadmaps", len(roadmap_ids))
+        return len(roadmap_ids)
+
+
+task_rank_rebalancer = TaskRankRebalancer()
@@ -1,40 +1,31 @@
 from typing import List
 from datetime import datetime
-from sqlalchemy import select, or_
+from sqlalchemy import delete, select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
-from app.models.roadmap import Roadmap
-from app.models.goal import Goal
 from app.models.task import Task
-from app.models.roadmap_copy import RoadmapCopy
+from app.services.roadmap.roadmap_access import (
+    PERMISSION_EDITOR,
+    require_roadmap_access,
+    require_task_completion_access,
+)
+from app.services.roadmap.roadmap_events import (
+    EVENT_TASK_CREATED,
+    EVENT_TASK_DELETED,
+    EVENT_TASK_UPDATED,
+    publish_roadmap_event,
+    task_payload,
+)
+from app.services.roadmap.roadmap_progress import adjust_roadmap_progress, set_task_completed, touch_roadmap
 
+# Поля, которые клиент может очистить, передав null; остальные null игнорируют.
+NULLABLE_TASK_FIELDS = frozenset({"description", "due_at"})
 
-async def _verify_roadmap_access(db: AsyncSession, user_id: int, roadmap_id: int) -> Roadmap:
-    stmt = select(Roadmap).where(Roadmap.roadmap_id == roadmap_id)
-    res = await db.execute(stmt)
-    roadmap = res.scalars().first()
-    if not roadmap:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Роудмап не найден")
-
-    goal_stmt = select(Goal).where(Goal.goals_id == roadmap.goals_id)
-    goal_res = await db.execute(goal_stmt)
-    goal = goal_res.scalars().first()
-    
-    if goal and goal.user_id == user_id:
-        return roadmap
-
-    copy_stmt = select(RoadmapCopy).where(
-        RoadmapCopy.new_roadmap_id == roadmap_id,
-        RoadmapCopy.user_id == user_id
-    )
-    copy_res = await db.execute(copy_stmt)
-    if copy_res.scalars().first():
-        return roadmap
 
-    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="У вас нет доступа к этой дорожной карте")
-
-    return roadmap
+def task_changes(data: dict) -> dict:
+    """Оставляет из переданных полей задачи те, что нужно записать."""
+    return {key: val for key, val in data.items() if val is not None or key in NULLABLE_TASK_FIELDS}
 
 
 async def create_task_for_roadmap(
@@ -44,9 +35,9 @@ async def create_task_for_roadmap(
     title: str,
     description: str | None = None,
     order_index: int | None = 0,
-
+    due_at: datetime | None = None,
 ) -> Task:
-    roadmap = await _verify_roadmap_access(db, user_id, roadmap_id)
+    roadmap = await require_roadmap_access(db, user_id, roadmap_id, PERMISSION_EDITOR)
 
     task = Task(
         roadmap_id=roadmap.roadmap_id,
@@ -55,9 +46,12 @@ async def create_task_for_roadmap(
         order_index=order_index or 0,
         completed=False,
         completed_at=None,
+        due_at=due_at,
     )
     db.add(task)
     await db.flush()
+    await adjust_roadmap_progress(db, roadmap.roadmap_id, total=1)
+    await publish_roadmap_event(db, roadmap.roadmap_id, EVENT_TASK_CREATED, task_payload(task), user_id)
     await db.commit()
     await db.refresh(task)
     return task
@@ -70,7 +64,7 @@ async def update_task_for_roadmap(
     task_id: int,
     data: dict,
 ) -> Task:
-    roadmap = await _verify_roadmap_access(db, user_id, roadmap_id)
+    roadmap = await require_roadmap_access(db, user_id, roadmap_id, PERMISSION_EDITOR)
 
     stmt = select(Task).where(Task.task_id == task_id, Task.roadmap_id == roadmap.roadmap_id)
     res = await db.execute(stmt)
@@ -78,19 +72,22 @@ async def update_task_for_roadmap(
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена")
 
+    data = task_changes(data)
+    completed = data.pop("completed", None)
     for key, val in data.items():
-        if hasattr(task, key) and val is not None:
+        if hasattr(task, key):
             setattr(task, key, val)
-
-    if "completed" in data:
-        if data.get("completed"):
-            task.completed_at = datetime.utcnow()
-        else:
-            task.completed_at = None
+    if data.get("order_index") is not None:
+        task.rank = ""
 
     db.add(task)
-    await db.commit()
+    await db.flush()
+    changed = completed is not None and await set_task_completed(db, roadmap.roadmap_id, task.task_id, bool(completed))
+    if not changed:
+        await touch_roadmap(db, roadmap.roadmap_id)
     await db.refresh(task)
+    await publish_roadmap_event(db, roadmap.roadmap_id, EVENT_TASK_UPDATED, task_payload(task), user_id)
+    await db.commit()
     return task
 
 
@@ -100,15 +97,19 @@ async def delete_task_for_roadmap(
     roadmap_id: int,
     task_id: int,
 ) -> None:
-    roadmap = await _verify_roadmap_access(db, user_id, roadmap_id)
+    roadmap = await require_roadmap_access(db, user_id, roadmap_id, PERMISSION_EDITOR)
 
-    stmt = select(Task).where(Task.task_id == task_id, Task.roadmap_id == roadmap.roadmap_id)
-    res = await db.execute(stmt)
-    task = res.scalars().first()
-    if not task:
+    stmt = (
+        delete(Task)
+        .where(Task.task_id == task_id, Task.roadmap_id == roadmap.roadmap_id)
+        .returning(Task.completed)
+    )
+    deleted = (await db.execute(stmt)).first()
+    if deleted is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена")
 
-    await db.delete(task)
+    await adjust_roadmap_progress(db, roadmap.roadmap_id, total=-1, completed=-1 if deleted.completed else 0)
+    await publish_roadmap_event(db, roadmap.roadmap_id, EVENT_TASK_DELETED, {"task_id": task_id}, user_id)
     await db.commit()
 
 
@@ -119,7 +120,7 @@ async def set_task_complete_for_roadmap(
     task_id: int,
     completed: bool,
 ) -> Task:
-    roadmap = await _verify_roadmap_access(db, user_id, roadmap_id)
+    roadmap = await require_task_completion_access(db, user_id, roadmap_id)
 
     stmt = select(Task).where(Task.task_id == task_id, Task.roadmap_id == roadmap.roadmap_id)
     res = await db.execute(stmt)
@@ -127,10 +128,8 @@ async def set_task_complete_for_roadmap(
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена")
 
-    task.completed = bool(completed)
-    task.completed_at = datetime.utcnow() if completed else None
-
-    db.add(task)
+    if await set_task_completed(db, roadmap.roadmap_id, task.task_id, bool(completed)):
+        await db.refresh(task)
+        await publish_roadmap_event(db, roadmap.roadmap_id, EVENT_TASK_UPDATED, task_payload(task), user_id)
     await db.commit()
-    await db.refresh(task)
     return task
@@ -1,15 +1,14 @@
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
 from app.models.roadmap import Roadmap
+from app.models.team_member import TeamMember
+from app.services.roadmap.roadmap_listing import RoadmapListParams, list_roadmaps_page
 
-async def get_team_roadmaps(db: AsyncSession, team_id: int) -> list[Roadmap]:
-	stmt = (
-		select(Roadmap)
-		.options(selectinload(Roadmap.tasks), selectinload(Roadmap.goal))
-		.where(Roadmap.team_id == team_id)
-		.order_by(Roadmap.updated_at.desc())
-	)
-	result = await db.execute(stmt)
-	return list(result.scalars().all())
+async def get_team_roadmaps(db: AsyncSession, team_id: int, user_id: int, params: RoadmapListParams) -> dict:
+	member_stmt = select(TeamMember.id).where(TeamMember.team_id == team_id, TeamMember.user_id == user_id)
+	if (await db.execute(member_stmt)).first() is None:
+		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не состоите в этой команде")
+
+	return await list_roadmaps_page(db, [Roadmap.team_id == team_id], params)
@@ -1,10 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.chat import Chat
+from app.models.chat_participant import ChatParticipant
+from app.models.team import Team
+from app.models.team_access_link import TeamAccessLink
+from app.models.team_member import TeamMember
 from app.models.user import User
 from app.services.team_service.get_owned_team import get_owned_team
 
 
 async def delete_team(db: AsyncSession, user: User, team_id: int) -> None:
+	"""Помечает команду удаленной и сразу отзывает доступ к ней.
+
+	Участники, ссылки-приглашения и участники чатов удаляются сразу — их число
+	ограничено размером команды. Роадмапы, чаты и сообщения удаляет пачками
+	``team_purger``, поэтому запрос не зависит от объема данных команды.
+	"""
 	team = await get_owned_team(db, user, team_id)
-	await db.delete(team)
+	team_chats = select(Chat.chat_id).where(Chat.team_id == team.team_id)
+	await db.execute(delete(ChatParticipant).where(ChatParticipant.chat_id.in_(team_chats)))
+	await db.execute(delete(TeamAccessLink).where(TeamAccessLink.team_id == team.team_id))
+	await db.execute(delete(TeamMember).where(TeamMember.team_id == team.team_id))
+	await db.execute(
+		update(Team)
+		.where(Team.team_id == team.team_id)
+		.values(deleted_at=datetime.utcnow())
+		.execution_options(synchronize_session=False)
+	)
 	await db.commit()
@@ -8,7 +8,7 @@ from app.models.user import User
 
 
 async def get_team_members(db: AsyncSession, user: User, team_id: int) -> list[dict]:
-	team_stmt = select(Team).where(Team.team_id == team_id)
+	team_stmt = select(Team).where(Team.team_id == team_id, Team.deleted_at.is_(None))
 	team_result = await db.execute(team_stmt)
 	team = team_result.scalar_one_or_none()
 	if not team:
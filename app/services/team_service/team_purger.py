@@ -0,0 +1,114 @@
+import logging
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.background import PeriodicTask
+from app.core.database.database import AsyncSessionLocal
+from app.core.settings.settings import settings
+from app.models.chat import Chat
+from app.models.message import Message
+from app.models.roadmap import Roadmap
+from app.models.task import Task
+from app.models.team import Team
+from app.services.roadmap.roadmap_events import EVENT_ROADMAP_DELETED, publish_roadmap_events
+
+logger = logging.getLogger(__name__)
+
+# Строк сообщений и задач за одну транзакцию.
+TEAM_PURGE_BATCH = 1000
+# Роадмапов и чатов за одну транзакцию: с ними удаляются доступы и копии.
+TEAM_PURGE_PARENT_BATCH = 100
+# Команд за один проход фоновой задачи.
+TEAM_PURGE_TEAMS = 10
+
+
+async def delete_in_batches(db: AsyncSession, key: Any, condition: Any, batch: int) -> int:
+	"""Удаляет строки по ``condition`` пачками по ``batch``, фиксируя каждую пачку.
+
+	Блокировки и журнал транзакции не растут с объемом данных, а память
+	приложения не зависит от числа строк. Возвращает число удаленных строк.
+	"""
+	deleted = 0
+	while True:
+		result = await db.execute(
+			delete(key.table)
+			.where(key.in_(select(key).where(condition).limit(batch)))
+			.execution_options(synchronize_session=False)
+		)
+		await db.commit()
+		deleted += result.rowcount
+		if result.rowcount < batch:
+			return deleted
+
+
+class TeamPurger:
+	"""Фоновое удаление данных команд, помеченных удаленными в ``delete_team``."""
+
+	def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal):
+		self.session_factory = session_factory
+		self._job = PeriodicTask(
+			"team-purge",
+			settings.TEAM_PURGE_INTERVAL_SECONDS,
+			self.purge_deleted,
+			initial_delay=settings.TEAM_PURGE_INTERVAL_SECONDS,
+		)
+
+	def start(self) -> None:
+		self._job.start()
+
+	async def stop(self) -> None:
+		await self._job.stop()
+
+	async def purge_deleted(self) -> int:
+		async with self.session_factory() as db:
+			team_ids = (
+				await db.execute(
+					select(Team.team_id)
+					.where(Team.deleted_at.is_not(None))
+					.order_by(Team.deleted_at)
+					.limit(TEAM_PURGE_TEAMS)
+				)
+			).scalars().all()
+			await db.commit()
+			for team_id in team_ids:
+				await self.purge_team(db, team_id)
+		return len(team_ids)
+
+	async def purge_team(self, db: AsyncSession, team_id: int) -> None:
+		"""Удаляет сообщения, задачи, роадмапы и чаты команды пачками, затем саму команду."""
+		team_chats = select(Chat.chat_id).where(Chat.team_id == team_id)
+		team_roadmaps = select(Roadmap.roadmap_id).where(Roadmap.team_id == team_id)
+		messages = await delete_in_batches(db, Message.message_id, Message.chat_id.in_(team_chats), TEAM_PURGE_BATCH)
+		tasks = await delete_in_batches(db, Task.task_id, Task.roadmap_id.in_(team_roadmaps), TEAM_PURGE_BATCH)
+
+		roadmaps = 0
+		while True:
+			roadmap_ids = (await db.execute(team_roadmaps.limit(TEAM_PURGE_PARENT_BATCH))).scalars().all()
+			if not roadmap_ids:
+				break
+			# Подписчики узнают об удалении из ленты событий.
+			await publish_roadmap_events(db, roadmap_ids, EVENT_ROADMAP_DELETED)
+			await db.execute(
+				delete(Roadmap)
+				.where(Roadmap.roadmap_id.in_(roadmap_ids))
+				.execution_options(synchronize_session=False)
+			)
+			await db.commit()
+			roadmaps += len(roadmap_ids)
+
+		chats = await delete_in_batches(db, Chat.chat_id, Chat.team_id == team_id, TEAM_PURGE_PARENT_BATCH)
+		await db.execute(delete(Team).where(Team.team_id == team_id, Team.deleted_at.is_not(None)))
+		await db.commit()
+		logger.info(
+			"Purged team %s: %s roadmaps, %s tasks, %s chats, %s messages",
+			team_id,
+			roadmaps,
+			tasks,
+			chats,
+			messages,
+		)
+
+
+team_purger = TeamPurger()
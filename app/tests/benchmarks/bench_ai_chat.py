@@ -0,0 +1,161 @@
+"""Нагрузочный прогон /api/v1/ai/chat против локального mock-провайдера.
+
+Запуск: ``python -m app.tests.benchmarks.bench_ai_chat --requests 200 --concurrency 20``.
+Цель ``route`` требует доступную базу данных (как и остальные тесты),
+``service`` измеряет только ``AIRoadmapService.chat``.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+from typing import Awaitable, Callable, List, Tuple
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import delete, select
+
+from app.core.ai import mock_provider
+from app.services.ai_service.ai_chat_roadmap import ai_service
+
+MOCK_BASE_URL = "http://mock-llm/v1"
+
+
+def _percentile(values: List[float], q: float) -> float:
+	if not values:
+		return 0.0
+	ordered = sorted(values)
+	index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+	return ordered[index]
+
+
+def configure_mock(args: argparse.Namespace) -> None:
+	config = mock_provider.mock_settings
+	config.LATENCY_DISTRIBUTION = args.distribution
+	config.LATENCY_MS = args.latency_ms
+	config.LATENCY_JITTER_MS = args.jitter_ms
+	config.ERROR_RATE = args.error_rate
+	config.MALFORMED_RATE = args.malformed_rate
+	config.TASKS_COUNT = args.tasks
+
+	ai_service.transport = httpx.ASGITransport(app=mock_provider.app)
+	ai_service.base_url = MOCK_BASE_URL
+	ai_service.api_key = ai_service.api_key or "mock-key"
+
+
+async def run_load(
+	call: Callable[[int], Awaitable[int]],
+	total: int,
+	concurrency: int,
+) -> Tuple[List[float], Counter, float]:
+	semaphore = asyncio.Semaphore(concurrency)
+	latencies: List[float] = []
+	outcomes: Counter = Counter()
+
+	async def one(idx: int) -> None:
+		async with semaphore:
+			started = time.perf_counter()
+			try:
+				outcome = await call(idx)
+			except Exception as exc:
+				outcome = exc.__class__.__name__
+			latencies.append(time.perf_counter() - started)
+			outcomes[outcome] += 1
+
+	started = time.perf_counter()
+	await asyncio.gather(*(one(idx) for idx in range(total)))
+	return latencies, outcomes, time.perf_counter() - started
+
+
+async def bench_service(args: argparse.Namespace):
+	async def call(idx: int) -> int:
+		await ai_service.chat(f"Составь план изучения темы номер {idx} за {args.tasks} недель")
+		return 200
+
+	return await run_load(call, args.requests, args.concurrency)
+
+
+async def bench_route(args: argparse.Namespace):
+	from app.core.database.database import AsyncSessionLocal, engine
+	from app.main import app
+	from app.models.user import User
+	from app.services.user.auth_service import AuthService
+	from app.services.user.get_my_user import get_current_user
+
+	async with AsyncSessionLocal() as db:
+		username = f"bench_user_{uuid4().hex[:8]}"
+		user_id = await AuthService(db).register_email(
+			username, f"{username}@example.com", "Secret123!", "Bench", "User",
+		)
+		user = (await db.execute(select(User).where(User.user_id == user_id))).scalars().first()
+
+	app.dependency_overrides[get_current_user] = lambda: user
+	transport = httpx.ASGITransport(app=app)
+	try:
+		async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+			async def call(idx: int) -> int:
+				resp = await client.post(
+					"/api/v1/ai/chat",
+					# Шаблоны отвечают без провайдера и исказили бы замеры.
+					json={
+						"prompt": f"Составь план изучения темы номер {idx} за {args.tasks} недель",
+						"use_template": False,
+					},
+				)
+				return resp.status_code
+
+			return await run_load(call, args.requests, args.concurrency)
+	finally:
+		app.dependency_overrides.pop(get_current_user, None)
+		async with AsyncSessionLocal() as db:
+			await db.execute(delete(User).where(User.user_id == user_id))
+			await db.commit()
+		await engine.dispose()
+
+
+def report(args: argparse.Namespace, latencies: List[float], outcomes: Counter, elapsed: float) -> dict:
+	ms = [value * 1000 for value in latencies]
+	return {
+		"target": args.target,
+		"requests": args.requests,
+		"concurrency": args.concurrency,
+		"elapsed_seconds": round(elapsed, 3),
+		"throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+		"latency_ms": {
+			"mean": round(statistics.fmean(ms), 1) if ms else None,
+			"p50": round(_percentile(ms, 0.50), 1),
+			"p95": round(_percentile(ms, 0.95), 1),
+			"p99": round(_percentile(ms, 0.99), 1),
+			"max": round(max(ms), 1) if ms else None,
+		},
+		"outcomes": {str(key): value for key, value in outcomes.items()},
+		"mock_provider": dict(mock_provider.app.state.stats),
+		"resilience": ai_service.resilience_snapshot(),
+	}
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description=__doc__)
+	parser.add_argument("--target", choices=("route", "service"), default="route")
+	parser.add_argument("--requests", type=int, default=100)
+	parser.add_argument("--concurrency", type=int, default=10)
+	parser.add_argument("--distribution", default="lognormal")
+	parser.add_argument("--latency-ms", type=float, default=800.0)
+	parser.add_argument("--jitter-ms", type=float, default=300.0)
+	parser.add_argument("--error-rate", type=float, default=0.0)
+	parser.add_argument("--malformed-rate", type=float, default=0.0)
+	parser.add_argument("--tasks", type=int, default=6)
+	return parser.parse_args()
+
+
+async def main() -> None:
+	args = parse_args()
+	configure_mock(args)
+	runner = bench_route if args.target == "route" else bench_service
+	latencies, outcomes, elapsed = await runner(args)
+	print(json.dumps(report(args, latencies, outcomes, elapsed), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+	asyncio.run(main())
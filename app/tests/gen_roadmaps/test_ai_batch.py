@@ -0,0 +1,95 @@
+import asyncio
+import json
+import unittest
+from uuid import uuid4
+from unittest.mock import patch
+
+from sqlalchemy import delete, func, select
+
+from app.api.v1.ai.ai_router import ai_chat_batch
+from app.core.database.database import AsyncSessionLocal, engine
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.ai_schemas import AIBatchRequest
+from app.services.ai_service.ai_batch import save_generated_roadmaps
+from app.services.user.auth_service import AuthService
+
+SLOW_PROMPT = "Выучить язык медленно"
+BROKEN_PROMPT = "Сломанный ответ провайдера"
+
+
+def _roadmap(title, tasks=2):
+	return {
+		"goal_title": title,
+		"goal_description": "План.",
+		"tasks": [
+			{"title": f"Шаг {idx}", "description": "", "order_index": idx, "deadline_offset_days": 7}
+			for idx in range(tasks)
+		],
+	}
+
+
+class AIBatchTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		username = f"batch_ai_user_{uuid4().hex[:8]}"
+		self.user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		await self.db.commit()
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(User).where(User.user_id == self.user_id))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def test_save_generated_roadmaps_keeps_item_order(self):
+		saved = await save_generated_roadmaps(self.db, self.user_id, [(3, _roadmap("Первая", 1)), (5, _roadmap("Вторая", 3))])
+		await self.db.commit()
+
+		self.assertEqual([(item["index"], item["goal_title"], item["tasks_count"]) for item in saved], [
+			(3, "Первая", 1),
+			(5, "Вторая", 3),
+		])
+		counts = dict((await self.db.execute(
+			select(Task.roadmap_id, func.count())
+			.where(Task.roadmap_id.in_([item["roadmap_id"] for item in saved]))
+			.group_by(Task.roadmap_id)
+		)).all())
+		self.assertEqual([counts[item["roadmap_id"]] for item in saved], [1, 3])
+
+	async def test_batch_streams_items_as_they_complete(self):
+		release = asyncio.Event()
+
+		async def chat(prompt, **kwargs):
+			if prompt == SLOW_PROMPT:
+				await release.wait()
+			if prompt == BROKEN_PROMPT:
+				raise ValueError("bad json")
+			return _roadmap(prompt)
+
+		user = (await self.db.execute(select(User).where(User.user_id == self.user_id))).scalar_one()
+		request = AIBatchRequest(items=[{"prompt": SLOW_PROMPT}, {"prompt": "Пробежать марафон"}, {"prompt": BROKEN_PROMPT}])
+		with patch("app.api.v1.ai.ai_router.ai_service.chat", new=chat):
+			response = await ai_chat_batch(request, current_user=user, db=self.db)
+			self.assertFalse(self.db.in_transaction())
+
+			stream = response.body_iterator
+			early = [json.loads(await stream.__anext__()) for _ in range(2)]
+			release.set()
+			rest = [json.loads(line) async for line in stream]
+
+		self.assertEqual(sorted((item["index"], item["status"]) for item in early), [(1, "ok"), (2, "error")])
+		self.assertEqual([(item["index"], item["status"]) for item in rest[:-1]], [(0, "ok")])
+		self.assertEqual(rest[-1], {"status": "done", "total": 3, "succeeded": 2, "failed": 1})
+
+
+if __name__ == "__main__":
+	unittest.main()
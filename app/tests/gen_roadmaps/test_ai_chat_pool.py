@@ -0,0 +1,96 @@
+import asyncio
+import unittest
+from uuid import uuid4
+from unittest.mock import patch
+
+from sqlalchemy import delete, select
+
+from app.api.v1.ai.ai_router import ai_chat
+from app.core.database.database import AsyncSessionLocal, engine
+from app.models.user import User
+from app.schemas.ai_schemas import AIRoadmapRequest
+from app.services.user.auth_service import AuthService
+
+CONCURRENT_CHATS = 4
+PROVIDER_DELAY = 0.5
+
+AIRETURN = {
+	"goal_title": "Подготовиться к марафону",
+	"goal_description": "План тренировок.",
+	"tasks": [
+		{
+			"title": "Пробежать 10 км",
+			"description": "Спокойный темп.",
+			"order_index": 0,
+			"deadline_offset_days": 14,
+		},
+	],
+}
+
+
+class AIChatPoolUsageTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		self.created_user_id = None
+
+	async def asyncTearDown(self):
+		try:
+			if self.created_user_id is not None:
+				await self.db.execute(delete(User).where(User.user_id == self.created_user_id))
+				await self.db.commit()
+			else:
+				await self.db.rollback()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def test_connections_are_released_while_waiting_for_provider(self):
+		username = f"pool_user_{uuid4().hex[:8]}"
+		self.created_user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		await self.db.commit()
+
+		pool = engine.sync_engine.pool
+		baseline = pool.checkedout()
+		in_flight_samples = []
+		all_waiting = asyncio.Event()
+		waiting = 0
+
+		async def slow_chat(*args, **kwargs):
+			nonlocal waiting
+			waiting += 1
+			if waiting == CONCURRENT_CHATS:
+				all_waiting.set()
+			await asyncio.sleep(PROVIDER_DELAY)
+			return AIRETURN
+
+		async def run_chat():
+			async with AsyncSessionLocal() as session:
+				user = (await session.execute(select(User).where(User.user_id == self.created_user_id))).scalar_one()
+				return await ai_chat(
+					AIRoadmapRequest(prompt="Подготовиться к марафону за 2 недели", use_template=False),
+					current_user=user,
+					db=session,
+				)
+
+		async def sample_pool():
+			await all_waiting.wait()
+			for _ in range(5):
+				in_flight_samples.append(pool.checkedout())
+				await asyncio.sleep(PROVIDER_DELAY / 10)
+
+		with patch("app.api.v1.ai.ai_router.ai_service.chat", new=slow_chat):
+			results = await asyncio.gather(*(run_chat() for _ in range(CONCURRENT_CHATS)), sample_pool())
+
+		self.assertEqual(len(results) - 1, CONCURRENT_CHATS)
+		self.assertTrue(in_flight_samples)
+		self.assertEqual(max(in_flight_samples), baseline)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,118 @@
+import json
+import unittest
+from uuid import uuid4
+
+from sqlalchemy import delete, select
+
+from app.core.ai.ai_config import MESSAGE_TOKEN_OVERHEAD, SUMMARY_COMPACTION_BATCH
+from app.core.database.database import AsyncSessionLocal, engine
+from app.models.ai_conversation import AIConversation
+from app.models.ai_message import AIMessage
+from app.models.user import User
+from app.services.ai_service.ai_context import estimate_tokens, load_conversation_context
+from app.services.ai_service.ai_history import create_conversation, save_chat
+from app.services.user.auth_service import AuthService
+
+
+class ConversationContextTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		username = f"context_user_{uuid4().hex[:8]}"
+		self.user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		self.conversation_id = await create_conversation(self.db, self.user_id)
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(User).where(User.user_id == self.user_id))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def _exchange(self, pairs):
+		for user_content, ai_content in pairs:
+			await save_chat(self.db, self.user_id, user_content, ai_content, self.conversation_id)
+		await self.db.commit()
+		return (
+			await self.db.execute(
+				select(AIMessage.message_id)
+				.where(AIMessage.conversation_id == self.conversation_id)
+				.order_by(AIMessage.message_id)
+			)
+		).scalars().all()
+
+	async def _conversation(self):
+		return await self.db.get(AIConversation, self.conversation_id)
+
+	async def test_budget_keeps_latest_messages_and_summarizes_the_rest(self):
+		content = "слово " * 50
+		message_ids = await self._exchange([(content, content)] * 3)
+		conversation = await self._conversation()
+
+		history = await load_conversation_context(
+			self.db,
+			conversation,
+			token_budget=2 * (estimate_tokens(content) + MESSAGE_TOKEN_OVERHEAD),
+		)
+
+		self.assertEqual([item["role"] for item in history], ["system", "user", "assistant"])
+		self.assertEqual(conversation.summary_message_id, message_ids[3])
+		self.assertEqual(conversation.summary.count("\n"), 3)
+		self.assertIn(conversation.summary, history[0]["content"])
+
+	async def test_messages_before_summary_boundary_are_not_reread(self):
+		message_ids = await self._exchange([("Первый вопрос", "Первый ответ"), ("Второй вопрос", "Второй ответ")])
+		conversation = await self._conversation()
+		conversation.summary = "Пользователь: Первый вопрос\nАссистент: Первый ответ"
+		conversation.summary_message_id = message_ids[1]
+
+		history = await load_conversation_context(self.db, conversation, token_budget=1000)
+
+		self.assertEqual(history, [
+			{
+				"role": "system",
+				"content": "Краткое содержание предыдущей части диалога:\n"
+				"Пользователь: Первый вопрос\nАссистент: Первый ответ",
+			},
+			{"role": "user", "content": "Второй вопрос"},
+			{"role": "assistant", "content": "Второй ответ"},
+		])
+		self.assertEqual(conversation.summary_message_id, message_ids[1])
+
+	async def test_compaction_folds_one_batch_per_call(self):
+		roadmap = json.dumps({"goal_title": "Марафон", "tasks": [{}, {}]}, ensure_ascii=False)
+		pairs = [(f"Вопрос {idx}", f"Ответ {idx}") for idx in range(59)] + [("Последний вопрос", roadmap)]
+		message_ids = await self._exchange(pairs)
+		conversation = await self._conversation()
+
+		boundaries = []
+		for _ in range(3):
+			history = await load_conversation_context(self.db, conversation, token_budget=1000, max_messages=4)
+			boundaries.append(conversation.summary_message_id)
+
+		self.assertEqual(boundaries, [
+			message_ids[SUMMARY_COMPACTION_BATCH - 1],
+			message_ids[2 * SUMMARY_COMPACTION_BATCH - 1],
+			message_ids[-5],
+		])
+		self.assertTrue(conversation.summary.endswith("Пользователь: Вопрос 57\nАссистент: Ответ 57"))
+		self.assertEqual(history[-1], {"role": "assistant", "content": roadmap})
+
+		# Больше нечего сворачивать: граница не сдвигается, пока не придут новые сообщения.
+		await load_conversation_context(self.db, conversation, token_budget=1000, max_messages=4)
+		self.assertEqual(conversation.summary_message_id, message_ids[-5])
+
+	async def test_assistant_roadmap_is_summarized_by_title(self):
+		roadmap = json.dumps({"goal_title": "Марафон", "tasks": [{}, {}]}, ensure_ascii=False)
+		await self._exchange([("Подготовь к марафону", roadmap), ("Спасибо", "Пожалуйста")])
+		conversation = await self._conversation()
+
+		await load_conversation_context(self.db, conversation, token_budget=1000, max_messages=2)
+
+		self.assertEqual(conversation.summary, "Пользователь: Подготовь к марафону\nАссистент: план «Марафон» (2 задач)")
@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.services.ai_service.ai_helth import AIHealthMonitor
+
+MONOTONIC = "app.services.ai_service.ai_helth.time.monotonic"
+CHECK = "app.services.ai_service.ai_helth.check_ai_health"
+
+
+class AIHealthMonitorTests(unittest.IsolatedAsyncioTestCase):
+	def test_snapshot_is_unknown_before_first_result(self):
+		snapshot = AIHealthMonitor(interval=60).snapshot()
+
+		self.assertEqual((snapshot["ok"], snapshot["status"], snapshot["age_seconds"]), (None, "unknown", None))
+		self.assertEqual(snapshot["probe"]["probes_sent"], 0)
+
+	def test_snapshot_reports_age_of_recorded_traffic(self):
+		monitor = AIHealthMonitor(interval=60)
+		with patch(MONOTONIC, return_value=100.0):
+			monitor.record_traffic(False, 0.25, "HTTP 502")
+		with patch(MONOTONIC, return_value=112.5):
+			snapshot = monitor.snapshot()
+
+		self.assertEqual(snapshot["status"], "degraded")
+		self.assertEqual(snapshot["error"], "HTTP 502")
+		self.assertEqual(snapshot["source"], "traffic")
+		self.assertEqual(snapshot["latency_ms"], 250.0)
+		self.assertEqual(snapshot["age_seconds"], 12.5)
+
+	async def test_probe_is_skipped_while_traffic_is_fresh(self):
+		monitor = AIHealthMonitor(interval=60)
+		check = AsyncMock(return_value={"ok": True, "status": "ready"})
+		with patch(CHECK, check):
+			with patch(MONOTONIC, return_value=100.0):
+				monitor.record_traffic(True, 0.1)
+			with patch(MONOTONIC, return_value=130.0):
+				await monitor.probe()
+			check.assert_not_awaited()
+
+			with patch(MONOTONIC, return_value=170.0):
+				await monitor.probe()
+		check.assert_awaited_once()
+		self.assertEqual((monitor.probes_sent, monitor.probes_skipped), (1, 1))
+		self.assertEqual(monitor.snapshot()["source"], "probe")
+
+	async def test_passive_off_ignores_traffic(self):
+		monitor = AIHealthMonitor(interval=60, passive=False)
+		monitor.record_traffic(False, 0.1, "HTTP 500")
+		with patch(CHECK, AsyncMock(return_value={"ok": True, "status": "ready"})):
+			await monitor.probe()
+
+		self.assertEqual((monitor.snapshot()["ok"], monitor.probes_sent), (True, 1))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+from app.core.database.database import AsyncSessionLocal, engine
+from app.models.ai_conversation import AIConversation
+from app.models.user import User
+from app.schemas.ai_schemas import AIConversationListResponse, AIMessageListResponse
+from app.services.ai_service.ai_history import (
+	LAST_MESSAGE_SNIPPET_LENGTH,
+	fetch_conversation_messages,
+	list_conversations,
+	save_chat,
+)
+from app.services.user.auth_service import AuthService
+
+
+class ConversationHistoryTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		self.user_ids = []
+		self.user_id = await self._register()
+		await self.db.commit()
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(User).where(User.user_id.in_(self.user_ids)))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def _register(self):
+		username = f"history_user_{uuid4().hex[:8]}"
+		user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		self.user_ids.append(user_id)
+		return user_id
+
+	async def _conversation(self, user_id, updated_at):
+		conversation = AIConversation(user_id=user_id, created_at=updated_at, updated_at=updated_at)
+		self.db.add(conversation)
+		await self.db.flush()
+		return conversation.conversation_id
+
+	async def test_conversation_pages_follow_keyset_without_gaps(self):
+		started = datetime(2026, 1, 1, 12, 0)
+		# Две беседы с одинаковым updated_at: порядок между ними задает conversation_id.
+		ids = [
+			await self._conversation(self.user_id, started + timedelta(minutes=minutes))
+			for minutes in (0, 10, 10, 20, 30)
+		]
+		await self.db.commit()
+
+		pages, cursor = [], None
+		while True:
+			page = await list_conversations(self.db, self.user_id, limit=2, cursor=cursor)
+			pages.append([item["conversation_id"] for item in page["conversations"]])
+			cursor = page["next_cursor"]
+			if cursor is None:
+				break
+
+		self.assertEqual(pages, [[ids[4], ids[3]], [ids[2], ids[1]], [ids[0]]])
+
+	async def test_conversations_include_count_and_last_message(self):
+		started = datetime(2026, 1, 1, 12, 0)
+		empty_id = await self._conversation(self.user_id, started)
+		chat_id = await self._conversation(self.user_id, started)
+		other_id = await self._conversation(await self._register(), started)
+		long_answer = "Ответ " * 50
+		await save_chat(self.db, self.user_id, "Первый вопрос", "Первый ответ", chat_id)
+		await save_chat(self.db, self.user_id, "Второй вопрос", long_answer, chat_id)
+		await self.db.commit()
+
+		result = await list_conversations(self.db, self.user_id)
+		AIConversationListResponse.model_validate(result)
+
+		by_id = {item["conversation_id"]: item for item in result["conversations"]}
+		self.assertEqual(list(by_id), [chat_id, empty_id])
+		self.assertNotIn(other_id, by_id)
+		self.assertEqual(by_id[chat_id]["message_count"], 4)
+		self.assertEqual(by_id[chat_id]["last_message"], long_answer[:LAST_MESSAGE_SNIPPET_LENGTH])
+		self.assertIsNotNone(by_id[chat_id]["last_message_at"])
+		self.assertEqual(by_id[empty_id]["message_count"], 0)
+		self.assertIsNone(by_id[empty_id]["last_message"])
+		self.assertIsNone(by_id[empty_id]["last_message_at"])
+
+	async def test_message_pages_go_back_in_time_in_chronological_order(self):
+		conversation_id = await self._conversation(self.user_id, datetime(2026, 1, 1, 12, 0))
+		for idx in range(3):
+			await save_chat(self.db, self.user_id, f"Вопрос {idx}", f"Ответ {idx}", conversation_id)
+		await self.db.commit()
+
+		pages, cursor = [], None
+		while True:
+			page = await fetch_conversation_messages(self.db, self.user_id, conversation_id, limit=4, cursor=cursor)
+			AIMessageListResponse.model_validate(page)
+			pages.append([(item["role"], item["content"]) for item in page["messages"]])
+			cursor = page["next_cursor"]
+			if cursor is None:
+				break
+
+		self.assertEqual(pages, [
+			[("user", "Вопрос 1"), ("assistant", "Ответ 1"), ("user", "Вопрос 2"), ("assistant", "Ответ 2")],
+			[("user", "Вопрос 0"), ("assistant", "Ответ 0")],
+		])
+
+	async def test_messages_of_foreign_conversation_are_not_found(self):
+		conversation_id = await self._conversation(await self._register(), datetime(2026, 1, 1, 12, 0))
+		await self.db.commit()
+
+		with self.assertRaises(HTTPException) as ctx:
+			await fetch_conversation_messages(self.db, self.user_id, conversation_id)
+
+		self.assertEqual(ctx.exception.status_code, 404)
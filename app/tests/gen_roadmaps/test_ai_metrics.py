@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+
+from fastapi.routing import APIRoute
+
+from app.api.v1.ai.ai_router import router
+from app.services.ai_service.ai_metrics import AIMetrics, PhaseStats
+from app.services.user.get_my_user import get_current_user
+
+
+class AIMetricsTests(unittest.IsolatedAsyncioTestCase):
+	def test_phase_percentiles(self):
+		stats = PhaseStats()
+		for ms in range(1, 101):
+			stats.observe(ms / 1000)
+
+		snapshot = stats.snapshot()
+
+		self.assertEqual(snapshot["count"], 100)
+		self.assertEqual(snapshot["avg_ms"], 50.5)
+		self.assertEqual((snapshot["p50_ms"], snapshot["p95_ms"], snapshot["max_ms"]), (51.0, 96.0, 100.0))
+		self.assertIsNone(PhaseStats().snapshot()["p50_ms"])
+
+	async def test_server_timing_collects_phases_of_current_request(self):
+		metrics = AIMetrics()
+
+		async def request(name):
+			timings = metrics.start_request()
+			metrics.observe("provider", 0.5)
+			metrics.observe("provider", 0.25)
+			metrics.observe(name, 0.0125)
+			return timings.server_timing()
+
+		first, second = await asyncio.gather(
+			asyncio.create_task(request("parse")),
+			asyncio.create_task(request("db_write")),
+		)
+
+		self.assertEqual(first, "provider;dur=750.0, parse;dur=12.5")
+		self.assertEqual(second, "provider;dur=750.0, db_write;dur=12.5")
+		self.assertEqual(metrics.phases["provider"].count, 4)
+
+	def test_metrics_endpoint_requires_authentication(self):
+		route = next(route for route in router.routes if isinstance(route, APIRoute) and route.path.endswith("/metrics"))
+
+		self.assertIn(get_current_user, [dependency.call for dependency in route.dependant.dependencies])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,160 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import patch
+
+import httpx
+
+from app.core.ai.ai_config import RETRY_AFTER_MAX, RETRY_BACKOFF_MAX, RETRY_DELAY
+from app.services.ai_service.ai_chat_roadmap import AIRoadmapService
+from app.services.ai_service.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+MONOTONIC = "app.services.ai_service.circuit_breaker.time.monotonic"
+URL = "http://provider/chat/completions"
+
+
+class CircuitBreakerTests(unittest.TestCase):
+	def _open_breaker(self):
+		breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30, half_open_max_calls=1)
+		with patch(MONOTONIC, return_value=100.0):
+			for _ in range(2):
+				breaker.before_call()
+				breaker.record_failure()
+		return breaker
+
+	def test_opens_after_consecutive_failures(self):
+		breaker = self._open_breaker()
+
+		self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+		with patch(MONOTONIC, return_value=110.0):
+			with self.assertRaises(CircuitOpenError) as ctx:
+				breaker.before_call()
+		self.assertEqual(ctx.exception.retry_after, 20.0)
+
+	def test_success_resets_failure_streak(self):
+		breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+		breaker.record_failure()
+		breaker.record_success()
+		breaker.record_failure()
+
+		self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+	def test_half_open_admits_single_probe(self):
+		breaker = self._open_breaker()
+		with patch(MONOTONIC, return_value=131.0):
+			breaker.before_call()
+			self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+			with self.assertRaises(CircuitOpenError):
+				breaker.before_call()
+
+		breaker.record_success()
+		self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+	def test_failed_probe_reopens(self):
+		breaker = self._open_breaker()
+		with patch(MONOTONIC, return_value=131.0):
+			breaker.before_call()
+			breaker.record_failure()
+
+		self.assertEqual((breaker.state, breaker.times_opened), (CircuitBreaker.OPEN, 2))
+
+	def test_released_probe_frees_slot(self):
+		breaker = self._open_breaker()
+		with patch(MONOTONIC, return_value=131.0):
+			breaker.before_call()
+			breaker.release()
+			breaker.before_call()
+
+		self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+
+class RetryDelayTests(unittest.TestCase):
+	def test_parse_retry_after(self):
+		parse = AIRoadmapService._parse_retry_after
+		future = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+		self.assertEqual(parse("5"), 5.0)
+		self.assertEqual(parse("-3"), 0.0)
+		self.assertAlmostEqual(parse(format_datetime(future, usegmt=True)), 30, delta=2)
+		self.assertIsNone(parse("later"))
+		self.assertIsNone(parse(None))
+
+	def test_backoff_jitter_stays_within_bounds(self):
+		for attempt in range(8):
+			backoff = min(RETRY_BACKOFF_MAX, RETRY_DELAY * (2 ** attempt))
+			for _ in range(50):
+				delay = AIRoadmapService._retry_delay(attempt)
+				self.assertGreaterEqual(delay, backoff / 2)
+				self.assertLessEqual(delay, backoff)
+
+	def test_retry_after_extends_or_cancels_retry(self):
+		def response(retry_after):
+			return httpx.Response(429, headers={"Retry-After": str(retry_after)})
+
+		self.assertGreaterEqual(AIRoadmapService._retry_delay(0, response(7)), 7)
+		self.assertIsNone(AIRoadmapService._retry_delay(0, response(RETRY_AFTER_MAX + 1)))
+
+
+class HedgingTests(unittest.IsolatedAsyncioTestCase):
+	def _service(self, handler):
+		service = AIRoadmapService()
+		service.hedge_enabled = True
+		service.transport = httpx.MockTransport(handler)
+		return service
+
+	def test_hedge_waits_for_enough_samples(self):
+		service = self._service(lambda request: httpx.Response(200))
+		service._latencies.extend([0.1] * 19)
+		self.assertIsNone(service._hedge_delay())
+
+		service._latencies.extend([1.0])
+		self.assertEqual(service._hedge_delay(), 1.0)
+
+	async def test_backup_wins_and_slow_request_is_cancelled(self):
+		cancelled = asyncio.Event()
+		started = 0
+
+		async def handler(request):
+			nonlocal started
+			started += 1
+			if started == 1:
+				try:
+					await asyncio.sleep(5)
+				except asyncio.CancelledError:
+					cancelled.set()
+					raise
+			return httpx.Response(200, json={"attempt": started})
+
+		service = self._service(handler)
+		async with httpx.AsyncClient(transport=service.transport) as client:
+			resp = await service._send_hedged(client, URL, {}, {}, 0.01)
+			await asyncio.wait_for(cancelled.wait(), 1)
+
+		self.assertEqual(resp.json(), {"attempt": 2})
+		self.assertEqual(service.hedged_requests, 1)
+
+	async def test_cancelled_caller_cancels_primary(self):
+		cancelled = asyncio.Event()
+
+		async def handler(request):
+			try:
+				await asyncio.sleep(5)
+			except asyncio.CancelledError:
+				cancelled.set()
+				raise
+
+		service = self._service(handler)
+		async with httpx.AsyncClient(transport=service.transport) as client:
+			call = asyncio.create_task(service._send_hedged(client, URL, {}, {}, 1.0))
+			await asyncio.sleep(0.05)
+			call.cancel()
+			with self.assertRaises(asyncio.CancelledError):
+				await call
+			await asyncio.wait_for(cancelled.wait(), 1)
+
+		self.assertEqual(service.hedged_requests, 0)
+
+
+if __name__ == "__main__":
+	unittest.main()
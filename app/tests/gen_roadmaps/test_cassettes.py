@@ -0,0 +1,44 @@
+import tempfile
+import unittest
+
+import httpx
+
+from app.services.ai_service.ai_chat_roadmap import AIRoadmapService
+from app.services.ai_service.cassette import CassetteStore
+
+PAYLOAD = {"model": "test", "messages": [{"role": "user", "content": "План"}], "max_tokens": 10}
+RESPONSE = {"choices": [{"message": {"content": "{}"}}]}
+
+
+def _unreachable(request):
+	raise AssertionError(f"Запрос к провайдеру не ожидался: {request.url}")
+
+
+class CassetteTests(unittest.IsolatedAsyncioTestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.service = AIRoadmapService()
+		self.service.api_key = None
+		self.service.transport = httpx.MockTransport(_unreachable)
+		self.service.cassettes = CassetteStore(self.directory.name, "auto")
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	async def test_auto_mode_without_key_replays_recorded_exchange(self):
+		self.service.cassettes.save(PAYLOAD, RESPONSE)
+
+		response = await self.service._post_completion("http://provider/chat/completions", {}, PAYLOAD)
+
+		self.assertEqual(response, RESPONSE)
+
+	async def test_auto_mode_without_key_fails_fast_on_miss(self):
+		with self.assertRaises(ValueError) as ctx:
+			await self.service._post_completion("http://provider/chat/completions", {}, PAYLOAD)
+
+		self.assertIn("PROXYAPI_KEY", str(ctx.exception))
+		self.assertEqual(self.service.cassettes.misses, 1)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,169 @@
+import asyncio
+import unittest
+from uuid import uuid4
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+from app.api.v1.ai.ai_router import _run_ai_chat, ai_chat
+from app.core.database.database import AsyncSessionLocal, engine
+from app.core.settings.settings import settings
+from app.models.ai_conversation import AIConversation
+from app.models.ai_message import AIMessage
+from app.models.user import User
+from app.schemas.ai_schemas import AIRoadmapRequest
+from app.services.ai_service.ai_history import create_conversation
+from app.services.ai_service.ai_metrics import ai_metrics
+from app.services.ai_service.conversation_lock import ConversationBusyError, ConversationLocks
+from app.services.user.auth_service import AuthService
+
+AIRETURN = {
+	"goal_title": "Выучить испанский",
+	"goal_description": "План.",
+	"tasks": [{"title": "Алфавит", "description": "", "order_index": 0, "deadline_offset_days": 7}],
+}
+
+
+class ConversationHoldTests(unittest.IsolatedAsyncioTestCase):
+	async def test_requests_in_one_conversation_run_in_turn(self):
+		locks = ConversationLocks(use_lease=False)
+		order = []
+
+		async def request(name):
+			async with locks.hold(1):
+				order.append(f"{name}:start")
+				await asyncio.sleep(0.05)
+				order.append(f"{name}:end")
+
+		await asyncio.gather(request("a"), request("b"))
+
+		self.assertEqual(order, ["a:start", "a:end", "b:start", "b:end"])
+		self.assertEqual(locks.snapshot(), {"active": 0, "waited": 1, "rejected": 0, "conflicts": 0})
+
+	async def test_busy_conversation_is_rejected_without_waiting(self):
+		locks = ConversationLocks(use_lease=False)
+		async with locks.hold(1):
+			with self.assertRaises(ConversationBusyError):
+				async with locks.hold(1, wait=False):
+					pass
+			with self.assertRaises(ConversationBusyError):
+				async with locks.hold(1, timeout=0.05):
+					pass
+			async with locks.hold(2, wait=False):
+				pass
+
+		self.assertEqual(locks.rejected, 2)
+
+
+class ConversationPhaseTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		username = f"lock_user_{uuid4().hex[:8]}"
+		self.user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		self.conversation_id = await create_conversation(self.db, self.user_id)
+		await self.db.commit()
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(User).where(User.user_id == self.user_id))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def _messages(self):
+		return (await self.db.execute(
+			select(func.count()).select_from(AIMessage).where(AIMessage.conversation_id == self.conversation_id)
+		)).scalar_one()
+
+	async def _lease_token(self):
+		return (await self.db.execute(
+			select(AIConversation.busy_token).where(AIConversation.conversation_id == self.conversation_id)
+		)).scalar_one()
+
+	async def test_lease_blocks_other_sessions_until_released(self):
+		locks = ConversationLocks()
+		async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+			token = await locks.claim(first, self.conversation_id)
+			await first.commit()
+			with self.assertRaises(ConversationBusyError):
+				await locks.claim(second, self.conversation_id, wait=False)
+			await second.rollback()
+
+			await locks.release(first, self.conversation_id, token)
+			await first.commit()
+			self.assertIsNotNone(await locks.claim(second, self.conversation_id, wait=False))
+			await second.commit()
+
+	async def test_expired_lease_is_taken_over_and_old_owner_conflicts(self):
+		locks = ConversationLocks()
+		async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+			with patch.object(settings, "AI_CONVERSATION_LEASE_SECONDS", 0):
+				stale = await locks.claim(first, self.conversation_id)
+			await first.commit()
+			await locks.claim(second, self.conversation_id, wait=False)
+			await second.commit()
+
+			with self.assertRaises(ConversationBusyError):
+				await locks.release(first, self.conversation_id, stale)
+
+		self.assertEqual(locks.conflicts, 1)
+
+	async def test_racing_workers_call_provider_once(self):
+		calls = 0
+
+		async def chat(*args, **kwargs):
+			nonlocal calls
+			calls += 1
+			await asyncio.sleep(0.3)
+			return AIRETURN
+
+		async def worker():
+			# Каждый воркер со своей сессией и без общего asyncio.Lock, как в отдельных процессах.
+			async with AsyncSessionLocal() as session:
+				user = (await session.execute(select(User).where(User.user_id == self.user_id))).scalar_one()
+				request = AIRoadmapRequest(prompt="Выучить испанский за месяц", conversation_id=self.conversation_id)
+				return await _run_ai_chat(request, user, session, None, ai_metrics.start_request(), wait=False)
+
+		with patch("app.api.v1.ai.ai_router.ai_service.chat", new=chat):
+			results = await asyncio.gather(worker(), worker(), return_exceptions=True)
+
+		rejected = [result for result in results if isinstance(result, HTTPException)]
+		self.assertEqual(calls, 1)
+		self.assertEqual([error.status_code for error in rejected], [409])
+		self.assertEqual(await self._messages(), 2)
+		self.assertIsNone(await self._lease_token())
+
+	async def test_failed_provider_call_releases_lease(self):
+		async def chat(*args, **kwargs):
+			raise ValueError("Empty response from AI")
+
+		user = (await self.db.execute(select(User).where(User.user_id == self.user_id))).scalar_one()
+		request = AIRoadmapRequest(prompt="Выучить испанский за месяц", conversation_id=self.conversation_id)
+		with patch("app.api.v1.ai.ai_router.ai_service.chat", new=chat):
+			with self.assertRaises(HTTPException) as ctx:
+				await ai_chat(request, current_user=user, db=self.db)
+
+		self.assertEqual(ctx.exception.status_code, 400)
+		self.assertIsNone(await self._lease_token())
+
+	async def test_sequential_requests_in_conversation_succeed(self):
+		async def chat(*args, **kwargs):
+			return AIRETURN
+
+		user = (await self.db.execute(select(User).where(User.user_id == self.user_id))).scalar_one()
+		request = AIRoadmapRequest(prompt="Выучить испанский за месяц", conversation_id=self.conversation_id)
+		with patch("app.api.v1.ai.ai_router.ai_service.chat", new=chat):
+			for _ in range(2):
+				result = await ai_chat(request, current_user=user, db=self.db)
+				self.assertEqual(result.goal_title, AIRETURN["goal_title"])
+
+if __name__ == "__main__":
+	unittest.main()
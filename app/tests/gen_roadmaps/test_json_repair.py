@@ -0,0 +1,104 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from app.services.ai_service.ai_chat_roadmap import AIRoadmapService
+from app.services.ai_service.json_repair import (
+	REPAIR_CLEANED,
+	REPAIR_NONE,
+	REPAIR_TRUNCATED,
+	parse_llm_json,
+)
+
+ROADMAP = {
+	"goal_title": "Изучить Python",
+	"goal_description": "План на месяц",
+	"tasks": [
+		{"title": "Основы", "description": "Синтаксис, {скобки} и \"кавычки\"", "order_index": 0, "deadline_offset_days": 7},
+		{"title": "Проект", "description": "Пет-проект", "order_index": 1, "deadline_offset_days": 21},
+		{"title": "Итоги", "description": "Ревью", "order_index": 2, "deadline_offset_days": 30},
+	],
+}
+
+
+class JsonRepairTests(unittest.TestCase):
+	def setUp(self):
+		self.raw = json.dumps(ROADMAP, ensure_ascii=False)
+
+	def test_valid_json_is_not_repaired(self):
+		data, repair = parse_llm_json(self.raw)
+
+		self.assertEqual(data, ROADMAP)
+		self.assertEqual(repair, REPAIR_NONE)
+
+	def test_fence_prose_comments_and_trailing_commas(self):
+		content = (
+			"Конечно! Вот план:\n```json\n"
+			+ self.raw.replace('"tasks": [', '"tasks": [ // задачи\n').replace("}]}", "},]}")
+			+ "\n```\nУдачи в обучении!"
+		)
+
+		data, repair = parse_llm_json(content)
+
+		self.assertEqual(data, ROADMAP)
+		self.assertEqual(repair, REPAIR_CLEANED)
+
+	def test_truncated_output_keeps_only_complete_tasks(self):
+		cut = self.raw.index('"title": "Итоги"') + 12
+
+		data, repair = parse_llm_json(self.raw[:cut])
+
+		self.assertEqual(repair, REPAIR_TRUNCATED)
+		self.assertEqual(data["goal_title"], ROADMAP["goal_title"])
+		self.assertEqual(data["tasks"], ROADMAP["tasks"][:2])
+
+	def test_truncated_nested_array_drops_the_whole_task(self):
+		content = '{"goal_title":"a","tasks":[{"title":"x"},{"title":"y","skills":["p","q'
+
+		data, repair = parse_llm_json(content)
+
+		self.assertEqual(repair, REPAIR_TRUNCATED)
+		self.assertEqual(data, {"goal_title": "a", "tasks": [{"title": "x"}]})
+
+	def test_unrecoverable_text_raises(self):
+		with self.assertRaises(json.JSONDecodeError):
+			parse_llm_json("Извините, я не могу составить план.")
+
+
+class TruncatedReplyTests(unittest.IsolatedAsyncioTestCase):
+	def _service(self, replies):
+		calls = []
+
+		def handler(request):
+			calls.append(request)
+			content = replies[min(len(calls), len(replies)) - 1]
+			return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+		service = AIRoadmapService()
+		service.transport = httpx.MockTransport(handler)
+		return service, calls
+
+	async def test_truncated_reply_is_accepted_for_new_roadmap(self):
+		raw = json.dumps(ROADMAP, ensure_ascii=False)
+		service, calls = self._service([raw[: raw.index('"title": "Итоги"') + 12]])
+
+		data = await service.chat("Изучить Python")
+
+		self.assertEqual(len(calls), 1)
+		self.assertEqual(data["tasks"], ROADMAP["tasks"][:2])
+
+	async def test_truncated_reply_is_retried_when_editing_roadmap(self):
+		raw = json.dumps(ROADMAP, ensure_ascii=False)
+		service, calls = self._service([raw[: raw.index('"title": "Итоги"') + 12], raw])
+
+		with patch.object(AIRoadmapService, "_async_sleep"):
+			data = await service.chat("Добавь деталей", current_roadmap_context=ROADMAP)
+
+		self.assertEqual(len(calls), 2)
+		self.assertEqual(data["tasks"], ROADMAP["tasks"])
+
+
+if __name__ == "__main__":
+	unittest.main()
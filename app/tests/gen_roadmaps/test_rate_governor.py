@@ -0,0 +1,172 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+
+from app.core.ai.ai_config import HTTP_MAX_ATTEMPTS
+from app.services.ai_service.ai_chat_roadmap import AIRoadmapService
+from app.services.ai_service.rate_governor import RateGovernor, RateLimitTimeout, TokenBucket, parse_reset_duration
+
+PAYLOAD = {"model": "test", "messages": [{"role": "user", "content": "План"}], "max_tokens": 100}
+URL = "http://provider/chat/completions"
+
+
+class TokenBucketTests(unittest.TestCase):
+	def test_bucket_refills_per_minute(self):
+		bucket = TokenBucket(600)
+		bucket.consume(600, bucket.updated_at)
+
+		self.assertEqual(bucket.wait_time(100, bucket.updated_at), 10.0)
+		self.assertEqual(bucket.wait_time(100, bucket.updated_at + 10.0), 0.0)
+
+	def test_unlimited_bucket_never_waits(self):
+		bucket = TokenBucket(0)
+		bucket.consume(10 ** 6, 0.0)
+
+		self.assertEqual(bucket.wait_time(10 ** 6, 0.0), 0.0)
+
+	def test_parse_reset_duration(self):
+		self.assertEqual(parse_reset_duration("20ms"), 0.02)
+		self.assertEqual(parse_reset_duration("6m0s"), 360.0)
+		self.assertEqual(parse_reset_duration("1.5"), 1.5)
+		self.assertIsNone(parse_reset_duration("soon"))
+
+
+class RateGovernorTests(unittest.IsolatedAsyncioTestCase):
+	async def test_waiters_are_admitted_in_order(self):
+		governor = RateGovernor(tpm=60000, queue_timeout=5)
+		await governor.acquire(60000)
+		admitted = []
+
+		async def call(name):
+			await governor.acquire(100)
+			admitted.append(name)
+
+		first = asyncio.create_task(call("first"))
+		await asyncio.sleep(0)
+		await asyncio.gather(call("second"), first)
+
+		self.assertEqual(admitted, ["first", "second"])
+		self.assertEqual(governor.delayed, 2)
+
+	async def test_acquire_times_out_when_budget_will_not_free_in_time(self):
+		governor = RateGovernor(rpm=1, queue_timeout=0.05)
+		await governor.acquire(1)
+
+		with self.assertRaises(RateLimitTimeout) as ctx:
+			await governor.acquire(1)
+		self.assertGreater(ctx.exception.retry_after, 50)
+		self.assertEqual(governor.timed_out, 1)
+
+	async def test_penalize_blocks_until_retry_after(self):
+		governor = RateGovernor(queue_timeout=0.05)
+		governor.penalize(10)
+
+		with self.assertRaises(RateLimitTimeout):
+			await governor.acquire(1)
+		self.assertFalse(governor.try_acquire(1))
+
+	def test_limits_are_learned_from_headers(self):
+		governor = RateGovernor()
+		governor.update_from_headers({
+			"x-ratelimit-limit-requests": "100",
+			"x-ratelimit-remaining-requests": "0",
+			"x-ratelimit-reset-requests": "30s",
+			"x-ratelimit-limit-tokens": "5000",
+			"x-ratelimit-remaining-tokens": "4000",
+		})
+
+		snapshot = governor.snapshot()
+		self.assertEqual((snapshot["rpm_limit"], snapshot["tpm_limit"]), (100, 5000))
+		self.assertEqual(snapshot["tokens_available"], 4000)
+		self.assertFalse(governor.try_acquire(1))
+
+	def test_settle_refunds_unused_estimate(self):
+		governor = RateGovernor(rpm=10, tpm=1000)
+		self.assertTrue(governor.try_acquire(400))
+		governor.settle(400, 100)
+
+		self.assertAlmostEqual(governor.tokens.level, 900, delta=1)
+		self.assertAlmostEqual(governor.requests.level, 9, delta=0.1)
+
+
+class GovernedProviderCallTests(unittest.IsolatedAsyncioTestCase):
+	def setUp(self):
+		# Часы лимитера заморожены: пополнение корзин за время теста не искажает остатки.
+		clock = patch("app.services.ai_service.rate_governor.time", new=Mock(monotonic=Mock(return_value=1000.0)))
+		clock.start()
+		self.addCleanup(clock.stop)
+
+	def _service(self, handler):
+		service = AIRoadmapService()
+		service.api_key = "test-key"
+		service.transport = httpx.MockTransport(handler)
+		service.governor = RateGovernor(rpm=100, tpm=6000)
+		service._async_sleep = AsyncMock()
+		return service
+
+	async def test_failed_attempts_return_token_estimate(self):
+		def handler(request):
+			raise httpx.ConnectError("connection refused", request=request)
+
+		service = self._service(handler)
+		with self.assertRaises(httpx.ConnectError):
+			await service._post_completion(URL, {}, PAYLOAD)
+
+		self.assertAlmostEqual(service.governor.tokens.level, 6000, delta=5)
+		self.assertAlmostEqual(service.governor.requests.level, 100 - HTTP_MAX_ATTEMPTS, delta=0.1)
+
+	async def test_retried_server_errors_return_token_estimate(self):
+		calls = 0
+
+		def handler(request):
+			nonlocal calls
+			calls += 1
+			if calls == 1:
+				return httpx.Response(503, json={"error": "busy"})
+			return httpx.Response(200, json={"choices": [], "usage": {"total_tokens": 50}})
+
+		service = self._service(handler)
+		await service._post_completion(URL, {}, PAYLOAD)
+
+		self.assertAlmostEqual(service.governor.tokens.level, 6000 - 50, delta=5)
+		self.assertAlmostEqual(service.governor.requests.level, 98, delta=0.1)
+
+	async def test_cancelled_call_returns_token_estimate(self):
+		async def handler(request):
+			await asyncio.sleep(1)
+			return httpx.Response(200, json={"choices": []})
+
+		service = self._service(handler)
+		call = asyncio.create_task(service._post_completion(URL, {}, PAYLOAD))
+		await asyncio.sleep(0.05)
+		call.cancel()
+		with self.assertRaises(asyncio.CancelledError):
+			await call
+
+		self.assertAlmostEqual(service.governor.tokens.level, 6000, delta=5)
+
+	async def test_hedged_request_is_charged(self):
+		started = 0
+
+		async def handler(request):
+			nonlocal started
+			started += 1
+			if started == 1:
+				await asyncio.sleep(1)
+			return httpx.Response(200, json={"choices": [], "usage": {"total_tokens": 50}})
+
+		service = self._service(handler)
+		service.hedge_enabled = True
+		service._latencies.extend([0.01] * 20)
+
+		await service._post_completion(URL, {}, PAYLOAD)
+
+		self.assertEqual(service.hedged_requests, 1)
+		self.assertAlmostEqual(service.governor.requests.level, 98, delta=0.1)
+		self.assertAlmostEqual(service.governor.tokens.level, 6000 - 50, delta=5)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from datetime import datetime, timedelta
+
+from app.services.ai_service.roadmap_diff import diff_tasks
+
+
+def _task(task_id, title, order_index, description=None):
+	return {"task_id": task_id, "title": title, "description": description, "order_index": order_index}
+
+
+class RoadmapDiffTests(unittest.TestCase):
+	def test_unchanged_tasks_produce_no_statements(self):
+		existing = [_task(1, "Освоить основы", 0, "Синтаксис"), _task(2, "Написать проект", 1)]
+		incoming = [
+			{"title": "Освоить основы", "description": "Синтаксис", "order_index": 0},
+			{"title": "Написать проект", "description": None, "order_index": 1},
+		]
+
+		diff = diff_tasks(existing, incoming)
+
+		self.assertTrue(diff.is_empty)
+		self.assertEqual(diff.unchanged, 2)
+
+	def test_edited_task_keeps_its_id(self):
+		existing = [_task(1, "Освоить основы языка", 0), _task(2, "Написать проект", 1)]
+		incoming = [
+			{"title": "Освоить основы языка Python", "order_index": 0},
+			{"title": "Написать проект", "order_index": 1},
+		]
+
+		diff = diff_tasks(existing, incoming)
+
+		self.assertEqual([u["task_id"] for u in diff.updates], [1])
+		self.assertEqual(diff.updates[0]["title"], "Освоить основы языка Python")
+		self.assertNotIn("rank", diff.updates[0])
+		self.assertEqual(diff.inserts, [])
+		self.assertEqual(diff.deletes, [])
+
+	def test_insert_delete_and_reorder(self):
+		existing = [_task(1, "Прочитать книгу", 0), _task(2, "Пройти курс", 1), _task(3, "Сдать экзамен", 2)]
+		incoming = [
+			{"title": "Пройти курс", "order_index": 0},
+			{"title": "Решить задачи на практике", "order_index": 1},
+			{"title": "Сдать экзамен", "order_index": 2},
+		]
+
+		diff = diff_tasks(existing, incoming)
+
+		self.assertEqual(diff.deletes, [1])
+		self.assertEqual([u["task_id"] for u in diff.updates], [2])
+		self.assertEqual(diff.updates[0]["order_index"], 0)
+		self.assertEqual(diff.updates[0]["rank"], "")
+		self.assertEqual([i["title"] for i in diff.inserts], ["Решить задачи на практике"])
+		self.assertEqual(diff.unchanged, 1)
+
+	def test_missing_order_index_falls_back_to_position(self):
+		diff = diff_tasks([], [{"title": "Первая"}, {"title": "Вторая"}])
+
+		self.assertEqual([i["order_index"] for i in diff.inserts], [0, 1])
+
+	def test_new_tasks_get_due_date_from_roadmap_start(self):
+		start = datetime(2026, 1, 1)
+		existing = [_task(1, "Освоить основы", 0)]
+		incoming = [
+			{"title": "Освоить основы", "description": "Синтаксис", "order_index": 0, "deadline_offset_days": 3},
+			{"title": "Написать проект", "order_index": 1, "deadline_offset_days": 10},
+		]
+
+		diff = diff_tasks(existing, incoming, start)
+
+		self.assertEqual(diff.inserts[0]["due_at"], start + timedelta(days=10))
+		self.assertNotIn("due_at", diff.updates[0])
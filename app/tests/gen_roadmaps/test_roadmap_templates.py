@@ -0,0 +1,131 @@
+import unittest
+
+from sqlalchemy import select
+
+from app.core.database.database import AsyncSessionLocal, engine
+from app.core.init import init_roadmap_templates
+from app.core.init.templates import CURATED_TEMPLATES
+from app.models.roadmap_template import RoadmapTemplate
+from app.schemas.ai_schemas import AIRoadmapRequest, AIRoadmapResponse
+from app.services.ai_service.roadmap_templates import (
+	find_template,
+	mark_template_used,
+	normalize_title,
+	refresh_templates,
+	template_to_roadmap,
+)
+
+BIRDHOUSE = {
+	"title": "Собрать скворечник из фанеры",
+	"description": "Скворечник к весне.",
+	"tasks": [
+		{"title": "Купить фанеру", "description": "Лист 6 мм.", "deadline_offset_days": 2},
+		{"title": "Собрать корпус", "description": "По чертежу.", "deadline_offset_days": 5},
+	],
+}
+AQUARIUM = {
+	"title": "Запустить аквариум на 60 литров",
+	"description": "Первый аквариум.",
+	"tasks": [
+		{"title": "Купить оборудование", "description": "Фильтр и обогреватель.", "deadline_offset_days": 3},
+	],
+}
+
+
+class CuratedTemplatesTests(unittest.TestCase):
+	def test_catalogue_matches_roadmap_schema(self):
+		for template in CURATED_TEMPLATES:
+			tasks = [dict(task, order_index=idx) for idx, task in enumerate(template["tasks"])]
+			AIRoadmapResponse(goal_title=template["title"], goal_description=template["description"], tasks=tasks)
+			offsets = [task["deadline_offset_days"] for task in tasks]
+			self.assertEqual(offsets, sorted(offsets), template["title"])
+
+	def test_template_reuse_is_opt_in(self):
+		self.assertFalse(AIRoadmapRequest(prompt="Пробежать 5 километров").use_template)
+
+	def test_deadlines_are_scaled_to_requested_limit(self):
+		template = RoadmapTemplate(
+			title="Пробежать 5 километров",
+			description=None,
+			tasks=[
+				{"title": "Второй", "order_index": 1, "deadline_offset_days": 56},
+				{"title": "Первый", "order_index": 0, "deadline_offset_days": 14},
+			],
+		)
+
+		roadmap = template_to_roadmap(template, max_deadline_days=28)
+
+		self.assertEqual([(task["title"], task["deadline_offset_days"]) for task in roadmap["tasks"]], [
+			("Первый", 7),
+			("Второй", 28),
+		])
+
+
+class RoadmapTemplateLibraryTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		await refresh_templates(self.db, [BIRDHOUSE, AQUARIUM])
+		await self.db.commit()
+
+	async def asyncTearDown(self):
+		try:
+			# Возвращаем каталог: тестовые шаблоны удаляются как отсутствующие в нём.
+			await self.db.rollback()
+			await init_roadmap_templates(self.db)
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def _template(self, title):
+		return (
+			await self.db.execute(
+				select(RoadmapTemplate).where(RoadmapTemplate.normalized_title == normalize_title(title))
+			)
+		).scalars().first()
+
+	async def test_matches_title_regardless_of_case_and_spaces(self):
+		template = await find_template(self.db, "  собрать   СКВОРЕЧНИК из фанеры ")
+
+		self.assertIsNotNone(template)
+		self.assertEqual(template.title, BIRDHOUSE["title"])
+
+	async def test_prompt_with_extra_details_is_not_answered_by_template(self):
+		template = await find_template(
+			self.db,
+			"Собрать скворечник из фанеры за одни выходные вместе с сыном для школьного конкурса",
+		)
+
+		self.assertIsNone(template)
+
+	async def test_unrelated_prompt_does_not_match(self):
+		self.assertIsNone(await find_template(self.db, "Подготовиться к экзамену по химии"))
+
+	async def test_refresh_updates_changed_template_and_keeps_usage(self):
+		before = await self._template(BIRDHOUSE["title"])
+		template_id, created_at = before.template_id, before.created_at
+		await mark_template_used(self.db, template_id)
+		await self.db.commit()
+
+		changed = dict(BIRDHOUSE, description="Скворечник и кормушка к весне.", tasks=[
+			{"title": "Купить фанеру", "description": "Лист 8 мм.", "deadline_offset_days": 3},
+		])
+		await refresh_templates(self.db, [changed, AQUARIUM])
+		await self.db.commit()
+		self.db.expire_all()
+
+		after = await self._template(BIRDHOUSE["title"])
+		self.assertEqual(after.template_id, template_id)
+		self.assertEqual(after.description, "Скворечник и кормушка к весне.")
+		self.assertEqual(after.tasks, [
+			{"title": "Купить фанеру", "description": "Лист 8 мм.", "order_index": 0, "deadline_offset_days": 3},
+		])
+		self.assertEqual(after.usage_count, 1)
+		self.assertGreaterEqual(after.updated_at, created_at)
+
+	async def test_refresh_removes_templates_dropped_from_catalogue(self):
+		await refresh_templates(self.db, [BIRDHOUSE])
+		await self.db.commit()
+
+		self.assertIsNotNone(await self._template(BIRDHOUSE["title"]))
+		self.assertIsNone(await self._template(AQUARIUM["title"]))
+		self.assertIsNone(await find_template(self.db, AQUARIUM["title"]))
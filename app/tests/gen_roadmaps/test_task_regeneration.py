@@ -0,0 +1,63 @@
+import unittest
+
+from app.core.ai.ai_config import TASK_REGENERATION_PROMPT
+from app.services.ai_service.task_regeneration import (
+	REGENERATE_MARKER,
+	build_regeneration_messages,
+	regeneration_window,
+	validate_regenerated_tasks,
+)
+
+TASKS = [
+	{"task_id": 10 + idx, "title": f"Задача {idx}", "description": f"Описание {idx}", "order_index": idx}
+	for idx in range(8)
+]
+
+
+class TaskRegenerationTests(unittest.TestCase):
+	def test_window_keeps_neighbours_and_gaps(self):
+		window = regeneration_window(TASKS, {13, 15}, neighbours=1)
+
+		self.assertEqual([pos for pos, _, _ in window], [2, 3, 4, 5, 6])
+		self.assertEqual([task["task_id"] for _, task, selected in window if selected], [13, 15])
+
+	def test_window_is_clipped_at_roadmap_edges(self):
+		window = regeneration_window(TASKS, {10}, neighbours=2)
+
+		self.assertEqual([pos for pos, _, _ in window], [0, 1, 2])
+
+	def test_distant_tasks_get_separate_windows(self):
+		window = regeneration_window(TASKS, {10, 17}, neighbours=1)
+		messages = build_regeneration_messages("Цель", None, window, "Сделай конкретнее")
+
+		self.assertEqual([pos for pos, _, _ in window], [0, 1, 6, 7])
+		self.assertIn("2. Задача 1\n…\n7. Задача 6", messages[-1]["content"])
+		self.assertNotIn("Задача 3", messages[-1]["content"])
+
+	def test_prompt_refers_to_inline_marker(self):
+		self.assertIn(REGENERATE_MARKER, TASK_REGENERATION_PROMPT)
+		self.assertNotIn('раздела "ПЕРЕДЕЛАТЬ"', TASK_REGENERATION_PROMPT)
+
+	def test_prompt_sends_only_window_titles(self):
+		window = regeneration_window(TASKS, {17}, neighbours=2)
+		messages = build_regeneration_messages("Цель", None, window, "Сделай конкретнее")
+
+		user = messages[-1]["content"]
+		self.assertEqual(user.count(REGENERATE_MARKER), 1)
+		self.assertIn("8. [ПЕРЕДЕЛАТЬ] Задача 7 - Описание 7", user)
+		self.assertIn("6. Задача 5", user)
+		self.assertNotIn("Задача 4", user)
+		self.assertNotIn("Описание 5", user)
+
+	def test_validation_requires_same_number_of_tasks(self):
+		data = {"tasks": [{"title": "Новая", "description": "Текст"}]}
+
+		self.assertEqual(validate_regenerated_tasks(data, 1), [{"title": "Новая", "description": "Текст"}])
+		with self.assertRaises(ValueError):
+			validate_regenerated_tasks(data, 2)
+		with self.assertRaises(ValueError):
+			validate_regenerated_tasks({"tasks": [{"title": " "}]}, 1)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+from app.core.database.database import AsyncSessionLocal, engine
+from app.models.user import User
+from app.services.idempotency.idempotency_keys import REPLAY_HEADER, IdempotencyKeys
+from app.services.user.auth_service import AuthService
+
+
+class IdempotencyKeysTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		username = f"idem_user_{uuid4().hex[:8]}"
+		self.user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		await self.db.commit()
+		self.store = IdempotencyKeys()
+		self.calls = 0
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(User).where(User.user_id == self.user_id))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def _work(self):
+		self.calls += 1
+		await asyncio.sleep(0.2)
+		return {"roadmap_id": self.calls}
+
+	async def test_concurrent_duplicates_execute_once(self):
+		key = uuid4().hex
+		first, second = await asyncio.gather(
+			self.store.run(self.user_id, key, "POST /test", {"title": "A"}, self._work),
+			self.store.run(self.user_id, key, "POST /test", {"title": "A"}, self._work),
+		)
+
+		self.assertEqual(self.calls, 1)
+		self.assertEqual(first, {"roadmap_id": 1})
+		self.assertEqual(second.headers[REPLAY_HEADER], "true")
+		self.assertEqual(second.body, b'{"roadmap_id":1}')
+
+	async def test_other_workers_replay_stored_response(self):
+		key = uuid4().hex
+		await self.store.run(self.user_id, key, "POST /test", {"title": "A"}, self._work)
+		replay = await IdempotencyKeys().run(self.user_id, key, "POST /test", {"title": "A"}, self._work)
+
+		self.assertEqual(self.calls, 1)
+		self.assertEqual(replay.status_code, 200)
+
+	async def test_key_reused_for_other_request_is_rejected(self):
+		key = uuid4().hex
+		await self.store.run(self.user_id, key, "POST /test", {"title": "A"}, self._work)
+
+		with self.assertRaises(HTTPException) as ctx:
+			await self.store.run(self.user_id, key, "POST /test", {"title": "B"}, self._work)
+		self.assertEqual(ctx.exception.status_code, 422)
+
+	async def test_failed_request_releases_key(self):
+		key = uuid4().hex
+
+		async def fail():
+			raise HTTPException(status_code=404, detail="not found")
+
+		with self.assertRaises(HTTPException):
+			await self.store.run(self.user_id, key, "POST /test", None, fail)
+		result = await self.store.run(self.user_id, key, "POST /test", None, self._work)
+
+		self.assertEqual(result, {"roadmap_id": 1})
+
+
+	async def test_cancelled_request_lets_waiters_claim_key(self):
+		key = uuid4().hex
+		first = asyncio.create_task(self.store.run(self.user_id, key, "POST /test", {"title": "A"}, self._work))
+		await asyncio.sleep(0.05)
+		second = asyncio.create_task(self.store.run(self.user_id, key, "POST /test", {"title": "A"}, self._work))
+		await asyncio.sleep(0.05)
+		first.cancel()
+
+		result = await second
+
+		self.assertEqual(self.calls, 2)
+		self.assertEqual(result, {"roadmap_id": 2})
+		with self.assertRaises(asyncio.CancelledError):
+			await first
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from uuid import uuid4
+
+from sqlalchemy import delete, func, select
+
+from app.core.database.database import AsyncSessionLocal, engine
+from app.core.init import init_team_roles
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.roadmap_copy import RoadmapCopy
+from app.models.task import Task
+from app.models.team import Team
+from app.models.team_member import TeamMember
+from app.models.user import User
+from app.services.roadmap.copy_roadmap import copy_roadmap_to_users
+from app.services.user.auth_service import AuthService
+
+ADMIN_ROLE_ID = 1
+MEMBER_ROLE_ID = 2
+
+
+class BulkCopyTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		await init_team_roles(self.db)
+		self.user_ids = []
+		for _ in range(3):
+			username = f"copy_user_{uuid4().hex[:8]}"
+			self.user_ids.append(await AuthService(self.db).register_email(
+				username,
+				f"{username}@example.com",
+				"Secret123!",
+				"Aleksandr",
+				"Aleksandrov",
+			))
+		self.owner, *self.members = self.user_ids
+
+		self.team = Team(name=f"copy_team_{uuid4().hex[:8]}")
+		self.db.add(self.team)
+		goal = Goal(user_id=self.owner, title="Общий роадмап")
+		self.db.add(goal)
+		await self.db.flush()
+		roadmap = Roadmap(goals_id=goal.goals_id, completed=False, tasks_total=2)
+		self.db.add(roadmap)
+		await self.db.flush()
+		self.roadmap_id = roadmap.roadmap_id
+		self.db.add_all([
+			Task(roadmap_id=self.roadmap_id, title="Первая", order_index=0),
+			Task(roadmap_id=self.roadmap_id, title="Вторая", order_index=1),
+			TeamMember(team_id=self.team.team_id, user_id=self.owner, team_role_id=ADMIN_ROLE_ID),
+			*[
+				TeamMember(team_id=self.team.team_id, user_id=member, team_role_id=MEMBER_ROLE_ID)
+				for member in self.members
+			],
+		])
+		await self.db.commit()
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(Team).where(Team.team_id == self.team.team_id))
+			await self.db.execute(delete(User).where(User.user_id.in_(self.user_ids)))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def test_team_members_get_own_copies(self):
+		result = await copy_roadmap_to_users(self.db, self.owner, self.roadmap_id, team_id=self.team.team_id)
+
+		self.assertEqual([copy["user_id"] for copy in result["copies"]], sorted(self.members))
+		self.assertEqual(result["skipped"], [self.owner])
+		new_ids = [copy["new_roadmap_id"] for copy in result["copies"]]
+		async with AsyncSessionLocal() as session:
+			counts = (await session.execute(
+				select(Task.roadmap_id, func.count()).where(Task.roadmap_id.in_(new_ids)).group_by(Task.roadmap_id)
+			)).all()
+			lineage = (await session.execute(
+				select(RoadmapCopy.user_id).where(RoadmapCopy.original_roadmap_id == self.roadmap_id)
+			)).scalars().all()
+		self.assertEqual(sorted(count for _, count in counts), [2, 2])
+		self.assertEqual(sorted(lineage), sorted(self.members))
+
+	async def test_existing_copies_are_skipped(self):
+		await copy_roadmap_to_users(self.db, self.owner, self.roadmap_id, user_ids=self.members[:1])
+		result = await copy_roadmap_to_users(self.db, self.owner, self.roadmap_id, user_ids=self.members)
+
+		self.assertEqual([copy["user_id"] for copy in result["copies"]], self.members[1:])
+		self.assertEqual(result["skipped"], self.members[:1])
+
+
+if __name__ == "__main__":
+	unittest.main()
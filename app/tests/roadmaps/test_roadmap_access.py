@@ -0,0 +1,128 @@
+import unittest
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, event
+
+from app.core.database.database import AsyncSessionLocal, engine
+from app.core.init import init_team_roles
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.roadmap_access import RoadmapAccess
+from app.models.task import Task
+from app.models.team import Team
+from app.models.team_member import TeamMember
+from app.models.user import User
+from app.services.roadmap.roadmap_access import (
+	PERMISSION_EDITOR,
+	PERMISSION_VIEWER,
+	require_roadmap_access,
+	resolve_roadmap_access,
+)
+from app.services.roadmap.task_service import set_task_complete_for_roadmap
+from app.services.user.auth_service import AuthService
+
+ADMIN_ROLE_ID = 1
+MEMBER_ROLE_ID = 2
+
+
+class RoadmapAccessTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		await init_team_roles(self.db)
+		self.user_ids = []
+		for _ in range(5):
+			username = f"access_user_{uuid4().hex[:8]}"
+			self.user_ids.append(await AuthService(self.db).register_email(
+				username,
+				f"{username}@example.com",
+				"Secret123!",
+				"Aleksandr",
+				"Aleksandrov",
+			))
+		self.owner, self.admin, self.member, self.shared, self.stranger = self.user_ids
+
+		self.team = Team(name=f"access_team_{uuid4().hex[:8]}")
+		self.db.add(self.team)
+		goal = Goal(user_id=self.owner, title="Роадмап команды")
+		self.db.add(goal)
+		await self.db.flush()
+		roadmap = Roadmap(goals_id=goal.goals_id, team_id=self.team.team_id, completed=False)
+		self.db.add(roadmap)
+		await self.db.flush()
+		self.roadmap_id = roadmap.roadmap_id
+		self.db.add_all([
+			TeamMember(team_id=self.team.team_id, user_id=self.admin, team_role_id=ADMIN_ROLE_ID),
+			TeamMember(team_id=self.team.team_id, user_id=self.member, team_role_id=MEMBER_ROLE_ID),
+			TeamMember(team_id=self.team.team_id, user_id=self.shared, team_role_id=MEMBER_ROLE_ID),
+			RoadmapAccess(user_id=self.shared, roadmap_id=self.roadmap_id, permission=PERMISSION_EDITOR),
+		])
+		await self.db.commit()
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(Team).where(Team.team_id == self.team.team_id))
+			await self.db.execute(delete(User).where(User.user_id.in_(self.user_ids)))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def test_effective_permission_takes_strongest_grant(self):
+		async with AsyncSessionLocal() as session:
+			permissions = [
+				(await resolve_roadmap_access(session, user_id, self.roadmap_id)).permission
+				for user_id in self.user_ids
+			]
+
+		self.assertEqual(permissions, ["owner", "editor", "viewer", "editor", None])
+
+	async def test_access_is_resolved_once_per_session(self):
+		statements = []
+
+		def count(*args):
+			statements.append(args)
+
+		event.listen(engine.sync_engine, "before_cursor_execute", count)
+		try:
+			async with AsyncSessionLocal() as session:
+				await require_roadmap_access(session, self.member, self.roadmap_id)
+				await require_roadmap_access(session, self.member, self.roadmap_id)
+		finally:
+			event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+		self.assertEqual(len(statements), 1)
+
+	async def test_viewer_cannot_edit_and_stranger_cannot_read(self):
+		async with AsyncSessionLocal() as session:
+			with self.assertRaises(HTTPException) as viewer_ctx:
+				await require_roadmap_access(session, self.member, self.roadmap_id, PERMISSION_EDITOR)
+			with self.assertRaises(HTTPException) as stranger_ctx:
+				await require_roadmap_access(session, self.stranger, self.roadmap_id)
+			with self.assertRaises(HTTPException) as missing_ctx:
+				await require_roadmap_access(session, self.owner, 0)
+
+		self.assertEqual(viewer_ctx.exception.status_code, 403)
+		self.assertEqual(stranger_ctx.exception.status_code, 403)
+		self.assertEqual(missing_ctx.exception.status_code, 404)
+
+	async def test_team_member_can_complete_tasks_but_personal_viewer_cannot(self):
+		task = Task(roadmap_id=self.roadmap_id, title="Общая задача", order_index=0)
+		self.db.add_all([
+			task,
+			RoadmapAccess(user_id=self.stranger, roadmap_id=self.roadmap_id, permission=PERMISSION_VIEWER),
+		])
+		await self.db.commit()
+
+		async with AsyncSessionLocal() as session:
+			completed = await set_task_complete_for_roadmap(session, self.member, self.roadmap_id, task.task_id, True)
+			self.assertTrue(completed.completed)
+		async with AsyncSessionLocal() as session:
+			with self.assertRaises(HTTPException) as viewer_ctx:
+				await set_task_complete_for_roadmap(session, self.stranger, self.roadmap_id, task.task_id, False)
+
+		self.assertEqual(viewer_ctx.exception.status_code, 403)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from fastapi import HTTPException
+
+from app.core.conditional import etag_matches, make_etag
+from app.services.roadmap.roadmap_version import check_if_match, roadmap_etag, take_expected_version
+
+
+class _Session:
+	def __init__(self):
+		self.info = {}
+
+
+class RoadmapETagTests(unittest.TestCase):
+	def test_etag_depends_on_every_part(self):
+		self.assertEqual(make_etag("roadmap", 1, 2), make_etag("roadmap", 1, 2))
+		self.assertNotEqual(make_etag("roadmap", 1, 2), make_etag("roadmap", 1, 3))
+		self.assertNotEqual(make_etag("roadmap", 12, 3), make_etag("roadmap", 1, 23))
+
+	def test_if_none_match_uses_weak_comparison(self):
+		etag = roadmap_etag(1, 5)
+
+		self.assertTrue(etag_matches(f"\"other\", W/{etag}", etag))
+		self.assertTrue(etag_matches("*", etag))
+		self.assertFalse(etag_matches(f"W/{etag}", etag, weak=False))
+		self.assertFalse(etag_matches(None, etag))
+
+	def test_if_match_remembers_expected_version(self):
+		db = _Session()
+		db.info["roadmap_if_match"] = {1: roadmap_etag(1, 5)}
+
+		check_if_match(db, 1, 5)
+
+		self.assertEqual(take_expected_version(db, 1), 5)
+		self.assertIsNone(take_expected_version(db, 1))
+
+	def test_stale_if_match_is_rejected(self):
+		db = _Session()
+		db.info["roadmap_if_match"] = {1: roadmap_etag(1, 4)}
+
+		with self.assertRaises(HTTPException) as ctx:
+			check_if_match(db, 1, 5)
+
+		self.assertEqual(ctx.exception.status_code, 412)
+
+
+if __name__ == "__main__":
+	unittest.main()
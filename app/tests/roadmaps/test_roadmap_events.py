@@ -0,0 +1,97 @@
+import unittest
+
+from app.models.roadmap_event import RoadmapEvent
+from app.services.roadmap.roadmap_events import EventAudience, RoadmapEventHub, format_sse
+
+
+def _event(event_id, roadmap_id=1, owner_id=1, team_id=None):
+	return RoadmapEvent(
+		event_id=event_id,
+		roadmap_id=roadmap_id,
+		team_id=team_id,
+		owner_id=owner_id,
+		actor_id=owner_id,
+		version=1,
+		kind="task.updated",
+		payload={"task_id": event_id},
+		created_at=None,
+	)
+
+
+class _Result:
+	def __init__(self, rows):
+		self.rows = rows
+
+	def scalars(self):
+		return self
+
+	def all(self):
+		return self.rows
+
+
+class _Session:
+	def __init__(self, batches):
+		self.batches = batches
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, *exc):
+		return False
+
+	async def execute(self, stmt):
+		return _Result(self.batches.pop(0))
+
+
+class RoadmapEventsTests(unittest.IsolatedAsyncioTestCase):
+	def test_audience_sees_own_team_and_shared_roadmaps(self):
+		audience = EventAudience(user_id=1, team_ids=frozenset({10}), roadmap_ids=frozenset({7}))
+
+		self.assertTrue(audience.sees({"roadmap_id": 1, "owner_id": 1, "team_id": None}))
+		self.assertTrue(audience.sees({"roadmap_id": 2, "owner_id": 2, "team_id": 10}))
+		self.assertTrue(audience.sees({"roadmap_id": 7, "owner_id": 2, "team_id": None}))
+		self.assertFalse(audience.sees({"roadmap_id": 3, "owner_id": 2, "team_id": 11}))
+
+		single = EventAudience(user_id=1, team_ids=frozenset(), roadmap_ids=frozenset(), roadmap_id=5)
+		self.assertFalse(single.sees({"roadmap_id": 1, "owner_id": 1, "team_id": None}))
+
+	def test_format_sse(self):
+		self.assertEqual(
+			format_sse(3, "task.deleted", {"task_id": 1}),
+			"id: 3\nevent: task.deleted\ndata: {\"task_id\":1}\n\n",
+		)
+
+	async def test_late_commit_in_gap_is_delivered(self):
+		batches = [[_event(3)], [_event(2)]]
+		hub = RoadmapEventHub(session_factory=lambda: _Session(batches))
+		hub._cursor = 1
+		subscription = await self._subscribe(hub)
+
+		await hub.poll()
+		self.assertEqual(hub._cursor, 3)
+		self.assertEqual(set(hub._gaps), {2})
+
+		await hub.poll()
+		self.assertEqual(hub._cursor, 3)
+		self.assertEqual(hub._gaps, {})
+		delivered = [subscription.queue.get_nowait()["event_id"] for _ in range(subscription.queue.qsize())]
+		self.assertEqual(delivered, [3, 2])
+
+	async def test_other_users_events_are_not_dispatched(self):
+		hub = RoadmapEventHub(session_factory=lambda: _Session([[_event(2, owner_id=2)]]))
+		hub._cursor = 1
+		subscription = await self._subscribe(hub)
+
+		await hub.poll()
+
+		self.assertTrue(subscription.queue.empty())
+
+	async def _subscribe(self, hub):
+		subscription = await hub.subscribe(EventAudience(user_id=1, team_ids=frozenset(), roadmap_ids=frozenset()))
+		# Опрос в тестах вызывается вручную.
+		hub._poller.cancel()
+		return subscription
+
+
+if __name__ == "__main__":
+	unittest.main()
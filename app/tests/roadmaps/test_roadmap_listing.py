@@ -0,0 +1,40 @@
+import unittest
+
+from fastapi import HTTPException
+
+from app.services.roadmap.roadmap_listing import (
+	INCLUDE_SUMMARY,
+	INCLUDE_TASKS,
+	roadmap_list_params,
+)
+
+
+class RoadmapListParamsTests(unittest.TestCase):
+	def test_default_keeps_full_roadmap_shape(self):
+		params = roadmap_list_params(limit=50, cursor=None, include=INCLUDE_TASKS, fields=None)
+
+		self.assertIn("tasks", params.fields)
+		self.assertIn("goal", params.fields)
+		self.assertNotIn("tasks_total", params.fields)
+
+	def test_summary_replaces_tasks_with_counters(self):
+		params = roadmap_list_params(limit=50, cursor=None, include=INCLUDE_SUMMARY, fields=None)
+
+		self.assertNotIn("tasks", params.fields)
+		self.assertIn("tasks_total", params.fields)
+		self.assertIn("tasks_completed", params.fields)
+
+	def test_sparse_fields_always_keep_roadmap_id(self):
+		params = roadmap_list_params(limit=10, cursor=None, include=INCLUDE_SUMMARY, fields="goal, tasks, updated_at")
+
+		self.assertEqual(params.fields, {"roadmap_id", "goal", "updated_at"})
+
+	def test_unknown_field_is_rejected(self):
+		with self.assertRaises(HTTPException) as ctx:
+			roadmap_list_params(limit=10, cursor=None, include=INCLUDE_TASKS, fields="roadmap_id,password")
+
+		self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+	unittest.main()
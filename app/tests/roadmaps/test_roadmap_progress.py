@@ -0,0 +1,87 @@
+import unittest
+from uuid import uuid4
+
+from sqlalchemy import delete
+
+from app.core.database.database import AsyncSessionLocal, engine
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.user import User
+from app.services.ai_service.roadmap_diff import apply_task_diff, diff_tasks
+from app.services.roadmap.task_service import (
+	create_task_for_roadmap,
+	delete_task_for_roadmap,
+	set_task_complete_for_roadmap,
+)
+from app.services.user.auth_service import AuthService
+
+
+class RoadmapProgressTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		username = f"progress_user_{uuid4().hex[:8]}"
+		self.user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		goal = Goal(user_id=self.user_id, title="Прогресс")
+		self.db.add(goal)
+		await self.db.flush()
+		roadmap = Roadmap(goals_id=goal.goals_id, completed=False)
+		self.db.add(roadmap)
+		await self.db.commit()
+		self.roadmap_id = roadmap.roadmap_id
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(User).where(User.user_id == self.user_id))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def _progress(self):
+		async with AsyncSessionLocal() as session:
+			roadmap = await session.get(Roadmap, self.roadmap_id)
+			return roadmap.tasks_total, roadmap.tasks_completed, roadmap.completed
+
+	async def test_counters_follow_task_changes(self):
+		first = await create_task_for_roadmap(self.db, self.user_id, self.roadmap_id, "Первая")
+		second = await create_task_for_roadmap(self.db, self.user_id, self.roadmap_id, "Вторая")
+		self.assertEqual(await self._progress(), (2, 0, False))
+
+		await set_task_complete_for_roadmap(self.db, self.user_id, self.roadmap_id, first.task_id, True)
+		await set_task_complete_for_roadmap(self.db, self.user_id, self.roadmap_id, first.task_id, True)
+		self.assertEqual(await self._progress(), (2, 1, False))
+
+		await delete_task_for_roadmap(self.db, self.user_id, self.roadmap_id, second.task_id)
+		self.assertEqual(await self._progress(), (1, 1, True))
+
+		await set_task_complete_for_roadmap(self.db, self.user_id, self.roadmap_id, first.task_id, False)
+		self.assertEqual(await self._progress(), (1, 0, False))
+
+	async def test_task_diff_adjusts_counters(self):
+		kept = await create_task_for_roadmap(self.db, self.user_id, self.roadmap_id, "Изучить основы", order_index=0)
+		dropped = await create_task_for_roadmap(self.db, self.user_id, self.roadmap_id, "Старая задача", order_index=1)
+		await set_task_complete_for_roadmap(self.db, self.user_id, self.roadmap_id, dropped.task_id, True)
+
+		existing = [
+			{"task_id": task.task_id, "title": task.title, "description": task.description, "order_index": task.order_index}
+			for task in (kept, dropped)
+		]
+		diff = diff_tasks(existing, [
+			{"title": "Изучить основы"},
+			{"title": "Написать проект"},
+			{"title": "Подготовить демо"},
+		])
+		await apply_task_diff(self.db, self.roadmap_id, diff)
+		await self.db.commit()
+
+		self.assertEqual(await self._progress(), (3, 0, False))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from uuid import uuid4
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy import delete
+
+from app.core.database.database import AsyncSessionLocal, engine
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.roadmap import TaskBatchOperation
+from app.services.roadmap.task_batch import apply_task_batch
+from app.services.user.auth_service import AuthService
+
+operations = TypeAdapter(list[TaskBatchOperation]).validate_python
+
+
+class TaskBatchTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		username = f"batch_user_{uuid4().hex[:8]}"
+		self.user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		goal = Goal(user_id=self.user_id, title="Пакетные операции")
+		self.db.add(goal)
+		await self.db.flush()
+		roadmap = Roadmap(goals_id=goal.goals_id, completed=False, tasks_total=3)
+		self.db.add(roadmap)
+		await self.db.flush()
+		self.roadmap_id = roadmap.roadmap_id
+		tasks = [Task(roadmap_id=self.roadmap_id, title=title, order_index=idx) for idx, title in enumerate("abc")]
+		self.db.add_all(tasks)
+		await self.db.commit()
+		self.task_ids = [task.task_id for task in tasks]
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(User).where(User.user_id == self.user_id))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def test_operations_are_applied_together(self):
+		first, second, third = self.task_ids
+		tasks = await apply_task_batch(self.db, self.user_id, self.roadmap_id, operations([
+			{"op": "move", "task_id": third, "order_index": -1},
+			{"op": "update", "task_id": first, "completed": True},
+			{"op": "update", "task_id": first, "title": "A"},
+			{"op": "delete", "task_id": second},
+			{"op": "create", "title": "d"},
+		]))
+
+		self.assertEqual([(task.title, task.completed) for task in tasks], [("c", False), ("A", True), ("d", False)])
+		async with AsyncSessionLocal() as session:
+			roadmap = await session.get(Roadmap, self.roadmap_id)
+			self.assertEqual((roadmap.tasks_total, roadmap.tasks_completed), (3, 1))
+
+	async def test_appended_tasks_start_at_zero_on_empty_roadmap(self):
+		tasks = await apply_task_batch(self.db, self.user_id, self.roadmap_id, operations([
+			*[{"op": "delete", "task_id": task_id} for task_id in self.task_ids],
+			{"op": "create", "title": "d"},
+			{"op": "create", "title": "e"},
+		]))
+
+		self.assertEqual([(task.title, task.order_index) for task in tasks], [("d", 0), ("e", 1)])
+
+	async def test_null_clears_due_date_but_not_title(self):
+		first = self.task_ids[0]
+		await apply_task_batch(self.db, self.user_id, self.roadmap_id, operations([
+			{"op": "update", "task_id": first, "due_at": "2030-01-01T00:00:00Z"},
+		]))
+		tasks = await apply_task_batch(self.db, self.user_id, self.roadmap_id, operations([
+			{"op": "update", "task_id": first, "due_at": None, "title": None},
+		]))
+
+		self.assertEqual((tasks[0].title, tasks[0].due_at), ("a", None))
+
+	async def test_unknown_task_rejects_whole_batch(self):
+		with self.assertRaises(HTTPException) as ctx:
+			await apply_task_batch(self.db, self.user_id, self.roadmap_id, operations([
+				{"op": "delete", "task_id": self.task_ids[0]},
+				{"op": "update", "task_id": 10 ** 9, "title": "x"},
+			]))
+		await self.db.rollback()
+
+		self.assertEqual(ctx.exception.status_code, 404)
+		async with AsyncSessionLocal() as session:
+			roadmap = await session.get(Roadmap, self.roadmap_id)
+			await session.refresh(roadmap, ["tasks"])
+			self.assertEqual(len(roadmap.tasks), 3)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,101 @@
+import random
+import unittest
+from uuid import uuid4
+
+from sqlalchemy import delete, select
+
+from app.core.database.database import AsyncSessionLocal, engine
+from app.models.goal import Goal
+from app.models.roadmap import Roadmap
+from app.models.roadmap_event import RoadmapEvent
+from app.models.task import Task
+from app.models.user import User
+from app.services.roadmap.roadmap_events import EVENT_TASKS_CHANGED
+from app.services.roadmap.task_rank import TaskRankRebalancer, position_between, rank_between
+from app.services.user.auth_service import AuthService
+
+
+class TaskRankTests(unittest.TestCase):
+	def test_rank_between_is_strictly_inside(self):
+		self.assertEqual(rank_between("", None), "i")
+		for lo, hi in [("", "1"), ("a", "b"), ("az", "b"), ("a", "a1"), ("", "01")]:
+			rank = rank_between(lo, hi)
+			self.assertTrue(lo < rank < hi, (lo, rank, hi))
+			self.assertFalse(rank.endswith("0"))
+
+	def test_rank_between_rejects_empty_interval(self):
+		with self.assertRaises(ValueError):
+			rank_between("b", "b")
+
+	def test_repeated_inserts_keep_order(self):
+		rng = random.Random(7)
+		ranks = [rank_between("", None)]
+		for _ in range(200):
+			pos = rng.randint(0, len(ranks))
+			lo = ranks[pos - 1] if pos > 0 else ""
+			hi = ranks[pos] if pos < len(ranks) else None
+			ranks.insert(pos, rank_between(lo, hi))
+
+		self.assertEqual(ranks, sorted(set(ranks)))
+
+	def test_position_prefers_free_order_index(self):
+		self.assertEqual(position_between(None, (3, "")), (2, ""))
+		self.assertEqual(position_between((3, "a"), None), (4, ""))
+		self.assertEqual(position_between((1, ""), (5, "")), (2, ""))
+		self.assertEqual(position_between((1, "a"), (2, "")), (1, "n"))
+		self.assertEqual(position_between((1, ""), (1, "a")), (1, "5"))
+
+	def test_position_requires_rebalance_for_ties(self):
+		self.assertIsNone(position_between((1, ""), (1, "")))
+
+
+class TaskRankRebalancerTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		username = f"rank_user_{uuid4().hex[:8]}"
+		self.user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		goal = Goal(user_id=self.user_id, title="Перенумерация")
+		self.db.add(goal)
+		await self.db.flush()
+		roadmap = Roadmap(goals_id=goal.goals_id, completed=False, tasks_total=2)
+		self.db.add(roadmap)
+		await self.db.flush()
+		self.roadmap_id = roadmap.roadmap_id
+		self.db.add_all([
+			Task(roadmap_id=self.roadmap_id, title="a", order_index=0, rank="i" * 20),
+			Task(roadmap_id=self.roadmap_id, title="b", order_index=0, rank="j"),
+		])
+		await self.db.commit()
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(RoadmapEvent).where(RoadmapEvent.roadmap_id == self.roadmap_id))
+			await self.db.execute(delete(User).where(User.user_id == self.user_id))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def test_rebalance_bumps_version_and_publishes_event(self):
+		await TaskRankRebalancer(AsyncSessionLocal).rebalance_long_ranks()
+
+		async with AsyncSessionLocal() as session:
+			roadmap = await session.get(Roadmap, self.roadmap_id)
+			tasks = (await session.execute(
+				select(Task.title, Task.order_index, Task.rank).where(Task.roadmap_id == self.roadmap_id).order_by(Task.order_index)
+			)).all()
+			event = (await session.execute(
+				select(RoadmapEvent).where(RoadmapEvent.roadmap_id == self.roadmap_id)
+			)).scalar_one()
+		self.assertEqual([tuple(task) for task in tasks], [("a", 0, ""), ("b", 1, "")])
+		self.assertEqual((event.kind, event.version), (EVENT_TASKS_CHANGED, roadmap.version))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+from app.core.database.database import AsyncSessionLocal, engine
+from app.core.init import init_team_roles
+from app.models.chat import Chat
+from app.models.chat_participant import ChatParticipant
+from app.models.goal import Goal
+from app.models.message import Message
+from app.models.roadmap import Roadmap
+from app.models.task import Task
+from app.models.team import Team
+from app.models.team_member import TeamMember
+from app.models.user import User
+from app.services.team_service.delete_team import delete_team
+from app.services.team_service.get_owned_team import get_owned_team
+from app.services.team_service.team_purger import TeamPurger
+from app.services.user.auth_service import AuthService
+
+ADMIN_ROLE_ID = 1
+
+
+class TeamPurgeTests(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		self.db = AsyncSessionLocal()
+		await init_team_roles(self.db)
+		username = f"purge_user_{uuid4().hex[:8]}"
+		self.user_id = await AuthService(self.db).register_email(
+			username,
+			f"{username}@example.com",
+			"Secret123!",
+			"Aleksandr",
+			"Aleksandrov",
+		)
+		self.user = (await self.db.execute(select(User).where(User.user_id == self.user_id))).scalar_one()
+
+		self.team = Team(name=f"purge_team_{uuid4().hex[:8]}")
+		goal = Goal(user_id=self.user_id, title="Роадмап команды")
+		self.db.add_all([self.team, goal])
+		await self.db.flush()
+		self.team_id = self.team.team_id
+		roadmap = Roadmap(goals_id=goal.goals_id, team_id=self.team_id, completed=False, tasks_total=2)
+		chat = Chat(team_id=self.team_id, name="Общий")
+		self.db.add_all([roadmap, chat])
+		await self.db.flush()
+		self.roadmap_id = roadmap.roadmap_id
+		self.chat_id = chat.chat_id
+		self.db.add_all([
+			Task(roadmap_id=self.roadmap_id, title="Первая", order_index=0),
+			Task(roadmap_id=self.roadmap_id, title="Вторая", order_index=1),
+			TeamMember(team_id=self.team_id, user_id=self.user_id, team_role_id=ADMIN_ROLE_ID),
+			ChatParticipant(chat_id=self.chat_id, user_id=self.user_id),
+			*[Message(chat_id=self.chat_id, user_id=self.user_id, content=f"Сообщение {i}") for i in range(3)],
+		])
+		await self.db.commit()
+
+	async def asyncTearDown(self):
+		try:
+			await self.db.execute(delete(Team).where(Team.team_id == self.team_id))
+			await self.db.execute(delete(User).where(User.user_id == self.user_id))
+			await self.db.commit()
+		finally:
+			await self.db.close()
+			await engine.dispose()
+
+	async def _count(self, model, *conditions):
+		return (await self.db.execute(select(func.count()).select_from(model).where(*conditions))).scalar_one()
+
+	async def test_deleted_team_is_hidden_until_purged(self):
+		await delete_team(self.db, self.user, self.team_id)
+
+		with self.assertRaises(HTTPException) as error:
+			await get_owned_team(self.db, self.user, self.team_id)
+		self.assertEqual(error.exception.status_code, 404)
+		self.assertEqual(await self._count(TeamMember, TeamMember.team_id == self.team_id), 0)
+		self.assertEqual(await self._count(ChatParticipant, ChatParticipant.chat_id == self.chat_id), 0)
+		self.assertEqual(await self._count(Task, Task.roadmap_id == self.roadmap_id), 2)
+
+		await TeamPurger(AsyncSessionLocal).purge_team(self.db, self.team_id)
+
+		self.assertEqual(await self._count(Team, Team.team_id == self.team_id), 0)
+		self.assertEqual(await self._count(Roadmap, Roadmap.roadmap_id == self.roadmap_id), 0)
+		self.assertEqual(await self._count(Task, Task.roadmap_id == self.roadmap_id), 0)
+		self.assertEqual(await self._count(Chat, Chat.chat_id == self.chat_id), 0)
+		self.assertEqual(await self._count(Message, Message.chat_id == self.chat_id), 0)